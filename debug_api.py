@@ -1,9 +1,10 @@
 import src.api as api
 import json
+from src.request_builder import GROUP_C_OPTIONS, GROUP_L_OPTIONS, GROUP_K_OPTIONS
 
 try:
-    # Fetch with default settings (group 1)
-    settings = {"group_c": "1", "group_l": "1", "group_k": "1"}
+    # Fetch with the first valid group of each kind (see src/request_builder.py)
+    settings = {"group_c": GROUP_C_OPTIONS[0], "group_l": GROUP_L_OPTIONS[0], "group_k": GROUP_K_OPTIONS[0]}
     timetable = api.fetch_timetable(settings)
     
     if timetable:
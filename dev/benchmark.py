@@ -0,0 +1,199 @@
+"""
+Headless benchmark suite for the update pipeline.
+
+Runs under QT_QPA_PLATFORM=offscreen against a local stub HTTP server
+(dev/stub_server.py) and measures:
+  - api.fetch_timetable latency
+  - get_current_segment / get_next_segment on 10 .. 10 000 segment timetables
+  - UpdateManager.trigger_update -> UI updated (end to end, incl. fetch process)
+  - paint_overlay / ModernProgressBar paint cost at several sizes
+
+Usage:
+  python dev/benchmark.py                   # run and compare with the baseline
+  python dev/benchmark.py --save-baseline   # run and store results as the new baseline
+  python dev/benchmark.py --only segments   # run one group (fetch, segments, e2e, paint)
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Run headless and keep the benchmark away from the user's real settings.json
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+_config_home = tempfile.mkdtemp(prefix="overlay-bench-")
+os.environ["HOME"] = _config_home
+os.environ["APPDATA"] = _config_home
+
+DEV_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(DEV_DIR, '..')))
+sys.path.insert(0, DEV_DIR)
+
+from stub_server import StubServer, make_timetable
+
+DEFAULT_BASELINE = os.path.join(DEV_DIR, "benchmark_baseline.json")
+SEGMENT_COUNTS = (10, 100, 1000, 10000)
+PAINT_SIZES = ((200, 48), (420, 110), (800, 190))
+GROUPS = {"group_c": "11K1", "group_l": "L01", "group_k": "K01"}
+
+
+def measure(fn, repeat, warmup=3):
+    """Runs fn() `repeat` times and returns timing stats in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "mean_ms": round(statistics.mean(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "min_ms": round(samples[0], 4),
+        "runs": repeat,
+    }
+
+
+def bench_fetch(results, stub):
+    from src import api
+    api.API_URL = stub.url
+    results["fetch_timetable"] = measure(lambda: api.fetch_timetable(GROUPS), repeat=50)
+    builder = api.get_request_builder(GROUPS)
+    results["request_url[cached]"] = measure(
+        lambda: builder.url_for(GROUPS["group_c"], GROUPS["group_l"], GROUPS["group_k"]), repeat=2000)
+
+
+def bench_segments(results):
+    from src import api
+    for count in SEGMENT_COUNTS:
+        # Worst case independent of the time of day: every segment but the last one is
+        # already over and nothing starts later, so both lookups scan the whole list
+        timetable = [dict(lesson, start="00:00", end="00:00") for lesson in make_timetable(count - 1)]
+        timetable.append({"id": count, "syllabus": "Ostatni", "start": "00:00", "end": "23:59", "hall": "A-1"})
+        repeat = max(5, 2000 // count)
+        results[f"get_current_segment[{count}]"] = measure(lambda: api.get_current_segment(timetable), repeat)
+        results[f"get_next_segment[{count}]"] = measure(lambda: api.get_next_segment(timetable), repeat)
+
+
+def bench_end_to_end(results, app, overlay, repeat=10):
+    """trigger_update with an empty cache -> fetch process -> queue -> labels updated."""
+    manager = overlay.update_manager
+    overlay.settings_manager.update_settings(dict(GROUPS))
+
+    def refresh():
+        manager.cache.clear()
+        manager.trigger_update()
+        deadline = time.monotonic() + 30
+        while manager._api_update_in_progress and time.monotonic() < deadline:
+            app.processEvents()
+            time.sleep(0.001)
+
+    results["trigger_update_end_to_end"] = measure(refresh, repeat=repeat, warmup=1)
+
+
+def bench_paint(results, overlay):
+    from PyQt6.QtGui import QImage, QPainter
+    from PyQt6.QtCore import Qt, QRectF
+    from src.overlay.ui_renderer import paint_overlay
+    from src.overlay.modern_progress_bar import paint_progress_bar
+
+    for width, height in PAINT_SIZES:
+        overlay.resize(width, height)
+        overlay.layout_model.update(width, height, overlay.scale_factor, overlay.is_small)
+        image = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+
+        def paint_background():
+            image.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(image)
+            paint_overlay(overlay, painter)
+            painter.end()
+
+        bar_rect = QRectF(0, 0, width * 0.8, max(4, height // 14))
+
+        def paint_bar():
+            image.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(image)
+            paint_progress_bar(painter, bar_rect, 0.6, 0.4)
+            painter.end()
+
+        results[f"paint_overlay[{width}x{height}]"] = measure(paint_background, repeat=200)
+        results[f"progress_bar_paint[{width}x{height}]"] = measure(paint_bar, repeat=200)
+
+
+def compare(results, baseline, threshold):
+    """Prints results next to the baseline; returns the list of regressed benchmarks."""
+    regressions = []
+    print(f"{'Benchmark':<40} | {'median ms':>10} | {'baseline':>10} | {'change':>8}")
+    print("-" * 78)
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if base and base["median_ms"] > 0:
+            change = stats["median_ms"] / base["median_ms"] - 1
+            flag = "  REGRESSION" if change > threshold else ""
+            if flag:
+                regressions.append(name)
+            print(f"{name:<40} | {stats['median_ms']:>10.3f} | {base['median_ms']:>10.3f} | {change:>+7.0%}{flag}")
+        else:
+            print(f"{name:<40} | {stats['median_ms']:>10.3f} | {'-':>10} | {'-':>8}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overlay update pipeline benchmarks")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON path")
+    parser.add_argument("--save-baseline", action="store_true", help="store results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative median slowdown reported as a regression (default 0.25)")
+    parser.add_argument("--only", choices=("fetch", "segments", "e2e", "paint"), action="append",
+                        help="run only the given benchmark group (repeatable)")
+    args = parser.parse_args()
+    groups = set(args.only or ("fetch", "segments", "e2e", "paint"))
+
+    stub = StubServer(segments=12).start()
+    # Fetch worker processes inherit the stub address
+    os.environ["OVERLAY_API_URL"] = stub.url
+
+    results = {}
+    try:
+        if "fetch" in groups:
+            bench_fetch(results, stub)
+        if "segments" in groups:
+            bench_segments(results)
+        if groups & {"e2e", "paint"}:
+            from PyQt6.QtWidgets import QApplication
+            app = QApplication(sys.argv)
+            from src.overlay import OverlayWidget
+            overlay = OverlayWidget(title="Lekcja", left_text="-", right_text="-")
+            overlay.show()
+            app.processEvents()
+            if "e2e" in groups:
+                bench_end_to_end(results, app, overlay)
+            if "paint" in groups:
+                bench_paint(results, overlay)
+            overlay.update_manager.stop_timers()
+            overlay.settings_manager.stop_timers()
+    finally:
+        stub.stop()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results}, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
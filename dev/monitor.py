@@ -1,3 +1,6 @@
+import argparse
+import csv
+import json
 import time
 import sys
 import os
@@ -9,6 +12,12 @@ except ImportError:
     print("Please install it using: pip install psutil")
     sys.exit(1)
 
+PROFILE_FIELDS = [
+    "time", "pid", "ppid", "role", "name", "cpu_percent", "rss_mb", "uss_mb",
+    "threads", "ctx_voluntary", "ctx_involuntary", "wakeups", "open_fds",
+]
+
+
 def find_main_process():
     """Finds the process running 'main.py'."""
     current_pid = os.getpid()
@@ -40,9 +49,20 @@ def find_main_process():
         
     return candidates[0]
 
-def monitor():
-    print("Searching for 'main.py' process...")
-    proc = find_main_process()
+
+def resolve_process(pid=None):
+    """Returns the process to monitor: the given PID or the detected 'main.py'."""
+    if pid is None:
+        print("Searching for 'main.py' process...")
+        return find_main_process()
+    try:
+        return psutil.Process(pid)
+    except psutil.NoSuchProcess:
+        return None
+
+
+def monitor(pid=None, interval=1.0):
+    proc = resolve_process(pid)
     
     if not proc:
         print("Could not find 'main.py' running.")
@@ -51,7 +71,7 @@ def monitor():
 
     log_file_path = os.path.join(os.path.dirname(__file__), 'monitor.log')
     
-    print(f"Found process: {proc.info['name']} (PID: {proc.info['pid']})")
+    print(f"Found process: {proc.name()} (PID: {proc.pid})")
     print(f"Logging to: {log_file_path}")
     print("-" * 55)
     header = f"{'Time':<10} | {'CPU %':<10} | {'Memory (MB)':<15} | {'Status':<10}"
@@ -62,36 +82,31 @@ def monitor():
         # Initial call to cpu_percent returns 0, so we ignore it or wait
         proc.cpu_percent(interval=None)
         
-        # Initialize file with header
-        with open(log_file_path, 'w', encoding='utf-8') as log_file:
+        # Keep the log open for the whole session (line buffered, so it stays current)
+        with open(log_file_path, 'w', encoding='utf-8', buffering=1) as log_file:
             log_file.write(f"{header}\n")
             log_file.write("-" * 55 + "\n")
 
-        while True:
-            if not proc.is_running():
-                print("\nProcess ended.")
-                break
-            
-            # Get metrics
-            # interval=1.0 blocks for 1 second to calculate CPU usage
-            cpu = proc.cpu_percent(interval=1.0)
-            
-            try:
-                mem_info = proc.memory_info()
-                mem_mb = mem_info.rss / (1024 * 1024)
-                status = proc.status()
-            except psutil.NoSuchProcess:
-                print("\nProcess ended.")
-                break
+            while True:
+                time.sleep(interval)
+                if not proc.is_running():
+                    print("\nProcess ended.")
+                    break
 
-            current_time = time.strftime("%H:%M:%S")
-            log_line = f"{current_time:<10} | {cpu:<10.1f} | {mem_mb:<15.2f} | {status:<10}"
-            print(log_line)
-            
-            # Log to file (append mode, open/close every time to ensure immediate update)
-            with open(log_file_path, 'a', encoding='utf-8') as log_file:
+                try:
+                    cpu = proc.cpu_percent(interval=None)
+                    mem_info = proc.memory_info()
+                    mem_mb = mem_info.rss / (1024 * 1024)
+                    status = proc.status()
+                except psutil.NoSuchProcess:
+                    print("\nProcess ended.")
+                    break
+
+                current_time = time.strftime("%H:%M:%S")
+                log_line = f"{current_time:<10} | {cpu:<10.1f} | {mem_mb:<15.2f} | {status:<10}"
+                print(log_line)
                 log_file.write(f"{log_line}\n")
-            
+
     except KeyboardInterrupt:
         print("\nMonitoring stopped.")
     except psutil.NoSuchProcess:
@@ -99,5 +114,231 @@ def monitor():
     except Exception as e:
         print(f"\nAn error occurred: {e}")
 
+
+class TimelineWriter:
+    """Buffered CSV or JSONL timeline writer (format chosen by file extension)."""
+
+    def __init__(self, path, flush_interval=5.0):
+        self.path = path
+        self.jsonl = path.endswith(".jsonl")
+        self.flush_interval = flush_interval
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        if not self.jsonl:
+            self._csv = csv.DictWriter(self._file, fieldnames=PROFILE_FIELDS)
+            self._csv.writeheader()
+
+    def write(self, rows):
+        self._buffer.extend(rows)
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self.jsonl:
+            self._file.writelines(json.dumps(row) + "\n" for row in self._buffer)
+        else:
+            self._csv.writerows(self._buffer)
+        self._buffer.clear()
+        self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+class ProcessStats:
+    """Aggregated statistics of one process seen during profiling."""
+
+    def __init__(self, proc, role):
+        self.proc = proc
+        self.role = role
+        self.name = ""
+        self.first_seen = time.monotonic()
+        self.last_seen = self.first_seen
+        self.samples = 0
+        self.cpu_samples = 0  # Samples with a CPU reading (the first cpu_percent call only primes it)
+        self.cpu_total = 0.0
+        self.cpu_max = 0.0
+        self.rss_max = 0.0
+        self.uss_max = 0.0
+        self.threads_max = 0
+        self.wakeups = 0
+        self.gone = False
+        self._last_ctx = None
+
+    def try_sample(self):
+        """Like sample(), but returns None if the process is gone (sets gone) or inaccessible."""
+        try:
+            return self.sample()
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            self.gone = True
+        except psutil.AccessDenied:
+            pass
+        return None
+
+    def sample(self):
+        """Takes one sample; returns a timeline row (raises psutil errors if the process is gone)."""
+        proc = self.proc
+        with proc.oneshot():
+            self.name = proc.name()
+            cpu = proc.cpu_percent(interval=None)
+            if not self.samples:
+                cpu = None  # The first call has no previous reading and always returns 0.0
+            try:
+                mem = proc.memory_full_info()
+                uss = mem.uss
+            except psutil.AccessDenied:
+                mem = proc.memory_info()
+                uss = None
+            ctx = proc.num_ctx_switches()
+            threads = proc.num_threads()
+            try:
+                fds = proc.num_handles() if os.name == "nt" else proc.num_fds()
+            except psutil.AccessDenied:
+                fds = None
+            ppid = proc.ppid()
+
+        # Voluntary context switches approximate wakeups (sleeping -> runnable)
+        wakeups = ctx.voluntary - self._last_ctx.voluntary if self._last_ctx else 0
+        self._last_ctx = ctx
+
+        rss_mb = mem.rss / (1024 * 1024)
+        uss_mb = uss / (1024 * 1024) if uss is not None else None
+        self.last_seen = time.monotonic()
+        self.samples += 1
+        if cpu is not None:
+            self.cpu_samples += 1
+            self.cpu_total += cpu
+            self.cpu_max = max(self.cpu_max, cpu)
+        self.rss_max = max(self.rss_max, rss_mb)
+        self.uss_max = max(self.uss_max, uss_mb or 0.0)
+        self.threads_max = max(self.threads_max, threads)
+        self.wakeups += wakeups
+
+        return {
+            "time": round(time.time(), 3),
+            "pid": proc.pid,
+            "ppid": ppid,
+            "role": self.role,
+            "name": self.name,
+            "cpu_percent": cpu,
+            "rss_mb": round(rss_mb, 2),
+            "uss_mb": round(uss_mb, 2) if uss_mb is not None else None,
+            "threads": threads,
+            "ctx_voluntary": ctx.voluntary,
+            "ctx_involuntary": ctx.involuntary,
+            "wakeups": wakeups,
+            "open_fds": fds,
+        }
+
+
+def profile(pid=None, interval=0.25, output=None, duration=None):
+    """Samples the main process and its whole child tree (including short-lived fetch workers)."""
+    root = resolve_process(pid)
+    if not root:
+        print("Could not find 'main.py' running.")
+        print("Please make sure the application is started.")
+        return
+
+    if output is None:
+        output = os.path.join(os.path.dirname(__file__), "profile.csv")
+
+    print(f"Profiling PID {root.pid} and its children every {interval * 1000:.0f} ms")
+    print(f"Timeline: {output}")
+
+    tracked = {root.pid: ProcessStats(root, "main")}  # Processes still sampled
+    finished = []  # Stats of processes that exited (for the summary)
+    writer = TimelineWriter(output)
+    started = time.monotonic()
+    total_cpu_samples = []
+    total_rss_samples = []
+
+    try:
+        while root.is_running():
+            if duration is not None and time.monotonic() - started >= duration:
+                break
+
+            # Discover new children (fetch workers live only for a few hundred ms)
+            try:
+                children = root.children(recursive=True)
+            except psutil.NoSuchProcess:
+                break
+            rows = []
+            sampled = set()
+            for child in children:
+                if child.pid not in tracked:
+                    # First sample right away - the worker may already be gone after the sleep
+                    stats = tracked[child.pid] = ProcessStats(child, "child")
+                    row = stats.try_sample()
+                    if row:
+                        rows.append(row)
+                    sampled.add(child.pid)
+
+            time.sleep(interval)
+
+            # One row per process per tick - children sampled on discovery wait for the next tick
+            for pid, stats in list(tracked.items()):
+                if pid in sampled:
+                    continue
+                row = stats.try_sample()
+                if row:
+                    rows.append(row)
+                if stats.gone:
+                    finished.append(tracked.pop(pid))
+
+            if rows:
+                total_cpu_samples.append(sum(row["cpu_percent"] or 0.0 for row in rows))
+                total_rss_samples.append(sum(row["rss_mb"] for row in rows))
+                writer.write(rows)
+    except KeyboardInterrupt:
+        print("\nProfiling stopped.")
+    finally:
+        writer.close()
+
+    print_summary(finished + list(tracked.values()), total_cpu_samples, total_rss_samples,
+                  time.monotonic() - started)
+
+
+def print_summary(seen, total_cpu_samples, total_rss_samples, elapsed):
+    children = [s for s in seen if s.role == "child"]
+    print("\n" + "=" * 70)
+    print(f"Duration: {elapsed:.1f} s, child processes seen: {len(children)}")
+    if total_cpu_samples:
+        print(f"Total CPU %: avg {sum(total_cpu_samples) / len(total_cpu_samples):.2f}, "
+              f"max {max(total_cpu_samples):.2f}")
+        print(f"Total RSS MB: avg {sum(total_rss_samples) / len(total_rss_samples):.2f}, "
+              f"max {max(total_rss_samples):.2f}")
+    print("-" * 70)
+    print(f"{'PID':<8} {'Role':<6} {'Name':<16} {'Samples':>7} {'CPU avg':>8} {'CPU max':>8} "
+          f"{'RSS max':>8} {'USS max':>8} {'Thr':>4} {'Wakeups':>8} {'Life s':>7}")
+    for stats in sorted(seen, key=lambda s: s.first_seen):
+        if not stats.samples:
+            continue
+        cpu_avg = stats.cpu_total / stats.cpu_samples if stats.cpu_samples else 0.0
+        print(f"{stats.proc.pid:<8} {stats.role:<6} {stats.name[:16]:<16} {stats.samples:>7} "
+              f"{cpu_avg:>8.2f} {stats.cpu_max:>8.2f} "
+              f"{stats.rss_max:>8.2f} {stats.uss_max:>8.2f} {stats.threads_max:>4} "
+              f"{stats.wakeups:>8} {stats.last_seen - stats.first_seen:>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resource monitor for the overlay application")
+    parser.add_argument("--pid", type=int, help="PID to monitor (default: find 'main.py')")
+    parser.add_argument("--profile", action="store_true",
+                        help="track the whole process tree and write a CSV/JSONL timeline")
+    parser.add_argument("--interval", type=float,
+                        help="sampling interval in seconds (default: 1.0, profile mode: 0.25)")
+    parser.add_argument("--output", help="timeline path, .csv or .jsonl (profile mode)")
+    parser.add_argument("--duration", type=float, help="stop after N seconds (profile mode)")
+    args = parser.parse_args()
+
+    if args.profile:
+        profile(args.pid, args.interval or 0.25, args.output, args.duration)
+    else:
+        monitor(args.pid, args.interval or 1.0)
+
+
 if __name__ == "__main__":
-    monitor()
+    main()
@@ -0,0 +1,92 @@
+"""
+Compares CPU cost per frame of the two overlay render modes:
+widget tree ("widgets") vs single surface ("single_surface").
+
+Usage: python dev/render_benchmark.py [--frames 300] [--sizes 420x110,800x190]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Run headless and keep the benchmark away from the user's real settings.json
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+_config_home = tempfile.mkdtemp(prefix="overlay-bench-")
+os.environ["HOME"] = _config_home
+os.environ["APPDATA"] = _config_home
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt6.QtWidgets import QApplication
+
+
+def parse_sizes(value):
+    sizes = []
+    for item in value.split(","):
+        w, h = item.lower().split("x")
+        sizes.append((int(w), int(h)))
+    return sizes
+
+
+def run_frames(app, overlay, frames):
+    """Renders `frames` ticks (progress + label change + synchronous repaint)."""
+    cpu_samples = []
+    wall_samples = []
+    for i in range(frames):
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+
+        overlay.setProgress((i % 100) / 100.0)
+        overlay.left_text = f"{i % 90}min → Następna lekcja"
+        overlay.update_text_labels()
+        overlay.repaint()
+        app.processEvents()
+
+        cpu_samples.append((time.process_time() - cpu_start) * 1000)
+        wall_samples.append((time.perf_counter() - wall_start) * 1000)
+    return cpu_samples, wall_samples
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--sizes", type=parse_sizes, default=parse_sizes("420x110,800x190"))
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+
+    from src.overlay import OverlayWidget
+    from src.overlay.surface_renderer import RENDER_MODES
+
+    overlay = OverlayWidget(title="Programowanie obiektowe", left_text="45min → Bazy danych",
+                            right_text="A-113", progress=0.3)
+    overlay.show()
+    app.processEvents()
+
+    print(f"{'Mode':<16} | {'Size':<9} | {'CPU ms/frame':<12} | {'p95 CPU':<8} | {'Wall ms/frame':<13}")
+    print("-" * 70)
+    for width, height in args.sizes:
+        overlay.resize(width, height)
+        app.processEvents()
+        for mode in RENDER_MODES:
+            overlay.set_render_mode(mode)
+            app.processEvents()
+            run_frames(app, overlay, 20)  # warm-up (style sheets, glyph caches)
+            cpu, wall = run_frames(app, overlay, args.frames)
+            print(f"{mode:<16} | {width}x{height:<5} | {statistics.mean(cpu):<12.3f} | "
+                  f"{percentile(cpu, 95):<8.3f} | {statistics.mean(wall):<13.3f}")
+
+    overlay.update_manager.stop_timers()
+    overlay.settings_manager.stop_timers()
+
+
+if __name__ == "__main__":
+    main()
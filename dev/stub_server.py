@@ -0,0 +1,92 @@
+"""
+Local stub HTTP server standing in for the timetable API (offline testing and benchmarks).
+
+Usage: python dev/stub_server.py [--port 8765] [--segments 12] [--delay-ms 0]
+Then run the app with OVERLAY_API_URL=http://127.0.0.1:8765/
+or set "api_stub": true in settings.json (same default address).
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_timetable(count, start_minute=8 * 60, lesson_minutes=45, break_minutes=10):
+    """Builds a synthetic timetable with `count` segments (times wrap around midnight)."""
+    timetable = []
+    minute = start_minute
+    for i in range(count):
+        start = minute % 1440
+        end = (minute + lesson_minutes) % 1440
+        timetable.append({
+            "id": i,
+            "syllabus": f"Przedmiot {i}",
+            "start": f"{start // 60:02d}:{start % 60:02d}",
+            "end": f"{end // 60:02d}:{end % 60:02d}",
+            "hall": f"A-{100 + i % 50}",
+        })
+        minute += lesson_minutes + break_minutes
+    return timetable
+
+
+class StubServer:
+    """Serves one fixed timetable as JSON for every GET request."""
+
+    def __init__(self, port=0, segments=12, delay_ms=0):
+        self.delay = delay_ms / 1000.0
+        self.requests = 0
+        body = json.dumps(make_timetable(segments)).encode("utf-8")
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub timetable API server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--segments", type=int, default=12)
+    parser.add_argument("--delay-ms", type=int, default=0)
+    args = parser.parse_args()
+
+    server = StubServer(args.port, args.segments, args.delay_ms)
+    print(f"Serving {args.segments} segments at {server.url} (Ctrl+C to stop)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
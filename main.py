@@ -1,12 +1,42 @@
-from src.overlay import OverlayWidget
-from src.tray import Tray
-
+import argparse
 import multiprocessing
 import sys
-from PyQt6.QtWidgets import QApplication
+
+from src.single_instance import SingleInstance
+from src.log_manager import log_manager
+
+# Flagi wiersza poleceń -> polecenia IPC działającej instancji
+COMMAND_FLAGS = {
+    "show": "show",
+    "toggle": "toggle_overlay",
+    "settings": "open_settings",
+    "refresh": "refresh",
+}
+
+
+def parse_commands(argv):
+    parser = argparse.ArgumentParser(description="Overlay z planem zajęć")
+    parser.add_argument("--show", action="store_true", help="pokaż overlay")
+    parser.add_argument("--toggle", action="store_true", help="pokaż/ukryj overlay")
+    parser.add_argument("--settings", action="store_true", help="otwórz ustawienia")
+    parser.add_argument("--refresh", action="store_true", help="odśwież plan teraz")
+    args, _ = parser.parse_known_args(argv)
+    return [cmd for flag, cmd in COMMAND_FLAGS.items() if getattr(args, flag)]
+
 
 if __name__ == "__main__":
     multiprocessing.freeze_support()
+    commands = parse_commands(sys.argv[1:])
+
+    # Program już działa - przekaż polecenia i zakończ bez tworzenia QApplication
+    instance = SingleInstance()
+    if not instance.acquire():
+        sys.exit(instance.forward(commands or ["show"]))
+
+    # Importy dopiero tutaj - procesy potomne (spawn) ponownie importują ten moduł
+    from PyQt6.QtWidgets import QApplication
+    from src.overlay import OverlayWidget
+
     app = QApplication(sys.argv)
 
     overlay_widget = OverlayWidget(
@@ -22,11 +52,20 @@ if __name__ == "__main__":
     if hasattr(overlay_widget, "start_minute_updates"):
         overlay_widget.start_minute_updates()
     else:
-        print("Brak metody start_minute_updates w OverlayWidget")
+        log_manager.logger.warning("Brak metody start_minute_updates w OverlayWidget")
 
     if hasattr(overlay_widget, "animateProgressTo"):
         overlay_widget.animateProgressTo(0.25)
     else:
-        print("Brak metody animateProgressTo w OverlayWidget")
+        log_manager.logger.warning("Brak metody animateProgressTo w OverlayWidget")
+
+    remote_control = overlay_widget.remote_control
+    if remote_control.listening:
+        instance.publish(remote_control.server.port, remote_control.server.token)
+    for cmd in commands:
+        remote_control.handlers()[cmd]()
 
-    sys.exit(app.exec())
\ No newline at end of file
+    exit_code = app.exec()
+    log_manager.shutdown()
+    instance.release()
+    sys.exit(exit_code)
\ No newline at end of file
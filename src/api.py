@@ -1,12 +1,39 @@
 import requests
 import os
 import json
+import logging
 from datetime import datetime
 
+from src.ipc import IpcError
+from src.request_builder import RequestBuilder, InvalidGroupError, DEFAULT_ENDPOINT, STUB_BASE_URL
+
+logger = logging.getLogger(__name__)
+
 # Global session for connection pooling
 session = requests.Session()
 
-def fetch_timetable(settings=None):
+# Adres API planu (np. lokalny serwer stub: dev/stub_server.py)
+API_URL = os.getenv("OVERLAY_API_URL", "")
+REQUEST_TIMEOUT = 10
+
+# Budowniczy zapytań dla każdej konfiguracji (adres bazowy, endpoint) - cache URL-i zostaje między wywołaniami
+_request_builders = {}
+
+def get_request_builder(settings):
+    """Zwraca RequestBuilder dla konfiguracji z ustawień ("api_base_url", "api_endpoint", "api_stub")"""
+    base_url = settings.get("api_base_url") or (STUB_BASE_URL if settings.get("api_stub") else API_URL)
+    endpoint = settings.get("api_endpoint") or DEFAULT_ENDPOINT
+    key = (base_url, endpoint)
+    builder = _request_builders.get(key)
+    if builder is None:
+        builder = _request_builders[key] = RequestBuilder(base_url, endpoint)
+    return builder
+
+def fetch_timetable(settings=None, url=None):
+    """
+    Pobiera plan dla grup z ustawień; None przy braku grup lub błędzie.
+    url - gotowy adres zapytania dla tych grup (pomija budowę i walidację)
+    """
     try:
         if settings is None:
             settings = load_settings()
@@ -21,23 +48,48 @@ def fetch_timetable(settings=None):
             # print("Brak ustawionych grup") # Debug
             return None
 
-        # Pobierz ostatni znak (zakładając format np. "11K1" -> "1")
-        try:
-            group_c = group_c_val[-1]
-            group_k = group_k_val[-1]
-            group_l = group_l_val[-1]
-        except IndexError:
-            print("Błąd formatu grupy")
-            return None
+        # Adres zapytania (walidacja grup i budowa URL raz na trójkę grup)
+        if url is None:
+            try:
+                url = get_request_builder(settings).url_for(group_c_val, group_l_val, group_k_val)
+            except InvalidGroupError as e:
+                logger.warning("Błąd formatu grupy: %s", e)
+                return None
         
+        # Współdzielony cache na maszynie wieloużytkownikowej (src/cache_daemon.py)
+        if settings.get("cache_daemon"):
+            try:
+                return fetch_via_cache_daemon(settings)
+            except IpcError as e:
+                logger.info("Cache daemon unavailable, fetching directly: %s", e)
+
         # Use the global session
-        response = session.get()
+        response = session.get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()
     except requests.RequestException as e:
-        print(f"Error fetching timetable data: {e}")
+        logger.warning("Error fetching timetable data: %s", e)
         return None
 
+def fetch_via_cache_daemon(settings):
+    """Pobiera plan przez lokalny demon cache; rzuca IpcError gdy demon nie działa"""
+    from src.cache_daemon import DEFAULT_PORT, DaemonClient
+    # Demon pobiera z API klienta (stub, inny serwer) i trzyma je w osobnym cache
+    builder = get_request_builder(settings)
+    client = DaemonClient(settings.get("cache_daemon_port") or DEFAULT_PORT,
+                          settings.get("cache_daemon_secret_file") or None, timeout=REQUEST_TIMEOUT + 5)
+    try:
+        return client.request(
+            "fetch",
+            api_base_url=builder.base_url,
+            api_endpoint=builder.endpoint,
+            group_c=settings.get("group_c"),
+            group_l=settings.get("group_l"),
+            group_k=settings.get("group_k"),
+        )
+    finally:
+        client.close()
+
 def get_current_segment(timetable=None):
     if timetable is None:
         timetable = fetch_timetable()
@@ -77,5 +129,5 @@ def load_settings():
             return settings
         return {}
     except Exception as e:
-        print(f"Błąd wczytywania ustawień: {e}")
+        logger.error("Błąd wczytywania ustawień: %s", e)
         return {}
\ No newline at end of file
@@ -0,0 +1,310 @@
+"""
+Współdzielony demon cache planu zajęć dla maszyn wieloużytkownikowych (sale laboratoryjne).
+
+Każdy zalogowany użytkownik uruchamia własny overlay; zamiast N identycznych zapytań
+do API, overlaye z ustawieniem "cache_daemon": true pytają ten proces (TCP na localhost,
+protokół JSON-lines z src.ipc). Demon:
+  - trzyma odpowiedzi w cache przez TTL, osobno dla każdego API (adres bazowy
+    i endpoint klienta) i trójki grup,
+  - łączy równoczesne zapytania o ten sam klucz w jedno pobranie z API,
+  - przy błędzie API zwraca ostatnie znane dane.
+
+Uruchomienie (administrator):
+  python -m src.cache_daemon --init-secret   # tworzy sekret maszyny (chmod 640, grupa użytkowników overlay)
+  python -m src.cache_daemon [--port 47816] [--ttl 60] [--secret-file PATH]
+
+Port jest stały i znany, więc dowolny lokalny użytkownik mógłby go zająć
+pierwszy i podawać innym fałszywe plany. Dlatego klient i demon uwierzytelniają
+się wzajemnie sekretem maszyny (plik czytelny tylko dla uprawnionych): w
+poleceniu "hello" demon dowodzi znajomości sekretu (HMAC z nonce klienta),
+klient odpowiada tokenem sesji, a każda odpowiedź jest podpisana kluczem sesji.
+Klient bez dostępu do sekretu albo po nieudanej weryfikacji pobiera plan
+bezpośrednio z API.
+Moduł nie importuje PyQt.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import socket
+import socketserver
+import threading
+import time
+
+from src import api
+from src.request_builder import DEFAULT_ENDPOINT
+from src.ipc import IpcClient, IpcError
+from src.ipc.protocol import DEFAULT_HOST, MAX_MESSAGE_SIZE, encode, decode
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_PORT = 47816
+DEFAULT_TTL = 60
+GROUP_KEYS = ("group_c", "group_l", "group_k")
+API_KEYS = ("api_base_url", "api_endpoint")  # Adres API klienta - część klucza cache
+WAIT_TIMEOUT = api.REQUEST_TIMEOUT + 5  # Czekanie na pobranie rozpoczęte przez innego klienta
+SECRET_FILE = "cache_daemon.key"
+HELLO_CMD = "hello"
+
+
+def default_secret_path():
+    """Sekret wspólny dla maszyny (poza katalogami użytkowników)"""
+    if os.name == "nt":
+        return os.path.join(os.getenv("PROGRAMDATA", r"C:\ProgramData"), "OverlayApp", SECRET_FILE)
+    return os.path.join("/etc/overlay", SECRET_FILE)
+
+
+def load_secret(path=None):
+    """Czyta sekret; rzuca OSError/ValueError gdy go brak lub jest czytelny dla wszystkich"""
+    path = path or default_secret_path()
+    with open(path, "rb") as f:
+        # Windows: uprawnienia nadaje ACL katalogu OverlayApp w ProgramData
+        if os.name != "nt" and os.fstat(f.fileno()).st_mode & 0o007:
+            raise ValueError(f"{path} jest dostępny dla wszystkich użytkowników (wymagane np. chmod 640)")
+        secret = f.read().strip()
+    if len(secret) < 32:
+        raise ValueError(f"{path}: sekret jest za krótki")
+    return secret
+
+
+def create_secret(path=None):
+    """Tworzy nowy sekret (nie nadpisuje istniejącego) i zwraca ścieżkę"""
+    path = path or default_secret_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o640)
+    with os.fdopen(fd, "w", encoding="ascii") as f:
+        f.write(secrets.token_hex(32))
+    return path
+
+
+def _mac(key, *parts):
+    return hmac.new(key, ":".join(parts).encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _session(secret, client_nonce, server_nonce):
+    """(dowód demona, token klienta, klucz podpisu odpowiedzi) dla pary nonce"""
+    return (_mac(secret, "server", client_nonce, server_nonce),
+            _mac(secret, "client", client_nonce, server_nonce),
+            bytes.fromhex(_mac(secret, "session", client_nonce, server_nonce)))
+
+
+def _response_mac(session_key, message_id, result):
+    return _mac(session_key, "response", str(message_id), _canonical(result))
+
+
+class SharedTimetableCache:
+    """Cache planów z deduplikacją zapytań w toku (jedno pobranie na klucz: API + trójka grup)"""
+
+    def __init__(self, fetch, ttl=DEFAULT_TTL):
+        self._fetch = fetch
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}   # (adres bazowy, endpoint, grupy C/L/K) -> (czas pobrania, plan)
+        self._inflight = {}  # jw. -> threading.Event
+        self.stats = {"requests": 0, "hits": 0, "shared": 0, "upstream": 0, "errors": 0}
+
+    def get(self, key):
+        with self._lock:
+            self.stats["requests"] += 1
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                self.stats["hits"] += 1
+                return entry[1]
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self._inflight[key] = threading.Event()
+            else:
+                self.stats["shared"] += 1
+
+        if not leader:
+            # Ktoś już pobiera tę trójkę - poczekaj na jego wynik
+            event.wait(WAIT_TIMEOUT)
+            with self._lock:
+                entry = self._entries.get(key)
+            return entry[1] if entry else None
+
+        try:
+            timetable = self._fetch(key)
+        except Exception as e:
+            logger.error("Błąd pobierania planu %s: %s", key, e)
+            timetable = None
+
+        with self._lock:
+            self.stats["upstream"] += 1
+            if timetable is not None:
+                self._entries[key] = (time.monotonic(), timetable)
+            else:
+                self.stats["errors"] += 1
+            entry = self._entries.get(key)
+            del self._inflight[key]
+        event.set()
+        # Przy błędzie API - ostatnie znane dane (jeśli są)
+        return entry[1] if entry else None
+
+
+def fetch_upstream(key):
+    """Pobiera plan bezpośrednio z API klienta (ustawienia bez "cache_daemon" - bez pętli)"""
+    return api.fetch_timetable(dict(zip(API_KEYS + GROUP_KEYS, key)))
+
+
+class CacheDaemon(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    # Windows: SO_REUSEADDR pozwala innemu procesowi podpiąć się pod zajęty port
+    allow_reuse_address = os.name != "nt"
+
+    def __init__(self, port=DEFAULT_PORT, ttl=DEFAULT_TTL, fetch=fetch_upstream, secret=None):
+        self.secret = secret if secret is not None else load_secret()
+        self.cache = SharedTimetableCache(fetch, ttl)
+        super().__init__((DEFAULT_HOST, port), _RequestHandler)
+
+    def server_bind(self):
+        if os.name == "nt":
+            # Wyłączne użycie portu - nikt nie przejmie go, gdy demon działa
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        super().server_bind()
+
+    def handle_command(self, message):
+        cmd = message.get("cmd")
+        args = message.get("args") or {}
+        if cmd == "fetch":
+            groups = tuple(args.get(name) for name in GROUP_KEYS)
+            if not all(isinstance(value, str) and value for value in groups):
+                raise ValueError("group_c, group_l and group_k are required")
+            # Adres API rozwiązany przez klienta (brak - domyślne API demona)
+            base_url = args.get("api_base_url") or api.API_URL
+            endpoint = args.get("api_endpoint") or DEFAULT_ENDPOINT
+            if not isinstance(base_url, str) or not isinstance(endpoint, str):
+                raise ValueError("api_base_url and api_endpoint must be strings")
+            return self.cache.get((base_url, endpoint) + groups)
+        if cmd == "stats":
+            return dict(self.cache.stats)
+        raise ValueError(f"unknown command: {cmd}")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.session = None  # (token klienta, klucz podpisu) po udanym "hello"
+
+    def hello(self, args):
+        client_nonce = args.get("nonce")
+        if not isinstance(client_nonce, str) or len(client_nonce) < 16:
+            raise ValueError("nonce is required")
+        server_nonce = secrets.token_hex(16)
+        proof, client_token, session_key = _session(self.server.secret, client_nonce, server_nonce)
+        self.session = (client_token, session_key)
+        return {"nonce": server_nonce, "proof": proof}
+
+    def dispatch(self, message):
+        if message.get("cmd") == HELLO_CMD:
+            return {"result": self.hello(message.get("args") or {})}
+        if self.session is None or not hmac.compare_digest(str(message.get("token", "")), self.session[0]):
+            raise ValueError("unauthorized")
+        result = self.server.handle_command(message)
+        return {"result": result, "mac": _response_mac(self.session[1], message.get("id"), result)}
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline(MAX_MESSAGE_SIZE)
+            if not line:
+                return
+            try:
+                message = decode(line)
+            except ValueError:
+                self.wfile.write(encode({"ok": False, "error": "invalid request"}))
+                continue
+            response = {"id": message.get("id")}
+            try:
+                response.update(ok=True, **self.dispatch(message))
+            except ValueError as e:
+                response.update(ok=False, error=str(e))
+            except Exception as e:
+                # Np. niepoprawne, ale dekodowalne argumenty ("args": [1]) - odpowiedź zamiast zerwania połączenia
+                logger.error("Błąd obsługi polecenia %s: %s", message.get("cmd"), e)
+                response.update(ok=False, error=str(e))
+            self.wfile.write(encode(response))
+
+
+class DaemonClient:
+    """Klient demona: wzajemne uwierzytelnienie sekretem maszyny i sprawdzanie podpisu odpowiedzi"""
+
+    def __init__(self, port=DEFAULT_PORT, secret_path=None, timeout=WAIT_TIMEOUT, secret=None):
+        self._ipc = IpcClient(port, "", timeout=timeout)
+        self._secret_path = secret_path
+        self._secret = secret
+        self._session_key = None
+
+    def _handshake(self):
+        secret = self._secret
+        if secret is None:
+            try:
+                secret = load_secret(self._secret_path)
+            except (OSError, ValueError) as e:
+                raise IpcError(f"cache daemon secret unavailable: {e}") from e
+        client_nonce = secrets.token_hex(16)
+        result = self._ipc.request(HELLO_CMD, nonce=client_nonce)
+        if not isinstance(result, dict):
+            raise IpcError("cache daemon failed authentication")
+        server_nonce = str(result.get("nonce", ""))
+        proof, client_token, session_key = _session(secret, client_nonce, server_nonce)
+        if not hmac.compare_digest(str(result.get("proof", "")), proof):
+            # Port może być zajęty przez obcy proces podszywający się pod demona
+            logger.warning("Proces na porcie %s nie jest zaufanym demonem cache", self._ipc.port)
+            raise IpcError("cache daemon failed authentication")
+        self._ipc.token = client_token
+        self._session_key = session_key
+
+    def request(self, cmd, **args):
+        """Wysyła polecenie po uwierzytelnieniu; rzuca IpcError także przy złym podpisie odpowiedzi"""
+        if self._session_key is None:
+            self._handshake()
+        response = self._ipc.exchange(cmd, **args)
+        result = response.get("result")
+        expected = _response_mac(self._session_key, response.get("id"), result)
+        if not hmac.compare_digest(str(response.get("mac", "")), expected):
+            raise IpcError("cache daemon response failed authentication")
+        return result
+
+    def close(self):
+        self._ipc.close()
+        self._session_key = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Współdzielony cache planu zajęć")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--ttl", type=int, default=DEFAULT_TTL, help="czas ważności cache w sekundach")
+    parser.add_argument("--secret-file", default=None, help=f"plik sekretu (domyślnie {default_secret_path()})")
+    parser.add_argument("--init-secret", action="store_true", help="utwórz plik sekretu i zakończ")
+    args = parser.parse_args()
+
+    if args.init_secret:
+        path = create_secret(args.secret_file)
+        print(f"Utworzono {path} - nadaj grupę użytkowników overlay (np. chgrp overlay {path})")
+        return
+    try:
+        secret = load_secret(args.secret_file)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"Brak poprawnego sekretu demona: {e} (utwórz go: --init-secret)")
+
+    server = CacheDaemon(args.port, args.ttl, secret=secret)
+    print(f"Cache planu na {DEFAULT_HOST}:{args.port} (TTL {args.ttl} s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,56 @@
+import logging
 import multiprocessing
 import psutil
 import os
 import sys
+import time
 
-def run_fetch_process(settings, queue):
+from src.log_manager import log_manager
+from src.tracing import Trace, span
+
+logger = logging.getLogger(__name__)
+
+def run_fetch_process(settings, queue, trace_id=None, url=None):
     """
     Funkcja uruchamiana w osobnym procesie.
     Ustawia niski priorytet i pobiera dane.
+    Do kolejki trafia {"groups": [c, l, k], "timetable": plan lub None,
+    "fetch_s": czas samego pobierania (metryki procesu overlay)}, a przy
+    śledzeniu (trace_id) także "trace": {"id", "spans"} z etapami procesu.
+    Wpisy dziennika z procesu trafiają do "logs" (log_manager.replay w overlay).
+    url - adres zapytania policzony już w procesie overlay (None: budowany tutaj).
     NIE IMPORTUJE PYQT!
     """
+    entered = time.time()
+    collector = log_manager.collect(settings.get("log_level"))
+    groups = [settings.get("group_c"), settings.get("group_l"), settings.get("group_k")]
+    trace = Trace("fetch_worker", trace_id) if trace_id else None
+    result = {"groups": groups, "timetable": None}
     try:
         # Ustaw najniższy priorytet dla tego procesu
-        p = psutil.Process(os.getpid())
-        # Windows: IDLE_PRIORITY_CLASS, Linux: nice value
-        if os.name == 'nt':
-            p.nice(psutil.IDLE_PRIORITY_CLASS)
-        else:
-            p.nice(19)
+        with span(trace, "worker.renice"):
+            p = psutil.Process(os.getpid())
+            # Windows: IDLE_PRIORITY_CLASS, Linux: nice value
+            if os.name == 'nt':
+                p.nice(psutil.IDLE_PRIORITY_CLASS)
+            else:
+                p.nice(19)
             
         # Import tutaj, aby uniknąć problemów z cyklicznym importem
         # i upewnić się, że api jest ładowane w procesie potomnym
-        from src import api
+        with span(trace, "worker.import"):
+            from src import api
         
         # Pobierz dane
-        timetable = api.fetch_timetable(settings)
-        queue.put(timetable)
+        start = time.perf_counter()
+        with span(trace, "worker.http"):
+            result["timetable"] = api.fetch_timetable(settings, url)
+        result["fetch_s"] = time.perf_counter() - start
     except Exception as e:
-        print(f"Process error: {e}")
-        queue.put(None)
+        logger.error("Process error: %s", e)
+    if trace is not None:
+        trace.add("worker", entered, time.time())
+        result["trace"] = {"id": trace.trace_id, "spans": trace.spans}
+    if collector.records:
+        result["logs"] = collector.records
+    queue.put(result)
@@ -0,0 +1,7 @@
+"""
+Moduł ipc - lokalna komunikacja między procesem overlay a procesami tray i ustawień
+"""
+from .protocol import IpcError, TOKEN_ENV, UI_TIMEOUT
+from .client import IpcClient
+
+__all__ = ['IpcClient', 'IpcError', 'TOKEN_ENV', 'UI_TIMEOUT']
@@ -0,0 +1,88 @@
+"""
+Klient IPC (blokujący socket) dla procesów tray i ustawień
+"""
+import importlib
+import itertools
+import socket
+
+from .protocol import DEFAULT_HOST, MAX_MESSAGE_SIZE, IpcError, encode, decode
+
+
+class IpcClient:
+    """Wysyła polecenia do serwera IPC overlay i czeka na odpowiedź"""
+
+    def __init__(self, port, token, host=DEFAULT_HOST, timeout=2.0):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+        self._ids = itertools.count(1)
+
+    def _connect(self):
+        if self._sock is None:
+            self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            # Limit czasu obejmuje też wysłanie i odczyt odpowiedzi
+            self._sock.settimeout(self.timeout)
+            self._reader = self._sock.makefile("rb")
+        return self._sock
+
+    def connect(self):
+        """Nawiązuje połączenie od razu (zamiast przy pierwszym żądaniu)"""
+        try:
+            self._connect()
+        except OSError as e:
+            self.close()
+            raise IpcError(f"IPC connection failed: {e}") from e
+        return self
+
+    def close(self):
+        """Zamyka połączenie (kolejne żądanie połączy się ponownie)"""
+        if self._reader is not None:
+            self._reader.close()
+        if self._sock is not None:
+            self._sock.close()
+        self._sock = None
+        self._reader = None
+
+    def request(self, cmd, **args):
+        """Wysyła polecenie i zwraca wynik; rzuca IpcError przy błędzie"""
+        return self.exchange(cmd, **args).get("result")
+
+    def exchange(self, cmd, **args):
+        """Jak request, ale zwraca całą odpowiedź (np. z polami uwierzytelniania)"""
+        message = {"id": next(self._ids), "cmd": cmd, "token": self.token, "args": args}
+        data = encode(message)
+
+        # Ponowna próba tylko na ponownie użytym połączeniu - serwer mógł je zamknąć
+        # (polecenie na nowym połączeniu mogło już zostać wykonane, więc go nie powtarzamy)
+        while True:
+            reused = self._sock is not None
+            try:
+                self._connect().sendall(data)
+                line = self._reader.readline(MAX_MESSAGE_SIZE)
+                if not line:
+                    raise ConnectionError("connection closed by server")
+                break
+            except OSError as e:
+                self.close()
+                # Przekroczony czas - overlay nie odpowiada, ponowienie tylko wydłużyłoby blokadę
+                if not reused or isinstance(e, TimeoutError):
+                    raise IpcError(f"IPC connection failed: {e}") from e
+
+        try:
+            response = decode(line)
+        except ValueError as e:
+            raise IpcError(f"Invalid IPC response: {e}") from e
+        if not response.get("ok"):
+            raise IpcError(response.get("error", "unknown error"))
+        return response
+
+
+def run_client(module, port, token):
+    """
+    Cel procesu klienckiego (spawn) - moduł tray/ustawień jest importowany
+    dopiero w procesie potomnym, proces overlay go nie ładuje
+    """
+    importlib.import_module(module).main(port, token)
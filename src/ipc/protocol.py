@@ -0,0 +1,38 @@
+"""
+Protokół IPC - komunikaty JSON, jeden na linię (JSON-lines) przez TCP na localhost.
+
+Żądanie:    {"id": 1, "cmd": "get_state", "token": "...", "args": {...}}
+Odpowiedź:  {"id": 1, "ok": true, "result": ...} lub {"id": 1, "ok": false, "error": "..."}
+
+Moduł nie importuje PyQt - używają go też lekkie procesy klienckie.
+"""
+import json
+import secrets
+
+
+DEFAULT_HOST = "127.0.0.1"
+TOKEN_ENV = "OVERLAY_IPC_TOKEN"
+MAX_MESSAGE_SIZE = 1024 * 1024
+UI_TIMEOUT = 0.5  # Limit czasu żądań z wątku GUI (tray, ustawienia) - overlay odpowiada od razu
+
+
+class IpcError(Exception):
+    """Błąd komunikacji IPC lub błąd zwrócony przez serwer"""
+
+
+def make_token():
+    """Losowy token uwierzytelniający klientów (serwer słucha tylko na localhost)"""
+    return secrets.token_hex(16)
+
+
+def encode(message):
+    """Koduje komunikat jako jedną linię JSON"""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def decode(line):
+    """Dekoduje jedną linię JSON; rzuca ValueError dla niepoprawnych danych"""
+    message = json.loads(line.decode("utf-8"))
+    if not isinstance(message, dict):
+        raise ValueError("message must be a JSON object")
+    return message
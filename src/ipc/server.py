@@ -0,0 +1,85 @@
+"""
+Serwer IPC działający w procesie overlay (QTcpServer zintegrowany z pętlą zdarzeń Qt)
+"""
+import hmac
+import logging
+
+from PyQt6.QtCore import QObject
+from PyQt6.QtNetwork import QTcpServer, QHostAddress
+
+from .protocol import MAX_MESSAGE_SIZE, IpcError, encode, decode, make_token
+
+logger = logging.getLogger(__name__)
+
+
+class IpcServer(QObject):
+    """Przyjmuje polecenia JSON-lines na localhost i przekazuje je do handlerów"""
+
+    def __init__(self, handlers, token=None, port=0, parent=None):
+        super().__init__(parent)
+        self.handlers = handlers
+        self.token = token or make_token()
+        self._requested_port = port
+        self._server = QTcpServer(self)
+        self._server.newConnection.connect(self._on_new_connection)
+        self._sockets = set()
+
+    @property
+    def port(self):
+        return self._server.serverPort()
+
+    def start(self):
+        """Zaczyna nasłuchiwać na localhost; rzuca IpcError jeśli się nie uda"""
+        address = QHostAddress(QHostAddress.SpecialAddress.LocalHost)
+        if not self._server.listen(address, self._requested_port):
+            raise IpcError(f"IPC server failed to listen: {self._server.errorString()}")
+        return self
+
+    def stop(self):
+        self._server.close()
+        for sock in list(self._sockets):
+            sock.abort()
+        self._sockets.clear()
+
+    def _on_new_connection(self):
+        while self._server.hasPendingConnections():
+            sock = self._server.nextPendingConnection()
+            self._sockets.add(sock)
+            sock.readyRead.connect(lambda s=sock: self._on_ready_read(s))
+            sock.disconnected.connect(lambda s=sock: self._on_disconnected(s))
+
+    def _on_disconnected(self, sock):
+        self._sockets.discard(sock)
+        sock.deleteLater()
+
+    def _on_ready_read(self, sock):
+        while sock.canReadLine():
+            sock.write(self.dispatch(bytes(sock.readLine())))
+        sock.flush()  # Odpowiedź wychodzi od razu (np. przed zamknięciem po "quit")
+        if sock.bytesAvailable() > MAX_MESSAGE_SIZE:
+            sock.abort()  # Zbyt długa linia - niepoprawny klient
+
+    def dispatch(self, line):
+        """Obsługuje jedną linię żądania i zwraca zakodowaną odpowiedź"""
+        try:
+            message = decode(line)
+        except ValueError:
+            return encode({"ok": False, "error": "invalid request"})
+
+        response = {"id": message.get("id")}
+        if not hmac.compare_digest(str(message.get("token", "")), self.token):
+            response.update(ok=False, error="unauthorized")
+            return encode(response)
+
+        handler = self.handlers.get(message.get("cmd"))
+        if handler is None:
+            response.update(ok=False, error=f"unknown command: {message.get('cmd')}")
+            return encode(response)
+
+        try:
+            args = message.get("args") or {}
+            response.update(ok=True, result=handler(**args))
+        except Exception as e:
+            logger.error("Błąd obsługi polecenia IPC %s: %s", message.get("cmd"), e)
+            response.update(ok=False, error=str(e))
+        return encode(response)
@@ -0,0 +1,225 @@
+"""
+Dziennik zdarzeń aplikacji oparty na module logging: leniwe formatowanie
+(logger.warning("... %s", e)), tłumienie powtórzeń tego samego komunikatu,
+bufor ostatnich wpisów w pamięci (zrzucany z tray) oraz opcjonalny plik
+z rotacją zapisywany w wątku w tle. Poziom "off" kosztuje tylko sprawdzenie
+poziomu loggera. Wpisy procesu pobierania są zbierane (RecordCollector),
+odsyłane w wyniku i odtwarzane w procesie overlay (LogManager.replay).
+"""
+import collections
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+
+LOGGER_NAME = "src"  # Wspólny rodzic loggerów modułów (logging.getLogger(__name__))
+
+LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "off": logging.CRITICAL + 10,
+}
+DEFAULT_LEVEL = "warning"
+
+FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+RING_SIZE = 500             # Ostatnie wpisy trzymane w pamięci
+REPEAT_WINDOW_S = 60        # Ten sam komunikat najwyżej raz na minutę
+MAX_TRACKED_MESSAGES = 1000
+LOG_FILE = "overlay.log"
+DUMP_FILE = "overlay_log_dump.txt"
+LOG_MAX_BYTES = 512 * 1024
+LOG_BACKUP_COUNT = 3
+
+
+class RepeatFilter(logging.Filter):
+    """
+    Przepuszcza dany komunikat (logger, poziom, szablon) najwyżej raz na `window` s;
+    następny przepuszczony wpis podaje liczbę pominiętych powtórzeń.
+    Kluczem jest szablon, więc nic nie jest formatowane dla odrzuconych wpisów.
+    """
+
+    def __init__(self, window=REPEAT_WINDOW_S):
+        super().__init__()
+        self.window = window
+        self._seen = {}  # klucz -> [czas ostatniego przepuszczenia, liczba pominiętych]
+
+    def filter(self, record):
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        entry = self._seen.get(key)
+        if entry is not None and now - entry[0] < self.window:
+            entry[1] += 1
+            return False
+        if entry is not None and entry[1]:
+            record.msg = f"{record.msg} (pominięto powtórzeń: {entry[1]})"
+        if len(self._seen) >= MAX_TRACKED_MESSAGES:
+            self._seen.clear()
+        self._seen[key] = [now, 0]
+        return True
+
+
+class LogHub(logging.Handler):
+    """
+    Jedyny handler loggera aplikacji: filtr powtórzeń, bufor w pamięci
+    (rekordy niesformatowane) i przekazanie do ujść (konsola, kolejka pliku)
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.addFilter(RepeatFilter())
+        self.ring = collections.deque(maxlen=RING_SIZE)
+        self.sinks = []
+
+    def emit(self, record):
+        self.ring.append(record)
+        for sink in self.sinks:
+            if record.levelno >= sink.level:
+                sink.handle(record)
+
+
+class RecordCollector(logging.Handler):
+    """Zbiera wpisy procesu roboczego jako słowniki (do odesłania przez kolejkę wyników)"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self._formatter = logging.Formatter()
+
+    def emit(self, record):
+        message = record.getMessage()
+        if record.exc_info:
+            message += "\n" + self._formatter.formatException(record.exc_info)
+        self.records.append({
+            "name": record.name,
+            "levelno": record.levelno,
+            "levelname": record.levelname,
+            "msg": message,
+            "created": record.created,
+            "msecs": record.msecs,
+            "process": record.process,
+        })
+
+
+class LogManager:
+    """Konfiguracja dziennika aplikacji (jedna instancja na proces)"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.hub = None
+        self.config_dir = None
+        self.level = DEFAULT_LEVEL
+        self.to_file = False
+        self._formatter = logging.Formatter(FORMAT)
+        self._listener = None
+        self._queue_handler = None
+        self._lock = threading.Lock()
+
+    def setup(self, config_dir=None, level=DEFAULT_LEVEL, to_file=False):
+        """Podłącza handler do loggera aplikacji (wielokrotne wywołanie tylko zmienia konfigurację)"""
+        with self._lock:
+            if config_dir:
+                self.config_dir = config_dir
+            if self.hub is None:
+                self.hub = LogHub()
+                # Konsola tylko gdy istnieje (w spakowanym .exe bez konsoli sys.stderr to None)
+                if sys.stderr is not None:
+                    console = logging.StreamHandler(sys.stderr)
+                    console.setFormatter(self._formatter)
+                    self.hub.sinks.append(console)
+                self.logger.addHandler(self.hub)
+                self.logger.propagate = False
+        self.configure(level, to_file)
+
+    def configure(self, level=None, to_file=None):
+        """Zmienia poziom i/lub zapis do pliku; None - bez zmian"""
+        if self.hub is None:
+            self.setup(level=level or DEFAULT_LEVEL, to_file=bool(to_file))
+            return
+        if level is not None:
+            self.level = level if level in LEVELS else DEFAULT_LEVEL
+            self.logger.setLevel(LEVELS[self.level])
+        if to_file is not None:
+            self.to_file = bool(to_file)
+            if self.to_file and self.config_dir:
+                self._start_file()
+            else:
+                self._stop_file()
+
+    def _start_file(self):
+        """Plik z rotacją zapisywany przez QueueListener (wątek w tle)"""
+        if self._listener is not None:
+            return
+        try:
+            file_handler = logging.handlers.RotatingFileHandler(
+                os.path.join(self.config_dir, LOG_FILE), maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUP_COUNT, encoding="utf-8", delay=True)
+        except OSError as e:
+            self.logger.error("Nie można otworzyć pliku dziennika: %s", e)
+            return
+        file_handler.setFormatter(self._formatter)
+        records = queue.SimpleQueue()
+        self._queue_handler = logging.handlers.QueueHandler(records)
+        self._listener = logging.handlers.QueueListener(records, file_handler)
+        self._listener.start()
+        self.hub.sinks.append(self._queue_handler)
+
+    def _stop_file(self):
+        if self._listener is None:
+            return
+        self.hub.sinks.remove(self._queue_handler)
+        self._listener.stop()  # Zapisuje wpisy pozostałe w kolejce
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+        self._queue_handler = None
+
+    def collect(self, level=None):
+        """
+        W procesie roboczym: wpisy trafiają tylko do zwróconego kolektora
+        (handlery odziedziczone po procesie overlay są odłączane)
+        """
+        collector = RecordCollector()
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+        self.logger.addHandler(collector)
+        self.logger.propagate = False
+        self.logger.setLevel(LEVELS.get(level, LEVELS[DEFAULT_LEVEL]))
+        return collector
+
+    def replay(self, records):
+        """Wpisy odesłane przez proces roboczy - przez te same filtry i ujścia co własne"""
+        for data in records or ():
+            logger = logging.getLogger(data["name"])
+            if logger.isEnabledFor(data["levelno"]):
+                logger.handle(logging.makeLogRecord(data))
+
+    def dump(self, path=None):
+        """Zapisuje bufor ostatnich wpisów do pliku; zwraca ścieżkę lub None"""
+        if self.hub is None:
+            return None
+        if path is None:
+            if not self.config_dir:
+                return None
+            path = os.path.join(self.config_dir, DUMP_FILE)
+        records = list(self.hub.ring)
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                for record in records:
+                    f.write(self._formatter.format(record) + "\n")
+        except OSError as e:
+            self.logger.error("Błąd zapisu dziennika: %s", e)
+            return None
+        return path
+
+    def shutdown(self):
+        """Opróżnia kolejkę pliku (przy zamykaniu aplikacji)"""
+        self._stop_file()
+
+
+log_manager = LogManager()
@@ -0,0 +1,203 @@
+"""
+Rejestr metryk (liczniki, wskaźniki, histogramy) eksportowany w formacie
+tekstowym Prometheus: przez HTTP na localhost i/lub do pliku dla textfile
+collectora node_exportera. Wyłączony rejestr kosztuje przy każdym pomiarze
+tylko sprawdzenie flagi; tekst jest budowany dopiero przy odczycie.
+Moduł nie importuje PyQt - działa też w demonie cache.
+"""
+import bisect
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 47817
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names, values, extra=()):
+    """{a="1",b="2"} z nazw i wartości etykiet (pusty napis gdy brak etykiet)"""
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Wspólna część metryk: nazwa, opis, nazwy etykiet i wartości per krotka etykiet"""
+
+    type = "untyped"
+    __slots__ = ("registry", "name", "help", "labelnames", "values")
+
+    def __init__(self, registry, name, help, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+    def lines(self):
+        lines = self.header()
+        # Kopia słownika - zapis z wątku GUI nie przeszkadza w odczycie z wątku HTTP
+        for labels, value in dict(self.values).items():
+            lines.append(f"{self.name}{format_labels(self.labelnames, labels)} {format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+    __slots__ = ()
+
+    def inc(self, amount=1.0, labels=()):
+        if not self.registry.enabled:
+            return
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+    __slots__ = ()
+
+    def set(self, value, labels=()):
+        if not self.registry.enabled:
+            return
+        self.values[labels] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+    __slots__ = ("buckets",)
+
+    def __init__(self, registry, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, labels=()):
+        if not self.registry.enabled:
+            return
+        state = self.values.get(labels)
+        if state is None:
+            # [liczniki kubełków (ostatni: +Inf), suma, liczba]
+            state = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def lines(self):
+        lines = self.header()
+        for labels, (counts, total, count) in dict(self.values).items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), list(counts)):
+                cumulative += bucket_count
+                le = format_labels(self.labelnames, labels, (("le", format_value(bound)),))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_str = format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {format_value(total)}")
+            lines.append(f"{self.name}_count{label_str} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metryki procesu (jedna instancja: `registry`); domyślnie wyłączony"""
+
+    def __init__(self):
+        self.enabled = False
+        self._metrics = {}
+        self._collectors = []
+
+    def _get(self, cls, name, help, labelnames, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(self, name, help, labelnames, **kwargs)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name, help, labelnames=()):
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def add_collector(self, collector):
+        """Rejestruje funkcję zwracającą gotowe linie (wartości liczone przy odczycie)"""
+        self._collectors.append(collector)
+
+    def remove_collector(self, collector):
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def render(self):
+        """Wszystkie metryki w formacie tekstowym Prometheus"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            if metric.values:
+                lines.extend(metric.lines())
+        for collector in list(self._collectors):
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Zapisuje metryki do pliku (atomowo - collector nie czyta połowy pliku)"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+
+registry = MetricsRegistry()
+
+
+class MetricsServer:
+    """Endpoint /metrics na localhost obsługiwany w wątku w tle"""
+
+    def __init__(self, registry, port=DEFAULT_PORT, host=DEFAULT_HOST):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
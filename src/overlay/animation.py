@@ -0,0 +1,120 @@
+"""
+Moduł animacji overlay - wszystkie przejścia napędzane jednym zegarem klatek
+"""
+from PyQt6.QtCore import QObject, QTimer, QElapsedTimer, QEasingCurve, QRect
+
+from src.overlay.instrumentation import instrumentation
+
+
+FRAME_INTERVAL_MS = 16  # ~60 FPS, zegar działa tylko gdy trwa jakieś przejście
+
+
+def _interpolate(start, end, t):
+    if isinstance(start, QRect):
+        return QRect(
+            round(start.x() + (end.x() - start.x()) * t),
+            round(start.y() + (end.y() - start.y()) * t),
+            round(start.width() + (end.width() - start.width()) * t),
+            round(start.height() + (end.height() - start.height()) * t),
+        )
+    return start + (end - start) * t
+
+
+def _distance(a, b):
+    """Największa różnica składowych (dla QRect w pikselach)"""
+    if isinstance(a, QRect):
+        return max(abs(a.x() - b.x()), abs(a.y() - b.y()),
+                   abs(a.width() - b.width()), abs(a.height() - b.height()))
+    return abs(b - a)
+
+
+class Transition:
+    """Stan jednego przejścia - obiekt tworzony raz na nazwę i używany ponownie"""
+    __slots__ = ("setter", "start", "end", "duration", "curve", "quantum",
+                 "on_finished", "started_at", "last_value", "active")
+
+    def __init__(self):
+        self.curve = QEasingCurve()
+        self.active = False
+
+
+class AnimationCoordinator(QObject):
+    """
+    Przejścia (postęp, geometria, obrót strzałki) jako nazwane wpisy napędzane
+    jednym QTimer. Zmiany mniejsze niż `quantum` (np. 1 px) nie są rysowane,
+    a w trybie ograniczonego ruchu przejście to jedno ustawienie wartości końcowej.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.reduced_motion = False
+        self._transitions = {}
+        self._clock = QElapsedTimer()
+        self._clock.start()
+        self.frame_timer = QTimer(self)
+        self.frame_timer.timeout.connect(self._on_frame)
+        instrumentation.register_timer(self.frame_timer, "AnimationCoordinator.frame_timer")
+
+    def animate(self, name, start, end, duration_ms, setter,
+                easing=QEasingCurve.Type.InOutCubic, quantum=1.0, on_finished=None):
+        """Uruchamia (lub zastępuje) przejście o danej nazwie"""
+        transition = self._transitions.get(name)
+        if transition is None:
+            transition = self._transitions[name] = Transition()
+        transition.setter = setter
+        transition.start = start
+        transition.end = end
+        transition.duration = duration_ms
+        transition.quantum = quantum
+        transition.on_finished = on_finished
+        if transition.curve.type() != easing:
+            transition.curve.setType(easing)
+
+        if self.reduced_motion or duration_ms <= 0 or _distance(start, end) < quantum:
+            # Bez animacji: jedno ustawienie wartości (jedno przerysowanie)
+            transition.active = False
+            setter(end)
+            if on_finished:
+                on_finished()
+            return
+
+        transition.started_at = self._clock.elapsed()
+        transition.last_value = start
+        transition.active = True
+        setter(start)
+        if not self.frame_timer.isActive():
+            self.frame_timer.start(FRAME_INTERVAL_MS)
+
+    def stop(self, name):
+        """Przerywa przejście bez ustawiania wartości końcowej"""
+        transition = self._transitions.get(name)
+        if transition is not None:
+            transition.active = False
+
+    def is_running(self, name):
+        transition = self._transitions.get(name)
+        return transition is not None and transition.active
+
+    def _on_frame(self):
+        now = self._clock.elapsed()
+        finished = []
+        for transition in self._transitions.values():
+            if not transition.active:
+                continue
+            progress = (now - transition.started_at) / transition.duration
+            if progress >= 1.0:
+                transition.active = False
+                transition.setter(transition.end)
+                if transition.on_finished:
+                    finished.append(transition.on_finished)
+                continue
+            value = _interpolate(transition.start, transition.end, transition.curve.valueForProgress(progress))
+            if _distance(value, transition.last_value) >= transition.quantum:
+                transition.last_value = value
+                transition.setter(value)
+
+        # Wywołania zwrotne po pętli - mogą uruchamiać kolejne przejścia
+        for callback in finished:
+            callback()
+        if not any(transition.active for transition in self._transitions.values()):
+            self.frame_timer.stop()
@@ -0,0 +1,83 @@
+"""
+Debug HUD - nakładka ze statystykami renderowania na overlay
+"""
+import logging
+
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtGui import QColor, QPainter, QFont, QFontMetrics
+from PyQt6.QtCore import Qt, QTimer
+
+from src.overlay.instrumentation import instrumentation
+
+logger = logging.getLogger(__name__)
+
+
+HUD_BG_COLOR = QColor(0, 0, 0, 170)
+HUD_TEXT_COLOR = QColor(120, 255, 140)
+DUMP_EVERY_TICKS = 5  # Zrzut JSON co 5 odświeżeń HUD (5 s)
+
+
+class DebugHud(QWidget):
+    """Półprzezroczysty panel ze statystykami, odświeżany raz na sekundę"""
+
+    def __init__(self, parent, dump_path=None):
+        super().__init__(parent)
+        self.dump_path = dump_path
+        self._lines = []
+        self._ticks = 0
+
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+
+        self._font = QFont("monospace")
+        self._font.setStyleHint(QFont.StyleHint.Monospace)
+        self._font.setPixelSize(9)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+
+    def start(self):
+        self._ticks = 0
+        self.refresh()
+        self.show()
+        self.raise_()
+        self.timer.start(1000)
+
+    def stop(self):
+        self.timer.stop()
+        self.hide()
+        self._dump()
+
+    def refresh(self):
+        """Pobiera linie statystyk, dopasowuje rozmiar i co kilka sekund zapisuje JSON"""
+        self._lines = instrumentation.hud_lines() or ["(brak danych)"]
+        metrics = QFontMetrics(self._font)
+        width = max(metrics.horizontalAdvance(line) for line in self._lines) + 8
+        height = metrics.height() * len(self._lines) + 6
+        parent = self.parentWidget()
+        self.setGeometry(0, 0, min(width, parent.width()), min(height, parent.height()))
+        self.raise_()
+        self.update()
+
+        self._ticks += 1
+        if self._ticks % DUMP_EVERY_TICKS == 0:
+            self._dump()
+
+    def _dump(self):
+        if not self.dump_path:
+            return
+        try:
+            instrumentation.dump_json(self.dump_path)
+        except OSError as e:
+            logger.error("Błąd zapisu statystyk debug: %s", e)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), HUD_BG_COLOR)
+        painter.setFont(self._font)
+        painter.setPen(HUD_TEXT_COLOR)
+        line_height = QFontMetrics(self._font).height()
+        y = 3 + QFontMetrics(self._font).ascent()
+        for line in self._lines:
+            painter.drawText(4, y, line)
+            y += line_height
@@ -0,0 +1,176 @@
+"""
+Instrumentacja renderowania overlay - liczniki i czasy malowań, wybudzenia timerów,
+wywołania setStyleSheet. Włączana zmienną środowiskową OVERLAY_DEBUG_HUD=1
+lub ukrytą akcją w tray (Shift + prawy przycisk). Wyłączona nie kosztuje nic
+poza sprawdzeniem jednej flagi.
+"""
+import functools
+import json
+import os
+import time
+
+
+ENV_VAR = "OVERLAY_DEBUG_HUD"
+
+# Górne granice kubełków histogramu czasu malowania (ms); ostatni kubełek to "więcej"
+PAINT_BUCKETS_MS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 33.0)
+
+
+class PaintStats:
+    """Statystyki malowania jednego widgetu"""
+
+    __slots__ = ("count", "total_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(PAINT_BUCKETS_MS) + 1)
+
+    def add(self, duration_ms):
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+        for i, limit in enumerate(PAINT_BUCKETS_MS):
+            if duration_ms <= limit:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def to_dict(self):
+        labels = [f"<={limit}ms" for limit in PAINT_BUCKETS_MS] + [f">{PAINT_BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 4) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 4),
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class Instrumentation:
+    """Zbiera statystyki renderowania (jedna instancja na proces)"""
+
+    def __init__(self):
+        self.enabled = False
+        self._consumers = set()  # Kto potrzebuje statystyk (HUD, eksport metryk)
+        self._timers = []  # (nazwa, QTimer, slot licznika lub None)
+        self.reset()
+
+    def reset(self):
+        """Zeruje wszystkie liczniki"""
+        self.started_at = time.monotonic()
+        self.paints = {}
+        self.timer_wakeups = {}
+        self.stylesheet_calls = {}
+
+    def set_enabled(self, enabled, consumer="hud"):
+        """
+        Włącza/wyłącza zbieranie dla danego odbiorcy; zbieranie trwa, dopóki
+        potrzebuje go choć jeden. Podłącza lub odłącza liczniki zarejestrowanych timerów.
+        """
+        if enabled:
+            self._consumers.add(consumer)
+        else:
+            self._consumers.discard(consumer)
+        enabled = bool(self._consumers)
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        if enabled:
+            self.reset()
+        for i, (name, timer, slot) in enumerate(self._timers):
+            self._timers[i] = (name, timer, self._connect_timer(name, timer) if enabled
+                               else self._disconnect_timer(timer, slot))
+
+    # ===== Rejestracja źródeł =====
+    def register_timer(self, timer, name):
+        """Rejestruje QTimer, którego wybudzenia mają być liczone"""
+        slot = self._connect_timer(name, timer) if self.enabled else None
+        self._timers.append((name, timer, slot))
+
+    def _connect_timer(self, name, timer):
+        slot = functools.partial(self.count_timer, name)
+        try:
+            timer.timeout.connect(slot)
+        except RuntimeError:
+            return None  # Timer został już usunięty po stronie Qt
+        return slot
+
+    def _disconnect_timer(self, timer, slot):
+        if slot is not None:
+            try:
+                timer.timeout.disconnect(slot)
+            except (RuntimeError, TypeError):
+                pass
+        return None
+
+    # ===== Zliczanie =====
+    def record_paint(self, name, duration_ms):
+        stats = self.paints.get(name)
+        if stats is None:
+            stats = self.paints[name] = PaintStats()
+        stats.add(duration_ms)
+
+    def count_timer(self, name):
+        self.timer_wakeups[name] = self.timer_wakeups.get(name, 0) + 1
+
+    def count_stylesheet(self, name):
+        self.stylesheet_calls[name] = self.stylesheet_calls.get(name, 0) + 1
+
+    # ===== Raportowanie =====
+    def snapshot(self):
+        """Zwraca wszystkie statystyki jako słownik (do zrzutu JSON)"""
+        return {
+            "timestamp": time.time(),
+            "elapsed_s": round(time.monotonic() - self.started_at, 3),
+            "paints": {name: stats.to_dict() for name, stats in self.paints.items()},
+            "timer_wakeups": dict(self.timer_wakeups),
+            "stylesheet_calls": dict(self.stylesheet_calls),
+        }
+
+    def hud_lines(self):
+        """Zwraca krótkie linie tekstu do wyświetlenia w HUD"""
+        elapsed = max(0.001, time.monotonic() - self.started_at)
+        lines = []
+        for name, stats in sorted(self.paints.items()):
+            avg = stats.total_ms / stats.count if stats.count else 0.0
+            lines.append(f"{name}: {stats.count / elapsed:.1f}/s avg {avg:.2f} max {stats.max_ms:.2f}ms")
+        if self.timer_wakeups:
+            wakeups = sum(self.timer_wakeups.values())
+            lines.append(f"timers: {wakeups / elapsed:.1f}/s ({wakeups})")
+        if self.stylesheet_calls:
+            lines.append(f"setStyleSheet: {sum(self.stylesheet_calls.values())}")
+        return lines
+
+    def dump_json(self, path):
+        """Zapisuje statystyki do pliku JSON (atomowo)"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+
+
+instrumentation = Instrumentation()
+
+
+def instrumented_paint(name):
+    """Dekorator paintEvent mierzący czas malowania, gdy instrumentacja jest włączona"""
+    def decorator(paint_event):
+        @functools.wraps(paint_event)
+        def wrapper(self, event):
+            if not instrumentation.enabled:
+                return paint_event(self, event)
+            start = time.perf_counter()
+            result = paint_event(self, event)
+            instrumentation.record_paint(name, (time.perf_counter() - start) * 1000)
+            return result
+        return wrapper
+    return decorator
+
+
+def set_stylesheet(widget, stylesheet, site):
+    """widget.setStyleSheet liczone osobno dla każdego wywołania (site - miejsce wywołania)"""
+    if instrumentation.enabled:
+        instrumentation.count_stylesheet(site)
+    widget.setStyleSheet(stylesheet)
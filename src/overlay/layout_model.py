@@ -0,0 +1,167 @@
+"""
+Model układu overlay - geometria obszarów interaktywnych liczona raz na zmianę rozmiaru
+"""
+from PyQt6.QtCore import QRectF
+from PyQt6.QtGui import QPainterPath, QFont, QFontMetricsF
+
+
+# Obszary hit-testingu overlay
+REGION_NONE = None
+REGION_RESIZE = "resize"
+REGION_TOGGLE = "toggle"
+REGION_DRAG = "drag"
+
+CORNER_RADIUS = 20
+TOGGLE_BUTTON_SIZE = 24
+TOGGLE_BUTTON_OFFSET_RIGHT = 32
+TOGGLE_BUTTON_OFFSET_TOP = 8
+
+
+def scaled_metrics(scale, is_small):
+    """Zwraca wymiary treści overlay (czcionki, marginesy, pasek) dla danej skali i stanu"""
+    if is_small:
+        # Base values for Small state
+        return {
+            "font_title": 16 * scale,
+            "font_time": 10 * scale,  # Not visible but calculated
+            "font_place": 10 * scale,
+            "h_progress": max(2, int(6 * scale)),
+            "margin_v": int(16 * scale),
+            "margin_h_left": int(20 * scale),
+            "margin_h_right": int(35 * scale),
+            "spacing": int(2 * scale),
+            "place_radius": int(6 * scale),
+            "place_padding": int(6 * scale),
+            "place_min_h": int(14 * scale),
+            "place_min_w": 30 * scale,
+        }
+    # Base values for Large state
+    return {
+        "font_title": 19 * scale,
+        "font_time": 13 * scale,
+        "font_place": 12 * scale,
+        "h_progress": max(4, int(8 * scale)),
+        "margin_v": int(10 * scale),
+        "margin_h_left": int(25 * scale),
+        "margin_h_right": int(35 * scale),
+        "spacing": int(5 * scale),
+        "place_radius": int(12 * scale),
+        "place_padding": int(10 * scale),
+        "place_min_h": int(24 * scale),
+        "place_min_w": 40 * scale,
+    }
+
+
+def _pixel_font(size, weight=QFont.Weight.Normal):
+    font = QFont()
+    font.setPixelSize(max(1, round(size)))
+    font.setWeight(weight)
+    return font
+
+
+class OverlayLayout:
+    """
+    Geometria obszarów interaktywnych overlay (uchwyt resize, przycisk, obszar drag)
+    oraz obszarów treści dla trybu jednej warstwy. Liczona w resizeEvent, czytana zarówno przez renderer, jak i MouseHandler -
+    hit-testing nie zależy więc od tego, czy odbyło się malowanie.
+    """
+
+    def __init__(self):
+        self.width = 0
+        self.height = 0
+        self.scale_factor = 1.0
+        self.is_small = False
+        self.generation = 0  # Rośnie przy każdej zmianie - klucz dla cache'y zależnych od układu
+        self.metrics = scaled_metrics(1.0, False)
+
+        self.rect = QRectF()
+        self.drag_rect = QRectF()
+        self.resize_handle_rect = QRectF()
+        self.toggle_button_rect = QRectF()
+
+        # Obszary treści (używane w trybie jednej warstwy)
+        self.title_rect = QRectF()
+        self.bar_rect = QRectF()
+        self.info_rect = QRectF()
+        self.title_font = QFont()
+        self.time_font = QFont()
+        self.place_font = QFont()
+
+        # Ścieżki do malowania (bez alokacji w paintEvent)
+        self.background_path = QPainterPath()
+        self.resize_handle_path = QPainterPath()
+
+    def update(self, width, height, scale_factor, is_small=False):
+        """Przelicza geometrię dla nowego rozmiaru; zwraca True jeśli coś się zmieniło"""
+        key = (width, height, scale_factor, is_small)
+        if key == (self.width, self.height, self.scale_factor, self.is_small):
+            return False
+
+        self.width, self.height, self.scale_factor, self.is_small = key
+        self.generation += 1
+
+        self.rect = QRectF(0, 0, width, height)
+        self.drag_rect = QRectF(self.rect)
+
+        # Uchwyt resize w lewym dolnym rogu
+        handle_size = int(20 * scale_factor)
+        self.resize_handle_rect = QRectF(0, height - handle_size, handle_size, handle_size)
+
+        # Przycisk zwijania w prawym górnym rogu
+        self.toggle_button_rect = QRectF(
+            width - TOGGLE_BUTTON_OFFSET_RIGHT,
+            TOGGLE_BUTTON_OFFSET_TOP,
+            TOGGLE_BUTTON_SIZE,
+            TOGGLE_BUTTON_SIZE
+        )
+
+        self.background_path = QPainterPath()
+        self.background_path.addRoundedRect(self.rect, CORNER_RADIUS, CORNER_RADIUS)
+
+        # Trójkąt: (0, h) -> (handle, h) -> (0, h - handle)
+        self.resize_handle_path = QPainterPath()
+        self.resize_handle_path.moveTo(0, height)
+        self.resize_handle_path.lineTo(handle_size, height)
+        self.resize_handle_path.lineTo(0, height - handle_size)
+        self.resize_handle_path.closeSubpath()
+
+        self._update_content_rects()
+        return True
+
+    def _update_content_rects(self):
+        """Odwzorowuje układ QVBoxLayout (nagłówek, pasek, info) bez widgetów potomnych"""
+        m = scaled_metrics(self.scale_factor, self.is_small)
+        self.metrics = m
+        self.title_font = _pixel_font(m["font_title"], QFont.Weight.DemiBold)
+        self.time_font = _pixel_font(m["font_time"])
+        self.place_font = _pixel_font(m["font_place"], QFont.Weight.Medium)
+
+        left = m["margin_h_left"]
+        content_w = max(0, self.width - left - m["margin_h_right"])
+        content_h = max(0, self.height - 2 * m["margin_v"])
+
+        title_h = QFontMetricsF(self.title_font).height()
+        bar_h = m["h_progress"]
+        total_h = title_h + m["spacing"] + bar_h
+        info_h = 0
+        if not self.is_small:
+            info_h = max(QFontMetricsF(self.time_font).height(), m["place_min_h"])
+            total_h += m["spacing"] + info_h
+
+        # Wyśrodkuj blok treści w pionie (jak QVBoxLayout z rozciągniętymi elementami)
+        y = m["margin_v"] + max(0, (content_h - total_h) / 2)
+        self.title_rect = QRectF(left, y, content_w, title_h)
+        y += title_h + m["spacing"]
+        self.bar_rect = QRectF(left, y, content_w, bar_h)
+        y += bar_h + m["spacing"]
+        self.info_rect = QRectF(left, y, content_w, info_h)
+
+    def hit_test(self, pos, scaling_enabled, drag_enabled):
+        """Zwraca obszar overlay pod podanym punktem (współrzędne lokalne)"""
+        if scaling_enabled and self.resize_handle_rect.contains(pos):
+            return REGION_RESIZE
+        if self.toggle_button_rect.contains(pos):
+            return REGION_TOGGLE
+        if drag_enabled and self.drag_rect.contains(pos):
+            return REGION_DRAG
+        return REGION_NONE
@@ -0,0 +1,121 @@
+"""
+Moduł eksportu metryk overlay - endpoint Prometheus na localhost i okresowo
+zapisywany plik tekstowy (node_exporter textfile collector)
+"""
+import logging
+import os
+
+from PyQt6.QtCore import QObject, QTimer
+
+from src.metrics import registry, MetricsServer, format_labels, format_value, DEFAULT_PORT
+from src.overlay.instrumentation import instrumentation, PAINT_BUCKETS_MS
+
+logger = logging.getLogger(__name__)
+
+TEXTFILE_NAME = "overlay.prom"
+DEFAULT_TEXTFILE_INTERVAL_S = 60
+
+
+def instrumentation_lines():
+    """Malowania, wybudzenia timerów i setStyleSheet z instrumentacji renderowania"""
+    lines = []
+    paints = dict(instrumentation.paints)
+    if paints:
+        lines += ["# HELP overlay_paint_seconds Czas paintEvent", "# TYPE overlay_paint_seconds histogram"]
+        bounds = [limit / 1000 for limit in PAINT_BUCKETS_MS] + [float("inf")]
+        for widget, stats in paints.items():
+            cumulative = 0
+            for bound, count in zip(bounds, list(stats.buckets)):
+                cumulative += count
+                le = format_labels(("widget",), (widget,), (("le", format_value(bound)),))
+                lines.append(f"overlay_paint_seconds_bucket{le} {cumulative}")
+            label = format_labels(("widget",), (widget,))
+            lines.append(f"overlay_paint_seconds_sum{label} {format_value(stats.total_ms / 1000)}")
+            lines.append(f"overlay_paint_seconds_count{label} {stats.count}")
+    for name, help, values, label in (
+            ("overlay_timer_wakeups_total", "Wybudzenia timerów", instrumentation.timer_wakeups, "timer"),
+            ("overlay_stylesheet_calls_total", "Wywołania setStyleSheet", instrumentation.stylesheet_calls, "site")):
+        values = dict(values)
+        if values:
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} counter"]
+            lines += [f"{name}{format_labels((label,), (key,))} {count}" for key, count in values.items()]
+    return lines
+
+
+class MetricsExporter(QObject):
+    """
+    Włącza rejestr metryk (opcja "metrics_enabled") i udostępnia go na
+    127.0.0.1:<metrics_port>/metrics oraz w pliku "metrics_textfile"
+    (domyślnie overlay.prom w katalogu konfiguracji) co "metrics_textfile_interval" s.
+    """
+
+    def __init__(self, widget):
+        super().__init__(widget)
+        self.widget = widget
+        self.server = None
+        self.textfile = None
+        self._port = None
+        self.textfile_timer = QTimer(self)
+        self.textfile_timer.timeout.connect(self.write_textfile)
+        instrumentation.register_timer(self.textfile_timer, "MetricsExporter.textfile_timer")
+
+    def configure(self, settings):
+        """Stosuje ustawienia metryk (wywoływane przy każdej zmianie ustawień)"""
+        enabled = bool(settings.get("metrics_enabled", False))
+        if enabled != registry.enabled:
+            registry.enabled = enabled
+            instrumentation.set_enabled(enabled, consumer="metrics")
+            if enabled:
+                registry.add_collector(self._collect)
+            else:
+                registry.remove_collector(self._collect)
+        if not enabled:
+            self.stop()
+            return
+
+        port = settings.get("metrics_port", DEFAULT_PORT)
+        if self.server is not None and port != self._port:
+            self._stop_server()
+        if self.server is None and port:
+            try:
+                self.server = MetricsServer(registry, port).start()
+                self._port = port
+            except OSError as e:
+                logger.warning("Nie można uruchomić endpointu metryk na porcie %s: %s", port, e)
+
+        config_dir = os.path.dirname(self.widget.settings_manager.config_path)
+        self.textfile = settings.get("metrics_textfile") or os.path.join(config_dir, TEXTFILE_NAME)
+        interval = settings.get("metrics_textfile_interval", DEFAULT_TEXTFILE_INTERVAL_S)
+        if interval and interval > 0:
+            interval_ms = int(interval * 1000)
+            if not self.textfile_timer.isActive() or self.textfile_timer.interval() != interval_ms:
+                self.textfile_timer.start(interval_ms)
+        else:
+            self.textfile_timer.stop()
+
+    def _collect(self):
+        # Wartości odczytywane tylko przy eksporcie
+        return [
+            "# HELP overlay_timetable_cache_entries Plany w cache",
+            "# TYPE overlay_timetable_cache_entries gauge",
+            f"overlay_timetable_cache_entries {len(self.widget.update_manager.cache)}",
+        ] + instrumentation_lines()
+
+    def write_textfile(self):
+        if not registry.enabled or not self.textfile:
+            return
+        try:
+            registry.write_textfile(self.textfile)
+        except OSError as e:
+            logger.error("Błąd zapisu pliku metryk: %s", e)
+
+    def _stop_server(self):
+        if self.server is not None:
+            self.server.stop()
+            self.server = None
+            self._port = None
+
+    def stop(self):
+        """Zatrzymuje endpoint i zapis pliku (przy wyłączeniu i zamykaniu aplikacji)"""
+        self.textfile_timer.stop()
+        self._stop_server()
@@ -5,6 +5,63 @@ from PyQt6.QtWidgets import QWidget
 from PyQt6.QtGui import QColor, QPainter, QPainterPath, QLinearGradient
 from PyQt6.QtCore import Qt, QTimer
 
+from src.overlay.instrumentation import instrumentation, instrumented_paint
+
+
+TRACK_COLOR = QColor(255, 255, 255, 25)
+FILL_START_COLOR = QColor("#3cb354")
+FILL_END_COLOR = QColor("#5ee07a")
+SHINE_EDGE_COLOR = QColor(255, 255, 255, 0)
+SHINE_CENTER_COLOR = QColor(255, 255, 255, 50)  # 0.2 alpha
+
+
+def next_shine_pos(shine_pos):
+    """Zwraca kolejną pozycję połysku (0.0 - 2.0, zawija do -0.5)"""
+    shine_pos += 0.01
+    if shine_pos > 2.0:  # Goes off screen and wraps
+        shine_pos = -0.5
+    return shine_pos
+
+
+def paint_progress_bar(painter, rect, percentage, shine_pos):
+    """Rysuje pasek postępu z połyskiem w podanym prostokącie (wspólne dla obu trybów renderowania)"""
+    painter.save()
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.translate(rect.x(), rect.y())
+    
+    w = rect.width()
+    h = rect.height()
+    
+    # 1. Track background - rgba(255, 255, 255, 0.1)
+    bg_path = QPainterPath()
+    bg_path.addRoundedRect(0, 0, w, h, h/2, h/2)
+    painter.fillPath(bg_path, TRACK_COLOR)
+    
+    # 2. Fill gradient - #3cb354 → #5ee07a
+    fill_w = w * percentage
+    if fill_w > 0:
+        fill_path = QPainterPath()
+        fill_path.addRoundedRect(0, 0, fill_w, h, h/2, h/2)
+        
+        grad = QLinearGradient(0, 0, fill_w, 0)
+        grad.setColorAt(0, FILL_START_COLOR)
+        grad.setColorAt(1, FILL_END_COLOR)
+        painter.fillPath(fill_path, grad)
+        
+        # 3. Shine effect (animated gradient overlay)
+        shine_w = w  # Shine width
+        x_pos = (shine_pos * w) - shine_w
+        
+        shine_grad = QLinearGradient(x_pos, 0, x_pos + shine_w, 0)
+        shine_grad.setColorAt(0.0, SHINE_EDGE_COLOR)
+        shine_grad.setColorAt(0.5, SHINE_CENTER_COLOR)
+        shine_grad.setColorAt(1.0, SHINE_EDGE_COLOR)
+        
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceAtop)
+        painter.fillPath(fill_path, shine_grad)
+    
+    painter.restore()
+
 
 class ModernProgressBar(QWidget):
     """Custom progress bar with shimmer/shine animation effect"""
@@ -18,13 +75,12 @@ class ModernProgressBar(QWidget):
         # Timer for shine animation (~60 FPS)
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_shine)
+        instrumentation.register_timer(self.timer, "ModernProgressBar.timer")
         self.timer.start(100)  # ~10 FPS (Further reduced to save CPU)
     
     def update_shine(self):
         """Update shine position for animation"""
-        self._shine_pos += 0.01
-        if self._shine_pos > 2.0:  # Goes off screen and wraps
-            self._shine_pos = -0.5
+        self._shine_pos = next_shine_pos(self._shine_pos)
         self.update()
     
     def set_progress(self, value: float):
@@ -32,39 +88,8 @@ class ModernProgressBar(QWidget):
         self.percentage = max(0.0, min(1.0, value))
         self.update()
     
+    @instrumented_paint("ModernProgressBar")
     def paintEvent(self, event):
         """Draw the progress bar with shine effect"""
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
-        rect = self.rect()
-        w = rect.width()
-        h = rect.height()
-        
-        # 1. Track background - rgba(255, 255, 255, 0.1)
-        bg_path = QPainterPath()
-        bg_path.addRoundedRect(0, 0, w, h, h/2, h/2)
-        painter.fillPath(bg_path, QColor(255, 255, 255, 25))
-        
-        # 2. Fill gradient - #3cb354 → #5ee07a
-        fill_w = w * self.percentage
-        if fill_w > 0:
-            fill_path = QPainterPath()
-            fill_path.addRoundedRect(0, 0, fill_w, h, h/2, h/2)
-            
-            grad = QLinearGradient(0, 0, fill_w, 0)
-            grad.setColorAt(0, QColor("#3cb354"))
-            grad.setColorAt(1, QColor("#5ee07a"))
-            painter.fillPath(fill_path, grad)
-            
-            # 3. Shine effect (animated gradient overlay)
-            shine_w = w  # Shine width
-            x_pos = (self._shine_pos * w) - shine_w
-            
-            shine_grad = QLinearGradient(x_pos, 0, x_pos + shine_w, 0)
-            shine_grad.setColorAt(0.0, QColor(255, 255, 255, 0))
-            shine_grad.setColorAt(0.5, QColor(255, 255, 255, 50))  # 0.2 alpha
-            shine_grad.setColorAt(1.0, QColor(255, 255, 255, 0))
-            
-            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceAtop)
-            painter.fillPath(fill_path, shine_grad)
+        paint_progress_bar(painter, self.rect(), self.percentage, self._shine_pos)
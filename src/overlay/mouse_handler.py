@@ -1,9 +1,23 @@
 """
 Moduł obsługujący interakcje myszy (drag & drop, resize)
 """
+import logging
+
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QCursor
 
+from src.overlay.layout_model import REGION_NONE, REGION_RESIZE, REGION_TOGGLE, REGION_DRAG
+
+logger = logging.getLogger(__name__)
+
+
+_REGION_CURSORS = {
+    REGION_NONE: Qt.CursorShape.ArrowCursor,
+    REGION_RESIZE: Qt.CursorShape.SizeBDiagCursor,  # Backslash diagonal for bottom-left
+    REGION_TOGGLE: Qt.CursorShape.PointingHandCursor,
+    REGION_DRAG: Qt.CursorShape.SizeAllCursor,
+}
+
 
 class MouseHandler:
     """Obsługuje interakcje myszy dla overlay"""
@@ -19,48 +33,61 @@ class MouseHandler:
         self._resize_start_pos = None
         self._resize_start_size = None
         
-        # Śledzenie poprzedniej pozycji kursora
-        self._last_cursor_over_resize = False
+        # Stan hit-testingu - reagujemy tylko na przejścia między obszarami
+        self._hover_region = REGION_NONE
+        self._applied_cursor = None
+        self._hover_disabled_clickthrough = False
+    
+    def hit_test(self, pos):
+        """Zwraca obszar overlay pod podanym punktem (współrzędne lokalne)"""
+        return self.widget.layout_model.hit_test(
+            pos, self.widget.scaling_enabled, self.widget.drag_enabled
+        )
     
-    def check_cursor_position(self):
-        """Optymalizowane sprawdzanie pozycji kursora"""
+    def _apply_cursor(self, shape):
+        """Ustawia kursor tylko gdy kształt faktycznie się zmienia"""
+        if shape != self._applied_cursor:
+            self._applied_cursor = shape
+            self.widget.setCursor(shape)
+    
+    def check_cursor_position(self, local_pos=None):
+        """Aktualizuje kursor i clickthrough tylko przy zmianie obszaru pod kursorem"""
         try:
-            global_pos = QCursor.pos()
-            local_pos = self.widget.mapFromGlobal(global_pos)
-            
-            # Sprawdź tylko uchwyt resize
-            current_over_resize = (self.widget.scaling_enabled and 
-                                  hasattr(self.widget, "resize_handle_rect") and
-                                  self.widget.resize_handle_rect is not None and
-                                  self.widget.resize_handle_rect.contains(local_pos.toPointF()))
+            if local_pos is None:
+                local_pos = self.widget.mapFromGlobal(QCursor.pos()).toPointF()
             
-            # Sprawdź zmiany stanu
-            resize_just_left = self._last_cursor_over_resize and not current_over_resize
+            region = self.hit_test(local_pos)
+            if region == self._hover_region:
+                return
             
-            # Aktualizuj poprzedni stan
-            self._last_cursor_over_resize = current_over_resize
+            previous_region = self._hover_region
+            self._hover_region = region
+            self._apply_cursor(_REGION_CURSORS[region])
             
-            # Ustaw kursor
-            if current_over_resize:
-                self.widget.setCursor(Qt.CursorShape.SizeBDiagCursor)  # Backslash diagonal for bottom-left
+            if region == REGION_RESIZE:
                 if self.widget._clickthrough_enabled:
+                    self._hover_disabled_clickthrough = True
                     self.widget.disable_clickthrough()
-            elif self.widget.drag_enabled:
-                 self.widget.setCursor(Qt.CursorShape.SizeAllCursor)
-            else:
-                self.widget.setCursor(Qt.CursorShape.ArrowCursor)
+            elif (region == REGION_NONE and previous_region == REGION_RESIZE
+                  and self._hover_disabled_clickthrough):
                 # PRZYWRÓĆ CLICKTHROUGH GDY KURSOR OPUSZCZA OBSZAR INTERAKTYWNY
-                if resize_just_left and self.widget._clickthrough_enabled:
-                    self.widget.enable_clickthrough()
+                self._hover_disabled_clickthrough = False
+                self.widget.enable_clickthrough()
         except Exception as e:
-            print("Błąd w check_cursor_position:", e)
+            logger.error("Błąd w check_cursor_position: %s", e)
     
     def handle_mouse_press(self, event):
         """Obsługuje wciśnięcie przycisku myszy"""
+        region = self.hit_test(event.position())
+        
+        # Przycisk zwijania rysowany przez overlay (tryb jednej warstwy)
+        if region == REGION_TOGGLE and event.button() == Qt.MouseButton.LeftButton:
+            self.widget.toggle_size()
+            event.accept()
+            return True
+        
         # Sprawdź czy kliknięto w uchwyt resize (TYLKO jeśli skalowanie włączone i rect istnieje)
-        if (self.widget.scaling_enabled and hasattr(self.widget, "resize_handle_rect") and
-            self.widget.resize_handle_rect is not None and
-            self.widget.resize_handle_rect.contains(event.position())):
+        if region == REGION_RESIZE:
             self._resize_active = True
             self._resize_corner = "bottom_left"
             self._resize_start_pos = event.globalPosition().toPoint()
@@ -73,7 +100,8 @@ class MouseHandler:
             else:
                 self._aspect_ratio = 4.2 # Fallback
                 
-            self._was_clickthrough = self.widget._clickthrough_enabled
+            self._was_clickthrough = self.widget._clickthrough_enabled or self._hover_disabled_clickthrough
+            self._hover_disabled_clickthrough = False
             self.widget.disable_clickthrough()
             event.accept()
             return True
@@ -93,7 +121,7 @@ class MouseHandler:
         """Obsługuje ruch myszy"""
         # Sprawdź kursor jeśli nie ma aktywnej akcji
         if not self._resize_active and not self._drag_active:
-            self.check_cursor_position()
+            self.check_cursor_position(event.position())
             
         # Obsługa resize (TYLKO jeśli skalowanie włączone)
         if self._resize_active and self.widget.scaling_enabled:
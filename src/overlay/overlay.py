@@ -1,20 +1,35 @@
 
 
+import logging
 import os
 import sys
 import keyboard
-from PyQt6.QtWidgets import QWidget, QApplication, QMessageBox, QVBoxLayout, QHBoxLayout, QLabel, QGraphicsDropShadowEffect
+from PyQt6.QtWidgets import QWidget, QApplication, QMessageBox, QVBoxLayout, QHBoxLayout, QLabel, QGraphicsDropShadowEffect, QSizePolicy
 from PyQt6.QtGui import QPainter, QColor
-from PyQt6.QtCore import Qt, pyqtProperty, QPropertyAnimation, QEasingCurve, QTimer, QSize
+from PyQt6.QtCore import Qt, pyqtProperty, QEasingCurve, QTimer, QSize
 
 from src.overlay.ui_renderer import paint_overlay
+from src.overlay.layout_model import OverlayLayout, scaled_metrics
+from src.overlay.animation import AnimationCoordinator
+from src.overlay.size_transition import SizeTransition
+from src.overlay.text_cache import TextCache
+from src.overlay.instrumentation import instrumentation, instrumented_paint, set_stylesheet, ENV_VAR as DEBUG_HUD_ENV_VAR
+from src.overlay.debug_hud import DebugHud
+from src.overlay.surface_renderer import SurfaceRenderer, RENDER_MODE_WIDGETS, RENDER_MODE_SINGLE_SURFACE, RENDER_MODES
 from src.overlay.mouse_handler import MouseHandler
 from src.overlay.settings_manager import SettingsManager
 from src.overlay.update_manager import UpdateManager
-from src.overlay.modern_progress_bar import ModernProgressBar
+from src.overlay.timetable_cache import GROUP_KEYS
+from src.overlay.power_manager import PowerManager
+from src.overlay.prefetch_manager import PrefetchManager
+from src.overlay.metrics_exporter import MetricsExporter
+from src.overlay.modern_progress_bar import ModernProgressBar, next_shine_pos
 from src.overlay.toggle_button import ToggleButton
-from src.tray import Tray
-from src.settings.settings_window import SettingsWindow
+from src.overlay.remote_control import RemoteControl, UI_MODE_EMBEDDED, UI_MODE_STANDALONE
+from src.log_manager import log_manager
+from src.tracing import tracer
+
+logger = logging.getLogger(__name__)
 
 class OverlayWidget(QWidget):
     def __init__(self, title, left_text, right_text, room_text="-", progress=0.0):
@@ -29,12 +44,34 @@ class OverlayWidget(QWidget):
             config_dir = os.path.join(base_dir, "overlay")
         os.makedirs(config_dir, exist_ok=True)
         config_path = os.path.join(config_dir, "settings.json")
+        # Dziennik zdarzeń - przed menedżerami, żeby objął błędy wczytywania ustawień
+        log_manager.setup(config_dir)
 
         # Inicjalizacja menedżerów
         # Inicjalizacja menedżerów
         self.settings_manager = SettingsManager(config_path)
         self.update_manager = UpdateManager(self)
+        self.prefetch_manager = PrefetchManager(self)
+        self.power_manager = PowerManager(self)
+        self.metrics_exporter = MetricsExporter(self)
         self.mouse_handler = MouseHandler(self)
+        self.layout_model = OverlayLayout()
+        # Wszystkie przejścia (postęp, rozmiar, strzałka) na jednym zegarze klatek
+        self.animations = AnimationCoordinator(self)
+        # Zwijanie/rozwijanie rysowane ze zrzutów, układ zatwierdzany raz na końcu
+        self.size_transition = SizeTransition(self)
+        
+        # Tryb renderowania (drzewo widgetów lub jedna warstwa)
+        self.render_mode = RENDER_MODE_WIDGETS
+        self._animations_active = True
+        self.text_cache = TextCache()
+        self._shown_texts = {}  # Ostatnio wyświetlone teksty - pomijanie identycznych aktualizacji
+        self.surface_renderer = SurfaceRenderer(self)
+        self.shine_pos = 0.0
+        self.shine_timer = QTimer(self)
+        self.shine_timer.timeout.connect(self._advance_shine)
+        instrumentation.register_timer(self.shine_timer, "OverlayWidget.shine_timer")
+        self.debug_hud = None
 
         # Teksty (kept for backward compatibility, but will use QLabel widgets)
         self.title = title
@@ -63,13 +100,25 @@ class OverlayWidget(QWidget):
         self.is_small = False  # Track size state for toggle
 
         # Inicjalizacja komponentów UI (Tray, Settings)
-        self.tray = Tray(QApplication.instance(), self)
-        self.settings_window = SettingsWindow(self)
+        settings = self.settings_manager.load_settings()
+        self.tray = None
+        self.settings_window = None
+        # Serwer IPC - polecenia z kolejnych uruchomień programu i procesów klienckich
+        self.remote_control = RemoteControl(self)
+        self.ui_mode = UI_MODE_EMBEDDED
+        if self.remote_control.start() and settings.get("ui_mode") == UI_MODE_STANDALONE:
+            # Tray i ustawienia jako osobne procesy połączone przez IPC
+            self.ui_mode = UI_MODE_STANDALONE
+        if self.ui_mode == UI_MODE_EMBEDDED:
+            from src.tray import Tray
+            from src.settings.settings_window import SettingsWindow
+            self.tray = Tray(QApplication.instance(), self)
+            self.settings_window = SettingsWindow(self)
 
         # Initialize UI components BEFORE resizing
         self._setup_ui_layout()
         
-        self.load_settings() # Wczytaj ustawienia i zastosuj rozmiar/pozycję
+        self.apply_settings_from_cache(settings) # Zastosuj rozmiar/pozycję
 
         # Okno
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
@@ -80,27 +129,26 @@ class OverlayWidget(QWidget):
             | Qt.WindowType.Tool
         )
 
-        # Animacje
-        self.anim = QPropertyAnimation(self, b"progress")
-        self.anim.setDuration(1200)
-        self.anim.setEasingCurve(QEasingCurve.Type.OutCubic)
-        
-        # Size toggle animation
-        self.anim_size = QPropertyAnimation(self, b"size", self)
-        self.anim_size.setDuration(500)
-        self.anim_size.setEasingCurve(QEasingCurve.Type.InOutCubic)
-
         # Skrót klawiszowy
         try:
             keyboard.remove_hotkey("ctrl+q")
         except Exception:
             pass
-        keyboard.add_hotkey("ctrl+q", self.toggle_overlay)
-
-        keyboard.add_hotkey("ctrl+q", self.toggle_overlay)
+        try:
+            keyboard.add_hotkey("ctrl+q", self.toggle_overlay)
+        except Exception as e:
+            # Np. Linux bez uprawnień do urządzeń wejściowych lub środowisko headless
+            logger.warning("Nie można zarejestrować skrótu klawiszowego: %s", e)
         
         # Enable mouse tracking for hover events
         self.setMouseTracking(True)
+        
+        # Instrumentacja renderowania (debug HUD)
+        if os.getenv(DEBUG_HUD_ENV_VAR):
+            self.set_debug_hud_enabled(True)
+        
+        if self.ui_mode == UI_MODE_STANDALONE:
+            self.remote_control.start_tray()
 
     def open_settings(self):
         """Otwiera okno ustawień"""
@@ -108,14 +156,30 @@ class OverlayWidget(QWidget):
             self.settings_window.show()
             self.settings_window.raise_()
             self.settings_window.activateWindow()
+        else:
+            self.remote_control.start_settings()
+
+    def showEvent(self, event):
+        self.power_manager.schedule_evaluate()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.power_manager.schedule_evaluate()
+        super().hideEvent(event)
 
     def closeEvent(self, event):
         self.settings_manager.stop_timers()
+        self.power_manager.stop()
+        self.prefetch_manager.stop()
+        self.metrics_exporter.stop()
         if hasattr(self, 'cursor_timer') and self.cursor_timer.isActive():
             self.cursor_timer.stop()
         
         if self.settings_window:
             self.settings_window.close()
+        self.remote_control.stop()
+        
+        self.set_debug_hud_enabled(False)
             
         event.accept()
 
@@ -138,8 +202,10 @@ class OverlayWidget(QWidget):
         self.lbl_name.setStyleSheet("color: white; font-weight: 600; font-size: 19px; background: transparent;")
         self.lbl_name.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
         self.lbl_name.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        # Długość tekstu nie wpływa na layout - tekst jest przycinany (elided)
+        self.lbl_name.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Preferred)
         
-        header_layout.addWidget(self.lbl_name)
+        header_layout.addWidget(self.lbl_name, 1)
         # header_layout.addWidget(self.lbl_room) # REMOVED: User requested removal
         header_layout.addStretch()
 
@@ -159,9 +225,10 @@ class OverlayWidget(QWidget):
         self.lbl_time = QLabel(self.left_text, self.info_container)
         self.lbl_time.setStyleSheet("color: rgba(255,255,255,230); font-size: 13px; background: transparent;")
         self.lbl_time.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.lbl_time.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Preferred)
         
         # Spacer
-        info_layout.addWidget(self.lbl_time)
+        info_layout.addWidget(self.lbl_time, 1)
         info_layout.addStretch()
         
         # Place label (pill-shaped)
@@ -190,11 +257,6 @@ class OverlayWidget(QWidget):
         self.layout.addWidget(self.header_container)
         self.layout.addWidget(self.progress_bar)
         self.layout.addWidget(self.info_container)
-        
-        # Animation for button rotation
-        self.anim_rotate = QPropertyAnimation(self.btn, b"angle", self)
-        self.anim_rotate.setDuration(500)
-        self.anim_rotate.setEasingCurve(QEasingCurve.Type.InOutCubic)
     
     def move_to_top_right(self):
         """Position overlay at top-right corner of screen"""
@@ -205,6 +267,10 @@ class OverlayWidget(QWidget):
     
     def toggle_size(self):
         """Toggle between large and small overlay states"""
+        # Poprzednie przejście (jeśli trwa) - zatwierdź stan końcowy przed liczeniem nowego
+        self.size_transition.finish()
+        was_small = self.is_small
+
         # Calculate current scale relative to the state we are LEAVING
         # If we are currently small (before toggle), base was 260. If large, base was 420.
         # Note: self.is_small is the CURRENT state before toggle
@@ -238,11 +304,8 @@ class OverlayWidget(QWidget):
             end_w = max(self.minimumWidth(), min(end_w, self.maximumWidth()))
             end_h = max(self.minimumHeight(), min(end_h, self.maximumHeight()))
             
-            self.info_container.hide()
-            
             # Rotate button 180 degrees
-            self.anim_rotate.setStartValue(0)
-            self.anim_rotate.setEndValue(180)
+            angle_start, angle_end = 0, 180
         else:
             # Large state: 420x110 base
             self.base_width = 420
@@ -256,13 +319,10 @@ class OverlayWidget(QWidget):
             end_w = max(self.minimumWidth(), min(end_w, self.maximumWidth()))
             end_h = max(self.minimumHeight(), min(end_h, self.maximumHeight()))
             
-            self.info_container.show()
-            
             # Rotate button back to 0 (via 360 for smooth animation)
-            self.anim_rotate.setStartValue(180)
-            self.anim_rotate.setEndValue(360)
+            angle_start, angle_end = 180, 360
         
-        self.anim_rotate.start()
+        self.animations.animate("arrow", angle_start, angle_end, 500, self._set_arrow_angle)
         
         # Calculate new geometry (anchored to right)
         # Use x + width to get the true right edge coordinate (exclusive)
@@ -272,13 +332,7 @@ class OverlayWidget(QWidget):
         from PyQt6.QtCore import QRect
         end_geo = QRect(end_x, current_y, end_w, end_h)
         
-        self.anim_geo = QPropertyAnimation(self, b"geometry", self)
-        self.anim_geo.setDuration(500)
-        self.anim_geo.setEasingCurve(QEasingCurve.Type.InOutCubic)
-        
-        self.anim_geo.setStartValue(current_geo)
-        self.anim_geo.setEndValue(end_geo)
-        self.anim_geo.start()
+        self.size_transition.start(current_geo, end_geo, was_small, 500)
 
     def _apply_scaling(self):
         """Apply scaling to fonts and elements based on current width"""
@@ -287,80 +341,92 @@ class OverlayWidget(QWidget):
         scale = self.width() / self.base_width
         self.scale_factor = scale # Update public property
         
-        if self.is_small:
-            # Base values for Small state
-            font_title = 16 * scale
-            font_time = 10 * scale # Not visible but calculated
-            font_place = 10 * scale
-            h_progress = max(2, int(6 * scale))
-            
-            margin_v = int(16 * scale)
-            margin_h_left = int(20 * scale)
-            margin_h_right = int(35 * scale)
-            spacing = int(2 * scale)
-            
-            place_radius = int(6 * scale)
-            place_padding = int(6 * scale)
-            place_min_h = int(14 * scale)
-            
-            # Apply styles
-            self.lbl_name.setStyleSheet(f"color: white; font-weight: 600; font-size: {font_title}px; background: transparent;")
-            self.progress_bar.setFixedHeight(h_progress)
-            self.layout.setContentsMargins(margin_h_left, margin_v, margin_h_right, margin_v)
-            self.layout.setSpacing(spacing)
-            
-            # Place label style (even if hidden/unused in small state, good to have)
-            self.lbl_place.setStyleSheet(f"""
-                background: rgba(255, 255, 255, 25);
-                border: 1px solid rgba(255, 255, 255, 25);
-                border-radius: {place_radius}px;
-                padding: 0px {place_padding}px;
-                min-width: {30*scale}px;
-                max-height: {place_min_h}px;
-                min-height: {place_min_h}px;
-                color: white;
-                font-size: {font_place}px;
-                font-weight: 500;
-                margin: 0px;
-            """)
-            
+        # W trybie jednej warstwy czcionki i marginesy bierze layout_model - bez setStyleSheet
+        if self.render_mode == RENDER_MODE_SINGLE_SURFACE:
+            return
+        
+        m = scaled_metrics(scale, self.is_small)
+        
+        # Apply styles
+        set_stylesheet(self.lbl_name, f"color: white; font-weight: 600; font-size: {m['font_title']}px; background: transparent;",
+                       "OverlayWidget._apply_scaling.lbl_name")
+        if not self.is_small:
+            set_stylesheet(self.lbl_time, f"color: rgba(255,255,255,230); font-size: {m['font_time']}px; background: transparent;",
+                           "OverlayWidget._apply_scaling.lbl_time")
+        self.progress_bar.setFixedHeight(m["h_progress"])
+        self.layout.setContentsMargins(m["margin_h_left"], m["margin_v"], m["margin_h_right"], m["margin_v"])
+        self.layout.setSpacing(m["spacing"])
+        
+        # Place label style (even if hidden/unused in small state, good to have)
+        set_stylesheet(self.lbl_place, f"""
+            background: rgba(255, 255, 255, 25);
+            border: 1px solid rgba(255, 255, 255, 25);
+            border-radius: {m['place_radius']}px;
+            padding: 0px {m['place_padding']}px;
+            min-width: {m['place_min_w']}px;
+            max-height: {m['place_min_h']}px;
+            min-height: {m['place_min_h']}px;
+            color: white;
+            font-size: {m['font_place']}px;
+            font-weight: 500;
+            margin: 0px;
+        """, "OverlayWidget._apply_scaling.lbl_place")
+
+    # ===== Tryb renderowania =====
+    def set_render_mode(self, mode):
+        """Przełącza między drzewem widgetów a rysowaniem wszystkiego w jednym paintEvent"""
+        if mode not in RENDER_MODES:
+            mode = RENDER_MODE_WIDGETS
+        if mode == self.render_mode:
+            return
+        self.size_transition.finish()
+        self.render_mode = mode
+        single = mode == RENDER_MODE_SINGLE_SURFACE
+        
+        self.header_container.setVisible(not single)
+        self.progress_bar.setVisible(not single)
+        self.info_container.setVisible(not single and not self.is_small)
+        self.btn.setVisible(not single)
+        self._shown_texts.clear()
+        
+        if single:
+            # Połysk paska animuje sam overlay (odświeżając tylko obszar paska)
+            self.shine_pos = self.progress_bar._shine_pos
+            self.surface_renderer.invalidate()
         else:
-            # Base values for Large state
-            font_title = 19 * scale
-            font_time = 13 * scale
-            font_place = 12 * scale
-            h_progress = max(4, int(8 * scale))
-            
-            margin_v = int(10 * scale)
-            margin_h_left = int(25 * scale)
-            margin_h_right = int(35 * scale)
-            spacing = int(5 * scale)
-            
-            place_radius = int(12 * scale)
-            place_padding = int(10 * scale)
-            place_min_h = int(24 * scale)
-            
-            # Apply styles
-            self.lbl_name.setStyleSheet(f"color: white; font-weight: 600; font-size: {font_title}px; background: transparent;")
-            self.lbl_time.setStyleSheet(f"color: rgba(255,255,255,230); font-size: {font_time}px; background: transparent;")
-            self.progress_bar.setFixedHeight(h_progress)
-            self.layout.setContentsMargins(margin_h_left, margin_v, margin_h_right, margin_v)
-            self.layout.setSpacing(spacing)
-            
-            self.lbl_place.setStyleSheet(f"""
-                background: rgba(255, 255, 255, 25);
-                border: 1px solid rgba(255, 255, 255, 25);
-                border-radius: {place_radius}px;
-                padding: 0px {place_padding}px;
-                min-width: {40*scale}px;
-                max-height: {place_min_h}px;
-                min-height: {place_min_h}px;
-                color: white;
-                font-size: {font_place}px;
-                font-weight: 500;
-                margin: 0px;
-            """)
-
+            self.progress_bar._shine_pos = self.shine_pos
+            self.progress_bar.set_progress(self._progress)
+            self._apply_scaling()
+            self.update_text_labels()
+        self.set_animations_active(self._animations_active)
+        self.update()
+    
+    def set_animations_active(self, active):
+        """Włącza/wyłącza timer połysku paska właściwy dla trybu renderowania"""
+        self._animations_active = active
+        single = self.render_mode == RENDER_MODE_SINGLE_SURFACE
+        for timer, wanted in ((self.shine_timer, active and single),
+                              (self.progress_bar.timer, active and not single)):
+            if not wanted:
+                timer.stop()
+            elif not timer.isActive():
+                timer.start(100)
+    
+    def _advance_shine(self):
+        """Animacja połysku paska w trybie jednej warstwy"""
+        self.shine_pos = next_shine_pos(self.shine_pos)
+        if self._progress > 0:
+            self.update(self.layout_model.bar_rect.toAlignedRect())
+    
+    def _set_arrow_angle(self, value):
+        """Ustawia kąt strzałki (krok animacji obrotu)"""
+        self.btn.setAngle(value)
+        self._on_arrow_angle_changed(value)
+    
+    def _on_arrow_angle_changed(self, value):
+        """Odświeża obszar strzałki podczas animacji obrotu (tryb jednej warstwy)"""
+        if self.render_mode == RENDER_MODE_SINGLE_SURFACE:
+            self.update(self.layout_model.toggle_button_rect.toAlignedRect())
 
     # ===== Metody dostępu do ustawień (delegacja do SettingsManager) =====
     def get_current_settings(self):
@@ -372,10 +438,12 @@ class OverlayWidget(QWidget):
         return self.settings_manager.get_group_settings()
 
     def update_settings(self, new_settings):
-        """Aktualizuje ustawienia w cache i zapisuje do pliku"""
-        self.settings_manager.update_settings(new_settings)
-        # Aktualizuj stan widgetu na podstawie nowych ustawień
-        self._apply_ui_settings(new_settings)
+        """Aktualizuje ustawienia w cache (jedna transakcja, jeden zapis) i stosuje zmienione"""
+        with self.settings_manager.transaction() as tx:
+            tx.update(new_settings)
+        # Aktualizuj stan widgetu tylko dla faktycznie zmienionych kluczy
+        if tx.changed:
+            self._apply_ui_settings(tx.settings, tx.changed)
 
     def update_group_settings(self, group_settings):
         """Aktualizuje ustawienia grup w cache"""
@@ -403,18 +471,39 @@ class OverlayWidget(QWidget):
         # Potem zapisz natychmiast
         self.settings_manager.save_settings_immediately()
 
-    def _apply_ui_settings(self, settings):
-        """Stosuje ustawienia UI bez wywoływania save_settings (zapobiega pętli)"""
-        if "opacity" in settings:
-            self.setWindowOpacity(settings["opacity"])
-        if "clickthrough" in settings:
-            self._clickthrough_enabled = settings["clickthrough"]
+    def _apply_ui_settings(self, settings, changed):
+        """
+        Stosuje zmienione ustawienia UI bez wywoływania save_settings (zapobiega pętli).
+        settings - nowa migawka, changed - zmienione klucze. Każdy aspekt raz, w
+        kolejności zależności: drzewo widgetów, flagi okna (odtwarzają okno),
+        wygląd, usługi w tle, na końcu dane planu dla nowych grup.
+        """
+        if "render_mode" in changed:
+            self.set_render_mode(settings.render_mode)
+        if "clickthrough" in changed and settings.clickthrough != self._clickthrough_enabled:
+            # Odtworzenie okna tylko gdy stan widgetu jeszcze się nie zgadza
+            self._clickthrough_enabled = settings.clickthrough
             self.apply_clickthrough_state()
-        if "drag_enabled" in settings:
-            self.drag_enabled = settings["drag_enabled"]
-        if "scaling_enabled" in settings:
-            self.scaling_enabled = settings["scaling_enabled"]
+        if "opacity" in changed and settings.opacity != round(self.windowOpacity(), 2):
+            # Podgląd z okna ustawień zwykle już ustawił tę wartość
+            self.setWindowOpacity(settings.opacity)
+        if "drag_enabled" in changed:
+            self.drag_enabled = settings.drag_enabled
+        if "scaling_enabled" in changed and settings.scaling_enabled != self.scaling_enabled:
+            self.scaling_enabled = settings.scaling_enabled
             self.update()
+        if "reduced_motion" in changed:
+            self.animations.reduced_motion = settings.reduced_motion
+        if not changed.isdisjoint(("log_level", "log_to_file")):
+            log_manager.configure(settings.log_level, settings.log_to_file)
+        if "tracing_enabled" in changed:
+            tracer.configure(settings.tracing_enabled)
+        if any(key.startswith("prefetch_") for key in changed):
+            self.prefetch_manager.set_active(self.prefetch_manager.active)
+        if any(key.startswith("metrics_") for key in changed):
+            self.metrics_exporter.configure(settings)
+        if not changed.isdisjoint(GROUP_KEYS):
+            self.update_manager.on_groups_changed()
 
     # ===== Clickthrough =====
     def enable_clickthrough(self):
@@ -535,50 +624,118 @@ class OverlayWidget(QWidget):
         return self._progress
 
     def setProgress(self, value: float):
-        self._progress = max(0.0, min(1.0, value))
-        # Update the modern progress bar widget
+        value = max(0.0, min(1.0, value))
+        if value == self._progress:
+            return
+        self._progress = value
+        if self.render_mode == RENDER_MODE_SINGLE_SURFACE:
+            self.update(self.layout_model.bar_rect.toAlignedRect())
+            return
+        # Pasek odświeża tylko siebie - tło overlay nie zależy od postępu
         if hasattr(self, 'progress_bar'):
             self.progress_bar.set_progress(self._progress)
-        self.update()
 
     progress = pyqtProperty(float, fget=getProgress, fset=setProgress)
 
     def animateProgressTo(self, target_value: float):
-        self.anim.stop()
-        self.anim.setStartValue(self._progress)
-        self.anim.setEndValue(max(0.0, min(1.0, target_value)))
-        self.anim.start()
+        # Krok animacji = 1 px szerokości paska; krótsze przejścia bez animacji
+        pixel = 1.0 / max(1.0, self.layout_model.bar_rect.width())
+        self.animations.animate("progress", self._progress, max(0.0, min(1.0, target_value)), 1200,
+                                self.setProgress, QEasingCurve.Type.OutCubic, quantum=pixel)
     
     def update_text_labels(self):
         """Update QLabel widgets when text properties change"""
+        if self.render_mode == RENDER_MODE_SINGLE_SURFACE:
+            # Odśwież tylko obszary, których tekst się zmienił
+            layout = self.layout_model
+            if self._text_changed("title", self.title):
+                self.update(layout.title_rect.toAlignedRect())
+            left_changed = self._text_changed("left", self.left_text)
+            if self._text_changed("right", self.right_text) or left_changed:
+                self.update(layout.info_rect.toAlignedRect())
+            return
+        
+        layout = self.layout_model
         if hasattr(self, 'lbl_name'):
-            self.lbl_name.setText(self.title)
-        if hasattr(self, 'lbl_time'):
-            self.lbl_time.setText(self.left_text)
+            self._set_label_text(self.lbl_name, self.title, layout.title_rect.width())
         if hasattr(self, 'lbl_place'):
-            self.lbl_place.setText(self.right_text)
+            self._set_label_text(self.lbl_place, self.right_text)
+        if hasattr(self, 'lbl_time'):
+            spacing = self.info_container.layout().spacing()
+            self._set_label_text(self.lbl_time, self.left_text,
+                                 layout.info_rect.width() - self.lbl_place.sizeHint().width() - spacing)
         if hasattr(self, 'lbl_room'):
-            self.lbl_room.setText(self.room_text)
+            self._set_label_text(self.lbl_room, self.room_text)
+    
+    def _text_changed(self, key, text):
+        """Zapamiętuje tekst i zwraca True jeśli różni się od poprzedniego"""
+        if self._shown_texts.get(key) == text:
+            return False
+        self._shown_texts[key] = text
+        return True
+    
+    def _set_label_text(self, label, text, max_width=None):
+        """Ustawia tekst etykiety (przycięty do szerokości) tylko gdy faktycznie się zmienił"""
+        if max_width is not None and max_width > 0:
+            # Czcionka etykiety po zastosowaniu arkusza stylów (_apply_scaling), nie z layout_model
+            label.ensurePolished()
+            text = self.text_cache.elide(text, label.font(), max_width)
+        if self._text_changed(label, text):
+            label.setText(text)
+
+    # ===== Debug HUD =====
+    def set_debug_hud_enabled(self, enabled):
+        """Włącza/wyłącza instrumentację renderowania i HUD ze statystykami"""
+        instrumentation.set_enabled(enabled)
+        if enabled:
+            if self.debug_hud is None:
+                dump_path = os.path.join(os.path.dirname(self.settings_manager.config_path), "debug_stats.json")
+                self.debug_hud = DebugHud(self, dump_path)
+            self.debug_hud.start()
+        elif self.debug_hud is not None:
+            self.debug_hud.stop()
+
+    def dump_log(self):
+        """Zapisuje ostatnie wpisy dziennika do pliku; zwraca ścieżkę lub None"""
+        return log_manager.dump()
 
     # ===== Malowanie (delegacja do ui_renderer) =====
+    @instrumented_paint("OverlayWidget")
     def paintEvent(self, event):
         painter = QPainter(self)
+        if self.size_transition.active:
+            self.size_transition.paint(painter)
+            return
         paint_overlay(self, painter)
+        if self.render_mode == RENDER_MODE_SINGLE_SURFACE:
+            self.surface_renderer.paint(painter)
     
     def resizeEvent(self, event):
-        """Handle resize events - position toggle button"""
-        if hasattr(self, 'btn'):
-            self.btn.move(self.width() - 32, 8)
-        
+        """Handle resize events - recompute layout model and position toggle button"""
+        # Podczas przejścia rozmiaru okno ma stały rozmiar, a układ liczony jest przy zatwierdzeniu
+        if not self.size_transition.active:
+            self.relayout()
+        super().resizeEvent(event)
+
+    def relayout(self):
+        """Przelicza skalowanie, model układu i pozycję przycisku dla bieżącego rozmiaru"""
         # Apply scaling to content
         self._apply_scaling()
+        
+        # Geometria obszarów interaktywnych - raz na zmianę rozmiaru
+        self.layout_model.update(self.width(), self.height(), self.scale_factor, self.is_small)
+        if hasattr(self, 'btn'):
+            self.btn.move(self.layout_model.toggle_button_rect.topLeft().toPoint())
+            # Przelicz przycięcie tekstów dla nowej szerokości (z cache)
+            self.update_text_labels()
             
         # Update position to maintain right-edge anchoring
         # self.move_to_top_right()  # REMOVED: Let user position it
-        super().resizeEvent(event)
 
     # ===== Obsługa myszy (delegacja do mouse_handler) =====
     def mousePressEvent(self, event):
+        # Kliknięcie w trakcie zwijania/rozwijania - najpierw prawdziwy układ (hit-testing)
+        self.size_transition.finish()
         if not self.mouse_handler.handle_mouse_press(event):
             super().mousePressEvent(event)
 
@@ -598,28 +755,30 @@ class OverlayWidget(QWidget):
 
     def apply_settings_from_cache(self, settings):
         """Stosuje ustawienia z cache bez wywoływania metod zmieniających flagi"""
+        # settings - zwalidowana migawka (settings_schema.Settings), wartości mają właściwe typy
         # Wczytaj rozmiar i pozycję
-        saved_width = settings.get("width", self.original_width)
-        saved_height = settings.get("height", self.original_height)
-        
-        self.resize(saved_width, saved_height)
-        self.scale_factor = saved_width / self.original_width
+        self.resize(settings.width, settings.height)
+        self.scale_factor = settings.width / self.original_width
         
         # Wczytaj ustawienia z cache BEZ wywoływania metod enable/disable
-        self.drag_enabled = settings.get("drag_enabled", True)
-        self.scaling_enabled = settings.get("scaling_enabled", False)
-        self.setWindowOpacity(settings.get("opacity", 1.0))
+        self.drag_enabled = settings.drag_enabled
+        self.scaling_enabled = settings.scaling_enabled
+        self.setWindowOpacity(settings.opacity)
+        
+        self.set_render_mode(settings.render_mode)
+        self.animations.reduced_motion = settings.reduced_motion
+        log_manager.configure(settings.log_level, settings.log_to_file)
+        self.metrics_exporter.configure(settings)
+        tracer.configure(settings.tracing_enabled, os.path.dirname(self.settings_manager.config_path))
         
         # Ustaw flagę clickthrough bez wywoływania metod
-        self._clickthrough_enabled = settings.get("clickthrough", True)
+        self._clickthrough_enabled = settings.clickthrough
         
         # Zastosuj stan clickthrough
         self.apply_clickthrough_state()
         
         # Wczytaj pozycję
-        pos = settings.get("position")
-        if pos and len(pos) == 2:
-            self.move(pos[0], pos[1])
+        self.move(*settings.position)
 
     # ===== API (delegacja do update_manager) =====
     def start_minute_updates(self):
@@ -653,12 +812,22 @@ class OverlayWidget(QWidget):
             QMessageBox.StandardButton.No
         )
         if reply == QMessageBox.StandardButton.Yes:
-            # Zatrzymaj wszystkie timery i zapisz ustawienia
-            self.settings_manager.stop_timers()
-            self.update_manager.stop_timers()
-            
-            if hasattr(self, 'cursor_timer') and self.cursor_timer.isActive():
-                self.cursor_timer.stop()
-            
+            self.quit_application()
+
+    def quit_application(self):
+        """Zatrzymuje wszystkie timery, zapisuje ustawienia i kończy program"""
+        self.settings_manager.stop_timers()
+        self.update_manager.stop_timers()
+        self.power_manager.stop()
+        self.prefetch_manager.stop()
+        self.metrics_exporter.stop()
+        self.remote_control.stop()
+        
+        if hasattr(self, 'cursor_timer') and self.cursor_timer.isActive():
+            self.cursor_timer.stop()
+        
+        try:
             keyboard.unhook_all_hotkeys()
-            QApplication.quit()
+        except Exception as e:
+            logger.warning("Błąd przy usuwaniu skrótów klawiszowych: %s", e)
+        QApplication.quit()
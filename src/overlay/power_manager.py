@@ -0,0 +1,182 @@
+"""
+Moduł zarządzający stanem energii overlay - które timery działają w danym stanie
+"""
+import ctypes
+import os
+from datetime import datetime
+
+from PyQt6.QtCore import QObject, QTimer
+
+
+POWER_ACTIVE = "active"
+POWER_HIDDEN = "hidden"
+POWER_AWAY = "away"            # Sesja zablokowana
+POWER_OFF_HOURS = "off_hours"  # Poza godzinami zajęć (wg planu)
+
+# Timery działające w danym stanie:
+#   update     - pobieranie planu (UpdateManager.update_timer)
+#   progress   - odświeżanie paska postępu (UpdateManager.progress_timer)
+#   animations - połysk paska (ModernProgressBar.timer / OverlayWidget.shine_timer)
+#   check      - okresowe sprawdzanie blokady sesji i granic godzin zajęć
+#   wake       - jednorazowe wybudzenie przed pierwszą lekcją
+#   prefetch   - pobieranie planów sąsiednich grup (PrefetchManager.tick_timer)
+STATE_TIMERS = {
+    POWER_ACTIVE: frozenset({"update", "progress", "animations", "check", "prefetch"}),
+    POWER_HIDDEN: frozenset(),
+    POWER_AWAY: frozenset({"check"}),
+    POWER_OFF_HOURS: frozenset({"wake"}),
+}
+
+CHECK_INTERVAL_MS = 60 * 1000
+OFF_HOURS_MARGIN_MIN = 15           # Aktywny 15 min przed pierwszą i po ostatniej lekcji
+OFF_HOURS_RECHECK_MS = 30 * 60 * 1000
+
+# Windows: OpenInputDesktop zwraca NULL gdy sesja jest zablokowana
+_DESKTOP_SWITCHDESKTOP = 0x0100
+
+
+def is_session_locked():
+    """Sprawdza czy sesja użytkownika jest zablokowana (tylko Windows, inaczej False)"""
+    if os.name != "nt":
+        return False
+    try:
+        user32 = ctypes.windll.user32
+        desktop = user32.OpenInputDesktop(0, False, _DESKTOP_SWITCHDESKTOP)
+        if not desktop:
+            return True
+        user32.CloseDesktop(desktop)
+        return False
+    except Exception:
+        return False
+
+
+def _minutes(time_str):
+    """'HH:MM' -> minuty od północy"""
+    hours, minutes = time_str.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def schedule_bounds(timetable):
+    """Zwraca (początek pierwszej, koniec ostatniej lekcji) w minutach lub None"""
+    starts = []
+    ends = []
+    for lesson in timetable or ():
+        try:
+            starts.append(_minutes(lesson["start"]))
+            ends.append(_minutes(lesson["end"]))
+        except (KeyError, ValueError, AttributeError):
+            continue
+    if not starts:
+        return None
+    return min(starts), max(ends)
+
+
+class PowerManager(QObject):
+    """
+    Maszyna stanów energii: Active, Hidden, Away (zablokowana sesja), Off-hours.
+    Każdy stan definiuje, które timery działają; powrót do stanu Active
+    wywołuje jedno odświeżenie nadrabiające zaległości.
+    """
+
+    def __init__(self, widget):
+        super().__init__()
+        self.widget = widget
+        self.state = None
+        self._bounds = None
+        self._bounds_source = None
+
+        # Zbieranie wielu zdarzeń (hide+show przy zmianie flag okna) w jedną ocenę
+        self._evaluate_timer = QTimer(self)
+        self._evaluate_timer.setSingleShot(True)
+        self._evaluate_timer.timeout.connect(self.evaluate)
+
+        self.check_timer = QTimer(self)
+        self.check_timer.timeout.connect(self.evaluate)
+
+        self.wake_timer = QTimer(self)
+        self.wake_timer.setSingleShot(True)
+        self.wake_timer.timeout.connect(self.evaluate)
+
+    def schedule_evaluate(self):
+        """Planuje ocenę stanu po powrocie do pętli zdarzeń"""
+        if not self._evaluate_timer.isActive():
+            self._evaluate_timer.start(0)
+
+    def evaluate(self):
+        """Wyznacza bieżący stan i przełącza timery przy zmianie"""
+        self._set_state(self._compute_state())
+
+    def _compute_state(self):
+        if not self.widget.isVisible():
+            return POWER_HIDDEN
+        if is_session_locked():
+            return POWER_AWAY
+        if self._is_off_hours():
+            return POWER_OFF_HOURS
+        return POWER_ACTIVE
+
+    def _is_off_hours(self):
+        """Poza godzinami zajęć wg ostatnio pobranego planu (z marginesem)"""
+        update_manager = self.widget.update_manager
+        entry = update_manager.cache.get_entry(update_manager.current_groups())
+        if entry is None:
+            return False  # Brak danych - trzeba je najpierw pobrać
+        timetable, fetched_at = entry
+
+        # Plan z innego dnia może być nieaktualny - najpierw odśwież
+        if datetime.fromtimestamp(fetched_at).date() != datetime.now().date():
+            return False
+
+        if timetable is not self._bounds_source:
+            self._bounds = schedule_bounds(timetable)
+            self._bounds_source = timetable
+        if self._bounds is None:
+            return True  # Brak zajęć w planie
+
+        now = datetime.now()
+        minute = now.hour * 60 + now.minute
+        first_start, last_end = self._bounds
+        return (minute < first_start - OFF_HOURS_MARGIN_MIN or
+                minute > last_end + OFF_HOURS_MARGIN_MIN)
+
+    def _set_state(self, state):
+        if state == self.state:
+            return
+        previous = self.state
+        self.state = state
+        timers = STATE_TIMERS[state]
+
+        self.widget.update_manager.set_timers_active("update" in timers, "progress" in timers)
+        self.widget.set_animations_active("animations" in timers)
+        self.widget.prefetch_manager.set_active("prefetch" in timers)
+
+        if "check" in timers:
+            if not self.check_timer.isActive():
+                self.check_timer.start(CHECK_INTERVAL_MS)
+        else:
+            self.check_timer.stop()
+
+        if "wake" in timers:
+            self.wake_timer.start(self._ms_until_wake())
+        else:
+            self.wake_timer.stop()
+
+        # Jedno odświeżenie nadrabiające zaległości po powrocie do aktywności
+        if state == POWER_ACTIVE and previous is not None:
+            self.widget.update_manager.trigger_update()
+
+    def _ms_until_wake(self):
+        """Czas do wybudzenia: przed pierwszą lekcją dzisiaj lub ponowne sprawdzenie"""
+        if self._bounds is not None:
+            now = datetime.now()
+            minute = now.hour * 60 + now.minute
+            wake_minute = self._bounds[0] - OFF_HOURS_MARGIN_MIN
+            if minute < wake_minute:
+                return min(OFF_HOURS_RECHECK_MS, (wake_minute - minute) * 60 * 1000)
+        return OFF_HOURS_RECHECK_MS
+
+    def stop(self):
+        """Zatrzymuje timery menedżera (przy zamykaniu aplikacji)"""
+        self._evaluate_timer.stop()
+        self.check_timer.stop()
+        self.wake_timer.stop()
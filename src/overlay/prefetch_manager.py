@@ -0,0 +1,142 @@
+"""
+Moduł wstępnego pobierania planów sąsiednich grup (inna grupa L lub K) w czasie bezczynności,
+aby zmiana grupy w ustawieniach była obsłużona z cache
+"""
+import multiprocessing
+import time
+from collections import deque
+
+import psutil
+from PyQt6.QtCore import QObject, QTimer
+
+from src.fetcher import run_fetch_process
+from src.log_manager import log_manager
+from src.request_builder import GROUP_L_OPTIONS, GROUP_K_OPTIONS
+from src.overlay.instrumentation import instrumentation
+
+
+PREFETCH_INTERVAL_MS = 20 * 1000  # Co ile sprawdzać, czy można pobrać kolejną grupę
+POLL_INTERVAL_MS = 200            # Sprawdzanie kolejki tylko podczas pobierania
+BUDGET_WINDOW_S = 3600
+DEFAULT_MAX_PER_HOUR = 12         # Limit zapytań prefetch (budżet łącza)
+DEFAULT_MAX_CPU_PERCENT = 30      # Prefetch tylko gdy obciążenie systemu jest niższe (budżet CPU)
+
+
+def sibling_groups(groups):
+    """Trójki grup różniące się od bieżącej jedną grupą L lub K"""
+    group_c, group_l, group_k = groups
+    for option in GROUP_L_OPTIONS:
+        if option != group_l:
+            yield (group_c, option, group_k)
+    for option in GROUP_K_OPTIONS:
+        if option != group_k:
+            yield (group_c, group_l, option)
+
+
+class PrefetchManager(QObject):
+    """Pobiera w tle (jeden proces naraz, niski priorytet) plany sąsiednich grup do cache UpdateManager"""
+
+    def __init__(self, widget):
+        super().__init__()
+        self.widget = widget
+        self.queue = multiprocessing.Queue()
+        self._process = None
+        self.active = False  # Stan energii pozwala na pobieranie w tle (PowerManager)
+        self._history = deque()  # Czasy rozpoczętych pobrań w oknie budżetu
+
+        self.tick_timer = QTimer(self)
+        self.tick_timer.timeout.connect(self.tick)
+        self.poll_timer = QTimer(self)
+        self.poll_timer.timeout.connect(self._poll)
+        instrumentation.register_timer(self.tick_timer, "PrefetchManager.tick_timer")
+        instrumentation.register_timer(self.poll_timer, "PrefetchManager.poll_timer")
+
+        # Pierwszy pomiar CPU zwraca 0 - kolejne mierzą obciążenie od poprzedniego wywołania
+        psutil.cpu_percent(interval=None)
+
+    def set_active(self, active):
+        """
+        Włącza/wyłącza sprawdzanie (sterowane przez PowerManager). Timer działa tylko
+        przy włączonym "prefetch_enabled" - ponowne wywołanie po zmianie ustawień.
+        """
+        self.active = active
+        if not (active and self.widget.settings_manager.snapshot().prefetch_enabled):
+            self.tick_timer.stop()
+        elif not self.tick_timer.isActive():
+            self.tick_timer.start(PREFETCH_INTERVAL_MS)
+
+    def _budget_available(self, max_per_hour):
+        now = time.monotonic()
+        while self._history and now - self._history[0] > BUDGET_WINDOW_S:
+            self._history.popleft()
+        return len(self._history) < max_per_hour
+
+    def next_candidate(self):
+        """Sąsiednia trójka bez danych w cache, a gdy takiej nie ma - z najstarszymi danymi"""
+        update_manager = self.widget.update_manager
+        cache = update_manager.cache
+        oldest = None
+        oldest_time = None
+        now = time.time()
+        for candidate in sibling_groups(update_manager.current_groups()):
+            entry = cache.peek(candidate)
+            if entry is None:
+                return candidate
+            fetched = entry[1]
+            if now - fetched < cache.ttl:
+                continue
+            if oldest_time is None or fetched < oldest_time:
+                oldest, oldest_time = candidate, fetched
+        return oldest
+
+    def tick(self):
+        """Rozpoczyna jedno pobranie, jeśli pozwalają na to ustawienia i budżety"""
+        settings = self.widget.settings_manager.get_current_settings()
+        if not settings.get("prefetch_enabled") or self._process is not None:
+            return
+        update_manager = self.widget.update_manager
+        if update_manager._api_update_in_progress or not update_manager.are_groups_set():
+            return
+        if not self._budget_available(settings.get("prefetch_max_per_hour", DEFAULT_MAX_PER_HOUR)):
+            return
+        if psutil.cpu_percent(interval=None) > settings.get("prefetch_max_cpu", DEFAULT_MAX_CPU_PERCENT):
+            return
+
+        candidate = self.next_candidate()
+        if candidate is None:
+            return
+
+        self._history.append(time.monotonic())
+        group_c, group_l, group_k = candidate
+        prefetch_settings = settings.replace(group_c=group_c, group_l=group_l, group_k=group_k)
+        self._process = multiprocessing.Process(target=run_fetch_process, args=(prefetch_settings, self.queue))
+        self._process.start()
+        self.poll_timer.start(POLL_INTERVAL_MS)
+
+    def _poll(self):
+        if self.queue.empty():
+            # Proces zakończył się bez wyniku (np. został zabity)
+            if self._process is not None and not self._process.is_alive() and self.queue.empty():
+                self._finish()
+            return
+        result = self.queue.get()
+        self._finish()
+        log_manager.replay(result.get("logs"))
+        if result["timetable"] is not None:
+            # Na końcu LRU / w osobnym budżecie - nie wypiera trójek oglądanych przez użytkownika
+            self.widget.update_manager.cache.put(tuple(result["groups"]), result["timetable"], prefetched=True)
+            self.widget.update_manager.save_cache()
+
+    def _finish(self):
+        self.poll_timer.stop()
+        if self._process is not None:
+            self._process.join(timeout=0)
+        self._process = None
+
+    def stop(self):
+        """Zatrzymuje timery i trwające pobieranie w tle (przy zamykaniu aplikacji)"""
+        self.tick_timer.stop()
+        if self._process is not None and self._process.is_alive():
+            self._process.terminate()
+            self._process.join(timeout=1)
+        self._finish()
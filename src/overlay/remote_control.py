@@ -0,0 +1,133 @@
+"""
+Moduł obsługi poleceń IPC - tray i okno ustawień uruchomione jako osobne procesy
+oraz kolejne uruchomienia programu sterują overlay przez lokalny serwer (src.ipc.server)
+"""
+import logging
+import multiprocessing
+
+from PyQt6.QtCore import QTimer
+
+from src.ipc.server import IpcServer
+from src.ipc.client import run_client
+from src.ipc.protocol import IpcError
+
+logger = logging.getLogger(__name__)
+
+
+UI_MODE_EMBEDDED = "embedded"      # Tray i ustawienia w procesie overlay
+UI_MODE_STANDALONE = "standalone"  # Tray i ustawienia jako osobne procesy klienckie
+
+# Moduły procesów klienckich (main(port, token)) - importowane tylko w procesie potomnym
+TRAY_MODULE = "src.tray_process"
+SETTINGS_MODULE = "src.settings_process"
+
+
+class RemoteControl:
+    """Serwer IPC overlay i procesy klienckie (tray, ustawienia)"""
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.server = IpcServer(self.handlers(), parent=widget)
+        self.listening = False
+        self.tray_process = None
+        self.settings_process = None
+
+    def handlers(self):
+        return {
+            "get_state": self.get_state,
+            "get_settings": self.get_settings,
+            "update_settings": self.update_settings,
+            "preview_opacity": self.preview_opacity,
+            "show": self.show,
+            "toggle_overlay": self.toggle_overlay,
+            "refresh": self.refresh,
+            "open_settings": self.open_settings,
+            "settings_closed": self.settings_closed,
+            "set_debug_hud": self.set_debug_hud,
+            "dump_log": self.dump_log,
+            "quit": self.quit,
+        }
+
+    def start(self):
+        """Uruchamia serwer IPC; zwraca False jeśli nie można nasłuchiwać"""
+        try:
+            self.server.start()
+            self.listening = True
+        except IpcError as e:
+            logger.warning("Nie można uruchomić serwera IPC: %s", e)
+        return self.listening
+
+    def stop(self):
+        self.server.stop()
+        for process in (self.tray_process, self.settings_process):
+            if process is not None and process.is_alive():
+                process.terminate()
+
+    def _spawn(self, module):
+        # "spawn" - proces kliencki startuje czysto (bez stanu Qt i pamięci procesu overlay)
+        context = multiprocessing.get_context("spawn")
+        process = context.Process(target=run_client, args=(module, self.server.port, self.server.token),
+                                  daemon=True)
+        process.start()
+        return process
+
+    def start_tray(self):
+        if self.tray_process is None or not self.tray_process.is_alive():
+            self.tray_process = self._spawn(TRAY_MODULE)
+
+    # ===== Polecenia =====
+    def get_state(self):
+        widget = self.widget
+        return {
+            "visible": widget.isVisible(),
+            "clickthrough": widget._clickthrough_enabled,
+            "drag_enabled": widget.drag_enabled,
+            "scaling_enabled": widget.scaling_enabled,
+            "debug_hud": widget.debug_hud is not None and widget.debug_hud.isVisible(),
+        }
+
+    def get_settings(self):
+        # Migawka nie jest serializowalna do JSON - słownik do wysłania
+        return self.widget.get_current_settings().to_dict()
+
+    def update_settings(self, settings):
+        self.widget.update_settings(settings)
+        return self.get_state()
+
+    def preview_opacity(self, value):
+        self.widget.setWindowOpacity(value)
+
+    def show(self):
+        if not self.widget.isVisible():
+            self.widget.toggle_overlay()
+        self.widget.raise_()
+        return True
+
+    def toggle_overlay(self):
+        self.widget.toggle_overlay()
+        return self.widget.isVisible()
+
+    def refresh(self):
+        self.widget.update_manager.refresh_now()
+
+    def open_settings(self):
+        self.widget.open_settings()
+
+    def start_settings(self):
+        """Uruchamia proces ustawień (jeden naraz)"""
+        if self.settings_process is None or not self.settings_process.is_alive():
+            self.settings_process = self._spawn(SETTINGS_MODULE)
+
+    def settings_closed(self):
+        if self.widget._clickthrough_enabled:
+            self.widget.enable_clickthrough()
+
+    def set_debug_hud(self, enabled):
+        self.widget.set_debug_hud_enabled(enabled)
+
+    def dump_log(self):
+        return self.widget.dump_log()
+
+    def quit(self):
+        # Najpierw odpowiedź do klienta, zamknięcie po powrocie do pętli zdarzeń
+        QTimer.singleShot(0, self.widget.quit_application)
@@ -1,19 +1,117 @@
 """
 Moduł zarządzający ustawieniami overlay
 """
+import contextlib
 import json
+import logging
 import os
-from PyQt6.QtCore import QTimer, QMutex
+import threading
+import time
+from PyQt6.QtCore import QTimer
+
+from src.metrics import registry
+from src.settings_schema import Settings, DEFAULT_SETTINGS
+from src.overlay.timetable_cache import GROUP_KEYS
+
+logger = logging.getLogger(__name__)
+
+SAVE_SECONDS = registry.histogram("overlay_settings_save_seconds", "Czas zapisu settings.json")
+SAVE_ERRORS = registry.counter("overlay_settings_save_errors_total", "Nieudane zapisy settings.json")
+
+
+class SettingsWriter:
+    """
+    Zapis settings.json w wątku w tle - wolny dysk (np. katalog domowy na NFS)
+    nie blokuje pętli zdarzeń. Przyjmuje niezmienne migawki i zawsze zapisuje
+    tylko najnowszą (oczekujące starsze są pomijane); plik podmieniany atomowo.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self._pending = None
+        self._busy = False
+        self._written_revision = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="SettingsWriter", daemon=True)
+        self._thread.start()
+    
+    def submit(self, settings):
+        """Przekazuje migawkę do zapisu (nie blokuje)"""
+        with self._condition:
+            self._pending = settings
+            self._condition.notify_all()
+    
+    def flush(self, timeout=5.0):
+        """Czeka, aż oczekująca migawka zostanie zapisana (tylko przy zamykaniu)"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._pending is None and not self._busy, timeout):
+                logger.warning("Zapis ustawień nie zakończył się w %s s", timeout)
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None)
+                settings, self._pending = self._pending, None
+                self._busy = True
+            try:
+                # Rewizja oznaczona jako zapisana dopiero po udanym os.replace - po błędzie
+                # ta sama migawka (np. przy zamykaniu) zostanie zapisana ponownie
+                if settings.revision != self._written_revision and self._write(settings):
+                    self._written_revision = settings.revision
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+    
+    def _write(self, settings):
+        """Zapisuje migawkę; True gdy plik został podmieniony"""
+        start = time.perf_counter()
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(settings.to_dict(), f, indent=4)
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception as e:
+            SAVE_ERRORS.inc()
+            logger.error("Błąd zapisu ustawień: %s", e)
+            return False
+        finally:
+            SAVE_SECONDS.observe(time.perf_counter() - start)
+
+
+class SettingsTransaction:
+    """
+    Zmiany zebrane w SettingsManager.transaction(). Po wyjściu z bloku
+    `settings` to nowa migawka, a `changed` - klucze, które faktycznie się zmieniły.
+    """
+    
+    def __init__(self):
+        self.changes = {}
+        self.settings = None
+        self.changed = frozenset()
+    
+    def set(self, key, value):
+        self.changes[key] = value
+    
+    def update(self, values):
+        self.changes.update(values)
 
 
 class SettingsManager:
-    """Zarządza cache'owaniem i zapisem ustawień overlay"""
+    """
+    Zarządza cache'owaniem i zapisem ustawień overlay. Ustawienia są trzymane
+    jako niezmienna, zwalidowana migawka (settings_schema.Settings) z rosnącym
+    numerem rewizji. Zmiana tworzy nową migawkę i podmienia referencję, więc
+    czytelnicy dostają ją bez blokady i bez kopiowania.
+    """
     
     def __init__(self, config_path):
         self.config_path = config_path
-        self._settings_cache = {}
-        self._settings_mutex = QMutex()
+        self._revision = 0
+        self._settings = DEFAULT_SETTINGS
         self._save_pending = False
+        self._writer = SettingsWriter(config_path)
         
         # Timer do opóźnionego zapisu ustawień
         self._save_timer = QTimer()
@@ -21,83 +119,88 @@ class SettingsManager:
         self._save_timer.timeout.connect(self._delayed_save_settings)
     
     def load_settings(self):
-        """Wczytuje ustawienia z pliku do cache"""
+        """Wczytuje ustawienia z pliku (migracja i walidacja raz) i zwraca migawkę"""
         try:
             if not os.path.exists(self.config_path):
-                self._settings_cache = self._get_default_settings()
-                return self._settings_cache.copy()
+                return self._publish(DEFAULT_SETTINGS)
             
             with open(self.config_path, "r", encoding="utf-8") as f:
                 loaded_data = json.load(f)
+            if not isinstance(loaded_data, dict):
+                raise ValueError("plik ustawień nie zawiera obiektu JSON")
             
-            # Połącz załadowane dane z domyślnymi
-            default_settings = self._get_default_settings()
-            self._settings_cache = {**default_settings, **loaded_data}
-            
-            return self._settings_cache.copy()
+            # Brakujące klucze - wartości domyślne, błędne - ostrzeżenie i wartość domyślna
+            return self._publish(Settings.from_dict(loaded_data))
             
         except Exception as e:
-            print("Błąd podczas wczytywania ustawień:", e)
-            self._settings_cache = self._get_default_settings()
-            return self._settings_cache.copy()
+            logger.error("Błąd podczas wczytywania ustawień: %s", e)
+            return self._publish(DEFAULT_SETTINGS)
+    
+    def _publish(self, settings):
+        """Ustawia nową migawkę z kolejnym numerem rewizji i ją zwraca"""
+        self._revision += 1
+        self._settings = settings.with_revision(self._revision)
+        return self._settings
     
     def _get_default_settings(self):
         """Zwraca domyślne ustawienia"""
-        return {
-            "opacity": 1.0,
-            "clickthrough": True,
-            "drag_enabled": True,
-            "scaling_enabled": False,
-            "group_c": None,
-            "group_l": None,
-            "group_k": None,
-            "scale": 1.0,
-            "position": [100, 100],
-            "width": 420,
-            "height": 100
-        }
+        return DEFAULT_SETTINGS.to_dict()
     
     def get_current_settings(self):
-        """Zwraca aktualne ustawienia z cache"""
-        try:
-            self._settings_mutex.lock()
-            return self._settings_cache.copy()
-        finally:
-            self._settings_mutex.unlock()
+        """Zwraca aktualne ustawienia z cache (niezmienna migawka, jak snapshot())"""
+        return self._settings
+    
+    def snapshot(self):
+        """Bieżąca migawka ustawień (niezmienna - bez kopiowania)"""
+        return self._settings
     
     def get_group_settings(self):
         """Pobiera aktualne ustawienia grup z cache"""
-        settings = self.get_current_settings()
+        settings = self._settings
         return {
             "group_c": settings.get("group_c"),
             "group_l": settings.get("group_l"),
             "group_k": settings.get("group_k")
         }
     
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Zbiera zmiany wielu kluczy i stosuje je razem: jedna nowa migawka,
+        jeden zaplanowany zapis i tylko gdy coś faktycznie się zmieniło.
+        Wyjątek w bloku porzuca zmiany.
+        
+            with settings_manager.transaction() as tx:
+                tx.update({"opacity": 0.8, "group_c": "11K1"})
+            apply(tx.settings, tx.changed)
+        """
+        tx = SettingsTransaction()
+        yield tx
+        old = self._settings
+        changes = {}
+        for key, value in tx.changes.items():
+            # ZACHOWAJ ISTNIEJĄCE WARTOŚCI GRUP JEŚLI NOWA WARTOŚĆ JEST None
+            if key in GROUP_KEYS and value is None and old.get(key) is not None:
+                continue
+            changes[key] = value
+        # Walidacja tylko przekazanych kluczy; ta sama migawka, gdy nic się nie zmieniło
+        settings = old.replace(**changes)
+        if settings is old:
+            tx.settings = old
+            return
+        tx.changed = old.diff(settings)
+        tx.settings = self._publish(settings)
+        self.request_save_settings()
+    
     def update_settings(self, new_settings):
-        """Aktualizuje ustawienia w cache i planuje zapis do pliku"""
+        """Aktualizuje ustawienia w cache i planuje zapis do pliku; zwraca zmienione klucze"""
         try:
-            self._settings_mutex.lock()
-            
-            # AKTUALIZUJ TYLKO PRZEKAZANE KLUCZE - nie usuwaj istniejących
-            for key, value in new_settings.items():
-                # ZACHOWAJ ISTNIEJĄCE WARTOŚCI GRUP JEŚLI NOWA WARTOŚĆ JEST None
-                if key in ["group_c", "group_l", "group_k"] and value is None:
-                    current_value = self._settings_cache.get(key)
-                    if current_value is not None:
-                        # Zachowaj istniejącą wartość, nie nadpisuj na None
-                        continue
-                
-                # ZAPISZ WARTOŚĆ DLA WSZYSTKICH INNYCH PRZYPADKÓW
-                self._settings_cache[key] = value
-            
-            # Użyj opóźnionego zapisu
-            self.request_save_settings()
-            
+            with self.transaction() as tx:
+                tx.update(new_settings)
+            return tx.changed
         except Exception as e:
-            print("Błąd aktualizacji ustawień:", e)
-        finally:
-            self._settings_mutex.unlock()
+            logger.error("Błąd aktualizacji ustawień: %s", e)
+            return frozenset()
     
     def update_group_settings(self, group_settings):
         """Aktualizuje ustawienia grup w cache"""
@@ -116,24 +219,15 @@ class SettingsManager:
             self._save_pending = False
     
     def _save_settings_impl(self):
-        """Faktyczna implementacja zapisu ustawień"""
-        try:
-            self._settings_mutex.lock()
-            
-            with open(self.config_path, "w", encoding="utf-8") as f:
-                json.dump(self._settings_cache, f, indent=4)
-            
-        except Exception as e:
-            print("Błąd zapisu ustawień:", e)
-        finally:
-            self._settings_mutex.unlock()
+        """Przekazuje bieżącą migawkę do wątku zapisu"""
+        self._writer.submit(self._settings)
     
     def save_settings(self):
         """Zachowaj kompatybilność - użyj opóźnionego zapisu"""
         self.request_save_settings()
     
     def save_settings_immediately(self):
-        """Zapisuje ustawienia natychmiast (dla SettingsWindow)"""
+        """Zapisuje ustawienia od razu, bez opóźnienia (dla SettingsWindow; zapis nadal w tle)"""
         self._save_timer.stop()
         if self._save_pending:
             self._delayed_save_settings()
@@ -141,7 +235,8 @@ class SettingsManager:
             self._save_settings_impl()
     
     def stop_timers(self):
-        """Zatrzymuje wszystkie timery (przy zamykaniu aplikacji)"""
+        """Zatrzymuje wszystkie timery i czeka na zapis ustawień (przy zamykaniu aplikacji)"""
         self._save_timer.stop()
         if self._save_pending:
             self._delayed_save_settings()
+        self._writer.flush()
@@ -0,0 +1,164 @@
+"""
+Moduł przejścia między dużym a małym stanem overlay - animacja ze zrzutów zamiast układu
+"""
+from PyQt6.QtGui import QPainter, QPixmap
+from PyQt6.QtCore import Qt, QRect, QRectF
+
+from src.overlay.layout_model import OverlayLayout, TOGGLE_BUTTON_OFFSET_RIGHT, TOGGLE_BUTTON_OFFSET_TOP, TOGGLE_BUTTON_SIZE
+from src.overlay.surface_renderer import RENDER_MODE_WIDGETS
+from src.overlay.toggle_button import paint_toggle_arrow
+from src.overlay.ui_renderer import paint_overlay
+
+
+class SizeTransition:
+    """
+    Zwijanie/rozwijanie overlay jako przenikanie dwóch zrzutów (stan początkowy
+    i końcowy) skalowanych do bieżącego prostokąta. Okno zmienia rozmiar raz na
+    początku (do prostokąta obejmującego oba stany) i raz na końcu - style,
+    QVBoxLayout i model układu są przeliczane tylko przy zatwierdzeniu, a klatka
+    animacji to dwa rysowania pixmapy i strzałka.
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.active = False
+        self.progress = 0.0
+        self._snapshot_layout = OverlayLayout()  # Układ do rysowania zrzutów (nie rusza layout_model)
+        self._start_pixmap = None
+        self._end_pixmap = None
+        self._start_size = None
+        self._end_size = None
+        self._end_geometry = None
+        self._bounds_size = None
+
+    def grab_widgets(self):
+        """
+        Zrzut bieżącego drzewa widgetów (tryb widgets) - etykiety z ich arkuszami
+        stylów, tak jak są na ekranie (bez przycisku strzałki)
+        """
+        widget = self.widget
+        btn = getattr(widget, "btn", None)
+        btn_visible = btn is not None and btn.isVisible()
+        if btn_visible:
+            btn.setVisible(False)
+        pixmap = widget.grab()
+        if btn_visible:
+            btn.setVisible(True)
+        return pixmap
+
+    def render_snapshot(self, width, height, scale_factor, is_small):
+        """
+        Rysuje overlay w danym stanie do pixmapy (bez strzałki - ta jest rysowana na żywo).
+        W trybie widgets to przybliżenie: czcionki i marginesy z layout_model zamiast stylów QLabel.
+        """
+        widget = self.widget
+        ratio = widget.devicePixelRatioF()
+        pixmap = QPixmap(max(1, round(width * ratio)), max(1, round(height * ratio)))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.GlobalColor.transparent)
+
+        layout = self._snapshot_layout
+        layout.update(width, height, scale_factor, is_small)
+        painter = QPainter(pixmap)
+        paint_overlay(widget, painter, layout)
+        widget.surface_renderer.paint(painter, layout, arrow=False)
+        painter.end()
+        return pixmap
+
+    def start(self, start_geometry, end_geometry, start_small, duration_ms):
+        """Rozpoczyna przejście; widget ma już ustawiony stan docelowy (is_small, base_width)"""
+        widget = self.widget
+        self.finish()
+        self._end_geometry = QRect(end_geometry)
+
+        if widget.animations.reduced_motion or not widget.isVisible() or duration_ms <= 0:
+            self._commit(bounds_changed=True)
+            return
+
+        start_w, start_h = start_geometry.width(), start_geometry.height()
+        end_w, end_h = end_geometry.width(), end_geometry.height()
+        self._start_size = (start_w, start_h)
+        self._end_size = (end_w, end_h)
+        if widget.render_mode == RENDER_MODE_WIDGETS:
+            # Drzewo widgetów jest jeszcze ułożone dla stanu początkowego - zrzut 1:1. Stan
+            # końcowy powstaje dopiero przy zatwierdzeniu, więc na czas animacji jest przybliżony
+            self._start_pixmap = self.grab_widgets()
+        else:
+            self._start_pixmap = self.render_snapshot(start_w, start_h, widget.scale_factor, start_small)
+        self._end_pixmap = self.render_snapshot(end_w, end_h, end_w / widget.base_width, widget.is_small)
+
+        # Okno obejmujące oba stany, zakotwiczone do prawej krawędzi i góry
+        bounds_w, bounds_h = max(start_w, end_w), max(start_h, end_h)
+        right_edge = start_geometry.x() + start_w
+        self._bounds_size = (bounds_w, bounds_h)
+
+        self.active = True
+        self.progress = 0.0
+        if widget.render_mode == RENDER_MODE_WIDGETS:
+            self._set_children_visible(False)
+        widget.layout.setEnabled(False)
+        widget.setGeometry(right_edge - bounds_w, start_geometry.y(), bounds_w, bounds_h)
+        widget.update()
+
+        # Klatki różniące się o mniej niż piksel nie są rysowane
+        quantum = 1.0 / max(1, abs(end_w - start_w), abs(end_h - start_h))
+        widget.animations.animate("geometry", 0.0, 1.0, duration_ms, self.set_progress,
+                                  quantum=quantum, on_finished=self.finish)
+
+    def set_progress(self, value):
+        """Krok animacji - tylko przerysowanie"""
+        if not self.active:
+            return
+        self.progress = value
+        self.widget.update()
+
+    def finish(self):
+        """Kończy przejście (także przedwcześnie) i zatwierdza stan docelowy"""
+        if not self.active:
+            return
+        self.active = False
+        self.widget.animations.stop("geometry")
+        self._start_pixmap = None
+        self._end_pixmap = None
+        self._commit(bounds_changed=self._bounds_size != self._end_size)
+
+    def _commit(self, bounds_changed):
+        """Jedna zmiana geometrii i jedno przeliczenie prawdziwego układu"""
+        widget = self.widget
+        widget.layout.setEnabled(True)
+        if widget.render_mode == RENDER_MODE_WIDGETS:
+            self._set_children_visible(True)
+        widget.setGeometry(self._end_geometry)
+        if not bounds_changed:
+            # Rozmiar okna się nie zmienił - resizeEvent nie nadejdzie
+            widget.relayout()
+        widget.layout.activate()
+        widget.update()
+
+    def _set_children_visible(self, visible):
+        widget = self.widget
+        for child in (widget.header_container, widget.progress_bar, widget.btn):
+            child.setVisible(visible)
+        widget.info_container.setVisible(visible and not widget.is_small)
+
+    def current_rect(self):
+        """Prostokąt overlay w bieżącej klatce (współrzędne okna przejścia)"""
+        t = self.progress
+        width = self._start_size[0] + (self._end_size[0] - self._start_size[0]) * t
+        height = self._start_size[1] + (self._end_size[1] - self._start_size[1]) * t
+        return QRectF(self._bounds_size[0] - width, 0, width, height)
+
+    def paint(self, painter):
+        """Rysuje klatkę: przenikanie zrzutów skalowanych do bieżącego prostokąta"""
+        rect = self.current_rect()
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        t = self.progress
+        for pixmap, opacity in ((self._start_pixmap, 1.0 - t), (self._end_pixmap, t)):
+            if opacity > 0:
+                painter.setOpacity(opacity)
+                painter.drawPixmap(rect, pixmap, QRectF(pixmap.rect()))
+        painter.setOpacity(1.0)
+
+        button_rect = QRectF(rect.right() - TOGGLE_BUTTON_OFFSET_RIGHT, rect.top() + TOGGLE_BUTTON_OFFSET_TOP,
+                             TOGGLE_BUTTON_SIZE, TOGGLE_BUTTON_SIZE)
+        paint_toggle_arrow(painter, button_rect, self.widget.btn.angle)
@@ -0,0 +1,98 @@
+"""
+Renderer trybu jednej warstwy - cała treść overlay rysowana w jednym paintEvent
+"""
+from PyQt6.QtGui import QColor, QPainter, QPen
+from PyQt6.QtCore import QRectF, QPointF
+
+from src.overlay.modern_progress_bar import paint_progress_bar
+from src.overlay.toggle_button import paint_toggle_arrow
+
+
+RENDER_MODE_WIDGETS = "widgets"
+RENDER_MODE_SINGLE_SURFACE = "single_surface"
+RENDER_MODES = (RENDER_MODE_WIDGETS, RENDER_MODE_SINGLE_SURFACE)
+
+TITLE_COLOR = QColor(255, 255, 255)
+TIME_COLOR = QColor(255, 255, 255, 230)
+PLACE_COLOR = QColor(255, 255, 255)
+PILL_BG_COLOR = QColor(255, 255, 255, 25)
+PILL_BORDER_COLOR = QColor(255, 255, 255, 25)
+
+
+class SurfaceRenderer:
+    """
+    Rysuje tytuł, pasek postępu, czas, "pigułkę" sali i strzałkę przycisku
+    bezpośrednio na OverlayWidget. Teksty są przygotowywane raz (QStaticText)
+    i cache'owane we wspólnym TextCache overlay.
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+
+    def invalidate(self):
+        """Czyści cache tekstów (np. po zmianie trybu)"""
+        self.widget.text_cache.clear()
+
+    def _static_text(self, text, font, max_width):
+        """Zwraca przygotowany QStaticText (przycięty do max_width) ze wspólnego cache"""
+        return self.widget.text_cache.static_text(text, font, max_width)
+
+    def place_rect(self, layout=None):
+        """Zwraca prostokąt "pigułki" z salą (zależny od długości tekstu)"""
+        if layout is None:
+            layout = self.widget.layout_model
+        m = layout.metrics
+        info = layout.info_rect
+        text = self._static_text(self.widget.right_text, layout.place_font, info.width() / 2)
+        width = max(m["place_min_w"], text.size().width() + 2 * m["place_padding"])
+        height = m["place_min_h"]
+        return QRectF(info.right() - width, info.center().y() - height / 2, width, height), text
+
+    def paint(self, painter, layout=None, arrow=True):
+        """Rysuje całą treść overlay (tło rysuje paint_overlay); layout - np. układ zrzutu"""
+        widget = self.widget
+        if layout is None:
+            layout = widget.layout_model
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # --- Tytuł ---
+        title = self._static_text(widget.title, layout.title_font, layout.title_rect.width())
+        self._draw_text(painter, title, layout.title_font, TITLE_COLOR, layout.title_rect)
+
+        # --- Pasek postępu ---
+        paint_progress_bar(painter, layout.bar_rect, widget.getProgress(), widget.shine_pos)
+
+        # --- Czas i sala (tylko w dużym stanie) ---
+        if not layout.is_small:
+            pill_rect, place_text = self.place_rect(layout)
+
+            info = layout.info_rect
+            time_width = max(0, pill_rect.left() - info.left() - layout.metrics["spacing"])
+            time_text = self._static_text(widget.left_text, layout.time_font, time_width)
+            self._draw_text(painter, time_text, layout.time_font, TIME_COLOR,
+                            QRectF(info.left(), info.top(), time_width, info.height()))
+
+            radius = min(layout.metrics["place_radius"], pill_rect.height() / 2)
+            painter.setPen(QPen(PILL_BORDER_COLOR, 1))
+            painter.setBrush(PILL_BG_COLOR)
+            painter.drawRoundedRect(pill_rect.adjusted(0.5, 0.5, -0.5, -0.5), radius, radius)
+            size = place_text.size()
+            painter.setFont(layout.place_font)
+            painter.setPen(PLACE_COLOR)
+            painter.drawStaticText(
+                QPointF(pill_rect.center().x() - size.width() / 2, pill_rect.center().y() - size.height() / 2),
+                place_text
+            )
+
+        # --- Strzałka przycisku zwijania ---
+        if arrow:
+            paint_toggle_arrow(painter, layout.toggle_button_rect, widget.btn.angle)
+
+    def _draw_text(self, painter, static_text, font, color, rect):
+        """Rysuje tekst wyrównany do lewej i wyśrodkowany w pionie"""
+        painter.setFont(font)
+        painter.setPen(color)
+        painter.drawStaticText(
+            QPointF(rect.left(), rect.top() + (rect.height() - static_text.size().height()) / 2),
+            static_text
+        )
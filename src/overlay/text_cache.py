@@ -0,0 +1,58 @@
+"""
+Cache przyciętych (elided) i przygotowanych (QStaticText) tekstów etykiet overlay
+"""
+from collections import OrderedDict
+
+from PyQt6.QtGui import QFontMetricsF, QStaticText, QTransform
+from PyQt6.QtCore import Qt
+
+
+WIDTH_BUCKET = 8  # px - zmiana szerokości o mniej niż kubełek nie przelicza tekstu
+MAX_ENTRIES = 128
+
+
+class TextCache:
+    """
+    Przycina teksty do szerokości z dokładnością do kubełka (WIDTH_BUCKET)
+    i przechowuje wynik (oraz gotowy QStaticText) w ograniczonym cache LRU.
+    """
+
+    def __init__(self, bucket=WIDTH_BUCKET, max_entries=MAX_ENTRIES):
+        self.bucket = bucket
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def _bucket_width(self, width):
+        """Zaokrągla szerokość w dół do kubełka (tekst zawsze się mieści)"""
+        return max(0, int(width) // self.bucket * self.bucket)
+
+    def _get(self, text, font, width):
+        key = (text, font.key(), self._bucket_width(width))
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+
+        elided = QFontMetricsF(font).elidedText(text, Qt.TextElideMode.ElideRight, key[2])
+        entry = [elided, None]
+        self._entries[key] = entry
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def elide(self, text, font, width):
+        """Zwraca tekst przycięty z wielokropkiem do podanej szerokości"""
+        return self._get(text, font, width)[0]
+
+    def static_text(self, text, font, width):
+        """Zwraca przycięty, przygotowany do rysowania QStaticText"""
+        entry = self._get(text, font, width)
+        if entry[1] is None:
+            static_text = QStaticText(entry[0])
+            static_text.setTextFormat(Qt.TextFormat.PlainText)
+            static_text.prepare(QTransform(), font)
+            entry[1] = static_text
+        return entry[1]
+
+    def clear(self):
+        self._entries.clear()
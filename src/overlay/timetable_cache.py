@@ -0,0 +1,138 @@
+"""
+Moduł cache planów zajęć - LRU z czasem ważności, kluczem jest trójka grup
+"""
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+GROUP_KEYS = ("group_c", "group_l", "group_k")
+
+
+def _parse_item(item):
+    """Wpis pliku cache -> (klucz, (czas pobrania, plan)); ValueError przy złym formacie"""
+    groups = item["groups"]
+    fetched_at = item["fetched_at"]
+    if (not isinstance(groups, list) or len(groups) != len(GROUP_KEYS)
+            or not all(isinstance(group, str) for group in groups)):
+        raise ValueError(f"niepoprawne grupy: {groups!r}")
+    if isinstance(fetched_at, bool) or not isinstance(fetched_at, (int, float)):
+        raise ValueError(f"niepoprawny czas pobrania: {fetched_at!r}")
+    return tuple(groups), (fetched_at, item["timetable"])
+
+
+class TimetableCache:
+    """
+    Ograniczony cache sparsowanych planów (LRU). Wpis po upływie TTL nie jest
+    zwracany przez get(), ale pozostaje dostępny przez get_entry() jako dane
+    zapasowe na wypadek błędu pobierania. Wpisy nie są usuwane przy zmianie
+    grup ani przy odświeżeniu - każda trójka ma własny klucz, a nowy plan
+    zastępuje wpis dopiero po udanym pobraniu.
+    
+    Plany pobrane w tle (prefetch) mają osobny, mniejszy budżet wpisów, więc
+    nie wypierają trójek oglądanych przez użytkownika. Odczyt przez get_entry()
+    przenosi taki wpis do głównego LRU.
+    """
+
+    def __init__(self, max_entries=8, ttl=60, max_prefetched=4):
+        self.max_entries = max_entries
+        self.max_prefetched = max_prefetched
+        self.ttl = ttl
+        self._entries = OrderedDict()     # klucz -> (czas pobrania, plan)
+        self._prefetched = OrderedDict()  # jw. - pobrane w tle, jeszcze nie oglądane
+
+    def __len__(self):
+        return len(self._entries) + len(self._prefetched)
+
+    def peek(self, key):
+        """Jak get_entry(), ale bez oznaczania wpisu jako ostatnio użytego"""
+        entry = self._entries.get(key) or self._prefetched.get(key)
+        return None if entry is None else (entry[1], entry[0])
+
+    def get_entry(self, key):
+        """(plan, czas pobrania) niezależnie od wieku wpisu lub None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._prefetched.pop(key, None)
+            if entry is None:
+                return None
+            # Pierwszy odczyt wpisu z prefetch - od teraz to trójka oglądana
+            self._store(key, entry)
+        else:
+            self._entries.move_to_end(key)
+        return entry[1], entry[0]
+
+    def get(self, key):
+        """Plan tylko jeśli wpis jest świeży (młodszy niż TTL)"""
+        entry = self.get_entry(key)
+        if entry is None or time.time() - entry[1] >= self.ttl:
+            return None
+        return entry[0]
+
+    def put(self, key, timetable, prefetched=False):
+        """
+        Zapisuje plan. prefetched=True: pobranie w tle - wpis oglądanej trójki
+        jest tylko odświeżany (bez zmiany pozycji w LRU), nowy trafia do budżetu prefetch.
+        """
+        entry = (time.time(), timetable)
+        if not prefetched:
+            self._prefetched.pop(key, None)
+            self._store(key, entry)
+        elif key in self._entries:
+            self._entries[key] = entry
+        else:
+            self._prefetched[key] = entry
+            self._prefetched.move_to_end(key)
+            while len(self._prefetched) > self.max_prefetched:
+                self._prefetched.popitem(last=False)
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self._prefetched.clear()
+
+    def save(self, path):
+        """Zapisuje wpisy na dysk (atomowo: plik tymczasowy + zamiana)"""
+        data = [
+            {"groups": list(key), "fetched_at": fetched_at, "timetable": timetable, "prefetched": prefetched}
+            for prefetched, entries in ((True, self._prefetched), (False, self._entries))
+            for key, (fetched_at, timetable) in entries.items()
+        ]
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """
+        Wczytuje wpisy zapisane przez save(); brak lub uszkodzony plik jest pomijany,
+        a wpisy o niepoprawnym formacie (np. ręcznie edytowane) - pojedynczo
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for item in data:
+                try:
+                    key, entry = _parse_item(item)
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    logger.warning("Błąd wczytywania cache planu: %s", e)
+                    continue
+                entries = self._prefetched if item.get("prefetched") else self._entries
+                entries[key] = entry
+        except (OSError, ValueError, TypeError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning("Błąd wczytywania cache planu: %s", e)
+            return
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        while len(self._prefetched) > self.max_prefetched:
+            self._prefetched.popitem(last=False)
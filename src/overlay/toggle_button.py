@@ -5,6 +5,38 @@ from PyQt6.QtWidgets import QWidget
 from PyQt6.QtGui import QPainter, QPainterPath, QPen, QColor
 from PyQt6.QtCore import Qt, pyqtProperty
 
+from src.overlay.instrumentation import instrumented_paint
+
+
+ARROW_COLOR = QColor(255, 255, 255, 200)  # rgba(255,255,255, 0.8)
+
+
+def paint_toggle_arrow(painter, rect, angle):
+    """Rysuje strzałkę przycisku (24x24) obróconą o podany kąt w prostokącie rect"""
+    painter.save()
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.translate(rect.x(), rect.y())
+    
+    # Rotate around center
+    painter.translate(12, 12)
+    painter.rotate(angle)
+    painter.translate(-12, -12)
+    
+    # Draw arrow path (SVG: M6 15L12 9L18 15)
+    path = QPainterPath()
+    path.moveTo(6, 15)
+    path.lineTo(12, 9)
+    path.lineTo(18, 15)
+    
+    pen = QPen(ARROW_COLOR)
+    pen.setWidth(2)
+    pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+    pen.setJoinStyle(Qt.PenJoinStyle.RoundJoin)
+    painter.setPen(pen)
+    painter.setBrush(Qt.BrushStyle.NoBrush)
+    painter.drawPath(path)
+    painter.restore()
+
 
 class ToggleButton(QWidget):
     """Custom toggle button with animated arrow rotation"""
@@ -30,26 +62,8 @@ class ToggleButton(QWidget):
     
     angle = pyqtProperty(float, getAngle, setAngle)
     
+    @instrumented_paint("ToggleButton")
     def paintEvent(self, event):
         """Draw the arrow with rotation"""
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
-        # Rotate around center
-        painter.translate(12, 12)
-        painter.rotate(self._angle)
-        painter.translate(-12, -12)
-        
-        # Draw arrow path (SVG: M6 15L12 9L18 15)
-        path = QPainterPath()
-        path.moveTo(6, 15)
-        path.lineTo(12, 9)
-        path.lineTo(18, 15)
-        
-        pen = QPen(QColor(255, 255, 255, 200))  # rgba(255,255,255, 0.8)
-        pen.setWidth(2)
-        pen.setCapStyle(Qt.PenCapStyle.RoundCap)
-        pen.setJoinStyle(Qt.PenJoinStyle.RoundJoin)
-        painter.setPen(pen)
-        painter.setBrush(Qt.BrushStyle.NoBrush)
-        painter.drawPath(path)
+        paint_toggle_arrow(painter, self.rect(), self._angle)
@@ -6,11 +6,52 @@ from datetime import datetime
 from src import api
 
 
+import logging
 import multiprocessing
+import os
+import time
 from PyQt6.QtCore import QObject, QTimer, pyqtSignal
 from datetime import datetime
 from src import api
 from src.fetcher import run_fetch_process
+from src.request_builder import InvalidGroupError
+from src.overlay.timetable_cache import TimetableCache
+from src.overlay.instrumentation import instrumentation
+from src.metrics import registry
+from src.tracing import tracer, span
+from src.log_manager import log_manager
+
+logger = logging.getLogger(__name__)
+
+UPDATE_INTERVAL_MS = 30000    # Pobieranie danych co 30 sekund
+PROGRESS_INTERVAL_MS = 10000  # Odświeżanie progress bara co 10 sekund
+CACHE_MAX_ENTRIES = 12        # Ostatnio używane (oglądane) trójki grup
+CACHE_MAX_PREFETCHED = 8      # Osobny budżet na plany grup sąsiednich z prefetch
+CACHE_FILE = "timetable_cache.json"
+RETRY_BASE_S = 30             # Ponowienie po błędzie pobierania: 30 s, 60 s, 120 s, ...
+RETRY_MAX_S = 15 * 60
+STALE_NOTICE_S = 5 * 60       # Wiek danych pokazywany dopiero gdy są starsze niż 5 minut
+
+CACHE_LOOKUPS = registry.counter("overlay_timetable_cache_lookups_total",
+                                 "Odczyty cache w trigger_update", ("result",))
+FETCHES_STARTED = registry.counter("overlay_fetches_started_total", "Uruchomione procesy pobierania")
+FETCH_RESULTS = registry.counter("overlay_fetch_results_total", "Wyniki pobierania planu", ("result",))
+FETCH_SECONDS = registry.histogram("overlay_fetch_seconds", "Czas pobierania w procesie roboczym")
+REFRESH_SECONDS = registry.histogram("overlay_refresh_seconds",
+                                     "Od trigger_update do obsłużenia wyniku (z uruchomieniem procesu)")
+
+
+def format_age(seconds):
+    """Krótki opis wieku danych, np. 'sprzed 12 min'"""
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"sprzed {minutes} min"
+    hours = minutes // 60
+    if hours < 24:
+        return f"sprzed {hours} h"
+    days = hours // 24
+    return f"sprzed {days} dn."
+
 
 class UpdateManager(QObject):
     """Zarządza okresowymi aktualizacjami danych z API"""
@@ -19,11 +60,23 @@ class UpdateManager(QObject):
         super().__init__()
         self.widget = widget
         self._api_update_in_progress = False
+        self._fetch_started_at = 0.0
+        self._trace = None  # Trace bieżącego odświeżania (gdy śledzenie włączone)
+        self._triggered_at = 0.0
+        self._received_at = 0.0
         
-        # Caching
-        self.timetable_cache = None
-        self.last_fetch_time = 0
+        # Caching - osobny wpis dla każdej trójki grup
         self.CACHE_DURATION = 60  # 1 minute for testing
+        self.cache = TimetableCache(CACHE_MAX_ENTRIES, self.CACHE_DURATION, CACHE_MAX_PREFETCHED)
+        self.cache_path = os.path.join(os.path.dirname(widget.settings_manager.config_path), CACHE_FILE)
+        self.cache.load(self.cache_path)  # Ostatnie dane dostępne od razu, także offline
+        self._shown_groups = None  # Grupy, których plan jest aktualnie wyświetlany
+        self._shown_fetched_at = None
+        self._error_shown = False
+        
+        # Stale-while-revalidate: po błędzie kolejne próby z wykładniczym opóźnieniem,
+        # osobno dla każdej trójki grup: {grupy: (liczba błędów, czas kolejnej próby)}
+        self._backoff = {}
         
         # Multiprocessing
         self.queue = multiprocessing.Queue()
@@ -37,17 +90,24 @@ class UpdateManager(QObject):
         self.progress_timer = QTimer(self.widget)
         self.progress_timer.timeout.connect(self.fast_progress_update)
         
+        instrumentation.register_timer(self.check_queue_timer, "UpdateManager.check_queue_timer")
+        instrumentation.register_timer(self.update_timer, "UpdateManager.update_timer")
+        instrumentation.register_timer(self.progress_timer, "UpdateManager.progress_timer")
+        
         # Dane lekcji
         self.currentLesson = None
         self.nextLesson = None
+        
+        # Wartości pochodne ustawień (poprawność grup, adres zapytania) - liczone raz na rewizję migawki
+        self._derived_revision = None
+        self._groups_valid = False
+        self._request_url = None
     
     def start_updates(self):
         """Rozpoczyna okresowe aktualizacje"""
-        # Timer dla aktualizacji danych co 30 sekund
-        self.update_timer.start(30000)
-        
-        # Timer dla płynnego odświeżania progress bara co 10 sekund
-        self.progress_timer.start(10000)
+        # Timery okresowe - PowerManager wyłączy je, jeśli overlay jest ukryty/nieaktywny
+        self.set_timers_active(True, True)
+        self.widget.power_manager.schedule_evaluate()
         
         # Sprawdź czy grupy są ustawione przed pierwszą aktualizacją
         if not self.are_groups_set():
@@ -61,21 +121,88 @@ class UpdateManager(QObject):
         # Od razu wykonaj pierwszą aktualizację
         self.trigger_update()
     
+    def set_timers_active(self, update, progress):
+        """Włącza/wyłącza timery okresowe (sterowane przez PowerManager)"""
+        if not update:
+            self.update_timer.stop()
+        elif not self.update_timer.isActive():
+            self.update_timer.start(UPDATE_INTERVAL_MS)
+        
+        if not progress:
+            self.progress_timer.stop()
+        elif not self.progress_timer.isActive():
+            self.progress_timer.start(PROGRESS_INTERVAL_MS)
+    
     def are_groups_set(self):
         """Sprawdza czy wszystkie wymagane grupy są ustawione"""
-        settings = self.widget.settings_manager.get_current_settings()
-        group_c = settings.get("group_c")
-        group_l = settings.get("group_l")
-        group_k = settings.get("group_k")
-        
-        return group_c is not None and group_l is not None and group_k is not None
+        settings = self.widget.settings_manager.snapshot()
+        if settings.revision != self._derived_revision:
+            self._derived_revision = settings.revision
+            self._groups_valid = False
+            self._request_url = None
+            if None not in settings.groups:
+                try:
+                    # url_for waliduje grupy - adres trafia od razu do procesu pobierania
+                    self._request_url = api.get_request_builder(settings).url_for(*settings.groups)
+                    self._groups_valid = True
+                except InvalidGroupError as e:
+                    logger.warning("Nieprawidłowe grupy w ustawieniach: %s", e)
+        return self._groups_valid
     
-    def trigger_update(self):
+    def current_groups(self):
+        """Trójka grup z bieżących ustawień"""
+        return self.widget.settings_manager.snapshot().groups
+    
+    @property
+    def timetable_cache(self):
+        """Plan dla bieżących grup (także nieświeży) lub None"""
+        entry = self.cache.get_entry(self.current_groups())
+        return entry[0] if entry else None
+    
+    @property
+    def last_fetch_time(self):
+        """Czas pobrania planu dla bieżących grup (0 gdy brak)"""
+        entry = self.cache.get_entry(self.current_groups())
+        return entry[1] if entry else 0
+    
+    def on_groups_changed(self):
+        """Zmiana grup - plan z cache od razu (także nieświeży), odświeżenie w tle"""
+        if self.current_groups() != self._shown_groups:
+            self.trigger_update()
+    
+    def save_cache(self):
+        """Zapisuje cache planów na dysk"""
+        try:
+            self.cache.save(self.cache_path)
+        except OSError as e:
+            logger.error("Błąd zapisu cache planu: %s", e)
+    
+    def _register_failure(self, groups):
+        """Błąd pobierania dla grup - tylko zmiana stanu i termin kolejnej próby"""
+        failures = self._backoff.get(groups, (0, 0.0))[0] + 1
+        delay = min(RETRY_BASE_S * 2 ** (failures - 1), RETRY_MAX_S)
+        self._backoff[groups] = (failures, time.time() + delay)
+        if failures == 1:
+            logger.warning("Fetch failed for %s, retry in %s s.", "/".join(groups), delay)
+    
+    def _show(self, groups, entry):
+        """Wyświetla plan z wpisu cache (plan, czas pobrania)"""
+        self._shown_groups = groups
+        self._shown_fetched_at = entry[1]
+        self._error_shown = False
+        self.process_timetable(entry[0])
+    
+    def refresh_now(self):
+        """Wymusza pobranie planu z API z pominięciem cache"""
+        self.trigger_update(force=True)
+    
+    def trigger_update(self, force=False):
         """Inicjuje proces aktualizacji (z cache lub API)"""
         if self._api_update_in_progress:
             return
         
         self._api_update_in_progress = True
+        self._triggered_at = time.time()
         
         # SPRAWDŹ CZY GRUPY SĄ USTAWIONE
         if not self.are_groups_set():
@@ -88,50 +215,99 @@ class UpdateManager(QObject):
             self._api_update_in_progress = False
             return
         
-        # Sprawdź cache
-        import time
-        current_time = time.time()
+        # Zawsze najnowsze dostępne dane (także nieświeże), odświeżenie w tle
+        groups = self.current_groups()
+        entry = self.cache.get_entry(groups)
+        if entry is not None:
+            self._show(groups, entry)
         
-        if self.timetable_cache and (current_time - self.last_fetch_time < self.CACHE_DURATION):
-            # Użyj danych z cache
-            self.process_timetable(self.timetable_cache)
+        fresh = entry is not None and time.time() - entry[1] < self.CACHE_DURATION
+        backoff = self._backoff.get(groups)
+        backing_off = backoff is not None and time.time() < backoff[1]
+        if registry.enabled:
+            CACHE_LOOKUPS.inc(labels=("fresh" if fresh else "stale" if entry is not None else "miss",))
+        if not force and (fresh or backing_off):
             self._api_update_in_progress = False
+            if entry is None:
+                # Brak danych dla tych grup i brak pobierania - nie zostawiaj planu poprzednich grup
+                self._show_error(groups)
         else:
             # Uruchom osobny proces
-            settings = self.widget.settings_manager.get_current_settings()
-            p = multiprocessing.Process(target=run_fetch_process, args=(settings, self.queue))
-            p.start()
+            # Niezmienna migawka trafia do procesu bez kopiowania; adres policzony w are_groups_set
+            settings = self.widget.settings_manager.snapshot()
+            self._trace = trace = tracer.start("refresh")
+            trace_id = trace.trace_id if trace else None
+            p = multiprocessing.Process(target=run_fetch_process,
+                                        args=(settings, self.queue, trace_id, self._request_url))
+            self._fetch_started_at = time.perf_counter()
+            with span(trace, "process.start"):
+                p.start()
+            FETCHES_STARTED.inc()
+            if trace:
+                trace.add("trigger_update", self._triggered_at, time.time())
             # Uruchom timer sprawdzający kolejkę
             self.check_queue_timer.start(100)
 
     def check_queue(self):
         """Sprawdza czy są dane w kolejce"""
         if not self.queue.empty():
-            timetable = self.queue.get()
+            result = self.queue.get()
+            self._received_at = time.time()
             self.check_queue_timer.stop()
-            self.handle_fetch_result(timetable)
+            self.handle_fetch_result(result)
 
-    def handle_fetch_result(self, timetable):
-        """Odbiera dane z procesu i aktualizuje UI"""
+    def handle_fetch_result(self, result):
+        """Odbiera dane z procesu ({"groups", "timetable"}) i aktualizuje UI"""
+        log_manager.replay(result.get("logs"))
+        groups = tuple(result["groups"])
+        timetable = result["timetable"]
+        groups_changed = groups != self.current_groups()
+        if registry.enabled:
+            FETCH_RESULTS.inc(labels=("ok" if timetable is not None else "error",))
+            if "fetch_s" in result:
+                FETCH_SECONDS.observe(result["fetch_s"])
+            REFRESH_SECONDS.observe(time.perf_counter() - self._fetch_started_at)
+        trace = self._trace
+        if trace and "trace" in result:
+            trace.merge(result["trace"])
+            # Od wysłania wyniku przez proces do odczytu w check_queue (interwał odpytywania)
+            worker_end = max(item["end"] for item in result["trace"]["spans"])
+            trace.add("queue.wait", worker_end, self._received_at or worker_end)
+        handled_at = time.time()
         try:
-            if timetable is None:
-                if self.timetable_cache:
-                    print("Warning: Fetch failed, using stale cache.")
-                    self.process_timetable(self.timetable_cache)
-                else:
-                    raise Exception("Failed to fetch timetable data and no cache available.")
+            if timetable is not None:
+                # Zaktualizuj cache (także gdy grupy zmieniły się w trakcie pobierania)
+                with span(trace, "cache.store"):
+                    self.cache.put(groups, timetable)
+                    self.save_cache()
+                self._backoff.pop(groups, None)
             else:
-                # Zaktualizuj cache
-                import time
-                self.timetable_cache = timetable
-                self.last_fetch_time = time.time()
-                self.process_timetable(timetable)
+                self._register_failure(groups)
+            if groups_changed:
+                return
+            
+            entry = self.cache.get_entry(groups)
+            if timetable is not None:
+                with span(trace, "process_timetable"):
+                    self._show(groups, entry)
+            elif entry is None:
+                # Brak jakichkolwiek danych
+                self._show_error(groups)
+            # Przy błędzie z danymi w cache są one już wyświetlone - nic do przerysowania
             
         except Exception as e:
-            print("Błąd podczas aktualizacji danych UI:", e)
+            logger.exception("Błąd podczas aktualizacji danych UI: %s", e)
             self._set_error_state()
         finally:
             self._api_update_in_progress = False
+            if trace:
+                trace.add("handle_fetch_result", handled_at, time.time())
+                trace.add("refresh", self._triggered_at, time.time(), ok=timetable is not None)
+                tracer.finish(trace)
+                self._trace = None
+            if groups_changed:
+                # Wynik dotyczył poprzednich grup - pokaż plan dla bieżących
+                self.trigger_update()
 
     def process_timetable(self, timetable):
         """Przetwarza dane planu i aktualizuje UI"""
@@ -167,10 +343,22 @@ class UpdateManager(QObject):
         self.nextLesson = nextLesson
         
         # Zaktualizuj progress bar od razu
-        self.update_progress()
+        with span(self._trace, "ui.update"):
+            self.update_progress()
+        
+        # Nowy plan może zmienić granice godzin zajęć
+        self.widget.power_manager.schedule_evaluate()
 
+    def _show_error(self, groups):
+        """Stan błędu dla grup - ustawiany raz, nie co cykl"""
+        if not self._error_shown or self._shown_groups != groups:
+            self._set_error_state()
+    
     def _set_error_state(self):
-        """Ustawia UI w stan błędu"""
+        """Ustawia UI w stan błędu (dla bieżących grup)"""
+        self._shown_groups = self.current_groups()
+        self._error_shown = True
+        self._shown_fetched_at = None
         self.currentLesson = {
             "syllabus": "Błąd ładowania",
             "remaining_time": 0,
@@ -233,7 +421,13 @@ class UpdateManager(QObject):
             elapsed_time = (current_time - start_datetime).total_seconds() / 60  # w minutach
             remaining_time = (end_datetime - current_time).total_seconds() / 60  # w minutach
             
-            self.widget.left_text = f"{round(remaining_time)}min → {self.nextLesson.get('syllabus', '-')}"
+            left_text = f"{round(remaining_time)}min → {self.nextLesson.get('syllabus', '-')}"
+            # Dyskretna informacja o wieku danych, gdy nie udało się ich odświeżyć
+            if self._shown_fetched_at is not None:
+                age = time.time() - self._shown_fetched_at
+                if age > STALE_NOTICE_S:
+                    left_text += f" · {format_age(age)}"
+            self.widget.left_text = left_text
             # Jeśli sala jest pusta (np. dla przerwy), wyświetl "-"
             hall = self.nextLesson.get("hall", "")
             self.widget.right_text = hall if hall else "-"
@@ -248,7 +442,7 @@ class UpdateManager(QObject):
             self.widget.update_text_labels()  # Sync QLabel widgets after updating left_text and right_text
             
         except Exception as e:
-            print(f"Błąd podczas aktualizacji postępu: {e}")
+            logger.exception("Błąd podczas aktualizacji postępu: %s", e)
             self.widget.setProgress(0.0)
     
     def stop_timers(self):
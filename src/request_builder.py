@@ -0,0 +1,56 @@
+"""
+Moduł budowania zapytań do API planu - konfigurowalny adres bazowy i szablon endpointu,
+walidacja grup i cache gotowych adresów URL dla każdej trójki grup.
+
+Moduł nie importuje PyQt (używany też w procesie pobierania).
+"""
+
+# Znane grupy - jedyne źródło prawdy dla API i okna ustawień
+GROUP_C_OPTIONS = ("11K1", "11K2")
+GROUP_L_OPTIONS = ("L01", "L02", "L03", "L04", "L05")
+GROUP_K_OPTIONS = ("K01", "K02", "K03", "K04")
+GROUP_OPTIONS = {
+    "group_c": GROUP_C_OPTIONS,
+    "group_l": GROUP_L_OPTIONS,
+    "group_k": GROUP_K_OPTIONS,
+}
+
+# Szablon endpointu doklejany do adresu bazowego. Dostępne pola:
+#   {c}, {l}, {k}                   - numer grupy (ostatni znak, np. "11K1" -> "1")
+#   {group_c}, {group_l}, {group_k} - pełna nazwa grupy
+DEFAULT_ENDPOINT = "?c={c}&l={l}&k={k}"
+
+# Tryb stub - lokalny serwer dev/stub_server.py (testy offline i benchmarki)
+STUB_BASE_URL = "http://127.0.0.1:8765/"
+
+
+class InvalidGroupError(ValueError):
+    """Wartość grupy spoza znanego zbioru"""
+
+
+def validate_groups(group_c, group_l, group_k):
+    """Rzuca InvalidGroupError jeśli któraś grupa jest spoza znanych wartości"""
+    for key, value in (("group_c", group_c), ("group_l", group_l), ("group_k", group_k)):
+        if value not in GROUP_OPTIONS[key]:
+            raise InvalidGroupError(f"{key}={value!r} (dozwolone: {', '.join(GROUP_OPTIONS[key])})")
+
+
+class RequestBuilder:
+    """Buduje adres URL zapytania; wynik jest liczony raz na trójkę grup"""
+
+    def __init__(self, base_url, endpoint=DEFAULT_ENDPOINT):
+        self.base_url = base_url
+        self.endpoint = endpoint
+        self._urls = {}
+
+    def url_for(self, group_c, group_l, group_k):
+        key = (group_c, group_l, group_k)
+        url = self._urls.get(key)
+        if url is None:
+            validate_groups(*key)
+            url = self.base_url + self.endpoint.format(
+                c=group_c[-1], l=group_l[-1], k=group_k[-1],
+                group_c=group_c, group_l=group_l, group_k=group_k,
+            )
+            self._urls[key] = url
+        return url
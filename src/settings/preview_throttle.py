@@ -0,0 +1,98 @@
+"""
+Dławienie podglądu na żywo dla kontrolek ustawień (suwak przezroczystości,
+w przyszłości np. skala czy motyw). Podgląd jest stosowany najwyżej raz na
+klatkę ekranu, a wartość końcowa zatwierdzana (zapisywana) raz - po
+puszczeniu suwaka albo po chwili bez zmian przy klawiaturze i kółku myszy.
+"""
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.QtGui import QGuiApplication
+
+DEFAULT_FRAME_INTERVAL_MS = 16
+SETTLE_MS = 400  # Zatwierdzenie zmian z klawiatury/kółka (bez puszczenia suwaka)
+
+
+def frame_interval_ms():
+    """Odstęp między klatkami głównego ekranu (ms)"""
+    screen = QGuiApplication.primaryScreen()
+    rate = screen.refreshRate() if screen else 0
+    if rate <= 0:
+        return DEFAULT_FRAME_INTERVAL_MS
+    return max(1, round(1000 / rate))
+
+
+class PreviewThrottle(QObject):
+    """
+    preview(value) - lekki podgląd (np. setWindowOpacity), wołany najwyżej raz
+    na klatkę i tylko gdy wartość się zmieniła; pierwsza zmiana od razu.
+    commit(value) - zatwierdzenie wartości końcowej, raz na serię zmian.
+    """
+
+    def __init__(self, preview, commit, parent=None, interval_ms=None, settle_ms=SETTLE_MS):
+        super().__init__(parent)
+        self._preview = preview
+        self._commit = commit
+        self._value = None    # Ostatnia wartość z kontrolki
+        self._shown = None    # Ostatnia wartość przekazana do preview
+        self._dirty = False   # Wartość niezatwierdzona
+        self._held = False    # Suwak trzymany myszą
+
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setInterval(interval_ms or frame_interval_ms())
+        self.frame_timer.timeout.connect(self._on_frame)
+
+        self.settle_timer = QTimer(self)
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.setInterval(settle_ms)
+        self.settle_timer.timeout.connect(self.release)
+
+    def attach(self, slider):
+        """Podłącza suwak: zmiany wartości, złapanie i puszczenie"""
+        slider.valueChanged.connect(self.push)
+        slider.sliderPressed.connect(self.hold)
+        slider.sliderReleased.connect(self.release)
+
+    def reset(self, value):
+        """Wartość ustawiona programowo (np. wczytane ustawienia) - bez podglądu i zapisu"""
+        self.frame_timer.stop()
+        self.settle_timer.stop()
+        self._value = self._shown = value
+        self._dirty = False
+
+    def push(self, value):
+        """Nowa wartość z kontrolki"""
+        if value == self._value:
+            return
+        self._value = value
+        self._dirty = True
+        if not self.frame_timer.isActive():
+            self._show()
+            self.frame_timer.start()
+        if not self._held:
+            self.settle_timer.start()
+
+    def hold(self):
+        self._held = True
+        self.settle_timer.stop()
+
+    def release(self):
+        """Koniec serii zmian - podgląd wartości końcowej i jedno zatwierdzenie"""
+        self._held = False
+        self.settle_timer.stop()
+        self.frame_timer.stop()
+        if not self._dirty:
+            return
+        self._dirty = False
+        self._show()
+        self._commit(self._value)
+
+    def _on_frame(self):
+        if self._value == self._shown:
+            # Klatka bez zmian - timer nie kręci się bezczynnie
+            self.frame_timer.stop()
+            return
+        self._show()
+
+    def _show(self):
+        if self._value != self._shown:
+            self._shown = self._value
+            self._preview(self._value)
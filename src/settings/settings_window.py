@@ -1,21 +1,31 @@
 import os
 import json
+import logging
 import socket
 import threading
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QSlider, QCheckBox, QPushButton,
-    QSpacerItem, QSizePolicy, QHBoxLayout, QButtonGroup, QRadioButton, QMessageBox
+    QSpacerItem, QSizePolicy, QHBoxLayout, QButtonGroup, QRadioButton, QMessageBox, QApplication
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QObject
+from src.ipc import IpcClient, IpcError, TOKEN_ENV, UI_TIMEOUT
+from src.request_builder import GROUP_C_OPTIONS, GROUP_L_OPTIONS, GROUP_K_OPTIONS
 from .ui_components import FancyCloseButton
+from .preview_throttle import PreviewThrottle
 from .styles import (
     get_slider_style, get_checkbox_style, get_button_style, get_radio_button_style
 )
 
+logger = logging.getLogger(__name__)
+
 class SettingsWindow(QWidget):
-    def __init__(self, overlay=None, parent=None):
+    def __init__(self, overlay=None, parent=None, mode="embedded", server_port=None, token=None):
         super().__init__(parent)
         self.overlay = overlay
+        # Tryb standalone - osobny proces, ustawienia wysyłane do overlay przez IPC
+        self.client = None
+        if mode == "standalone":
+            self.client = IpcClient(server_port, token or os.getenv(TOKEN_ENV, ""), timeout=UI_TIMEOUT)
         
         self.setWindowTitle("⚙️ Ustawienia nakładki")
         self.setFixedWidth(420)
@@ -114,8 +124,9 @@ class SettingsWindow(QWidget):
         self.opacity_slider = QSlider(Qt.Orientation.Horizontal)
         self.opacity_slider.setRange(10, 100)
         self.opacity_slider.setValue(100)
-        self.opacity_slider.valueChanged.connect(self.preview_opacity)
-        self.opacity_slider.sliderReleased.connect(self.save_opacity)
+        # Podgląd najwyżej raz na klatkę, zapis raz po puszczeniu suwaka
+        self.opacity_throttle = PreviewThrottle(self.preview_opacity, self.save_opacity, self)
+        self.opacity_throttle.attach(self.opacity_slider)
         self.opacity_slider.setStyleSheet(get_slider_style())
         self.opacity_slider.setCursor(Qt.CursorShape.PointingHandCursor)
         layout.addWidget(self.opacity_slider)
@@ -141,6 +152,41 @@ class SettingsWindow(QWidget):
         self.drag_checkbox.stateChanged.connect(self.on_drag_change)
         layout.addWidget(self.drag_checkbox)
 
+        # ====== Tryb renderowania ======
+        self.single_surface_checkbox = QCheckBox("Tryb jednej warstwy (mniejsze zużycie CPU)")
+        self.single_surface_checkbox.setStyleSheet(get_checkbox_style())
+        self.single_surface_checkbox.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.single_surface_checkbox.stateChanged.connect(self.on_render_mode_change)
+        layout.addWidget(self.single_surface_checkbox)
+
+        # ====== Prefetch ======
+        self.prefetch_checkbox = QCheckBox("Pobieraj w tle plany sąsiednich grup")
+        self.prefetch_checkbox.setStyleSheet(get_checkbox_style())
+        self.prefetch_checkbox.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.prefetch_checkbox.stateChanged.connect(self.on_prefetch_change)
+        layout.addWidget(self.prefetch_checkbox)
+
+        # ====== Animacje ======
+        self.reduced_motion_checkbox = QCheckBox("Ogranicz animacje")
+        self.reduced_motion_checkbox.setStyleSheet(get_checkbox_style())
+        self.reduced_motion_checkbox.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.reduced_motion_checkbox.stateChanged.connect(self.on_reduced_motion_change)
+        layout.addWidget(self.reduced_motion_checkbox)
+
+        # ====== Dziennik zdarzeń ======
+        self.log_to_file_checkbox = QCheckBox("Zapisuj dziennik zdarzeń do pliku")
+        self.log_to_file_checkbox.setStyleSheet(get_checkbox_style())
+        self.log_to_file_checkbox.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.log_to_file_checkbox.stateChanged.connect(self.on_log_to_file_change)
+        layout.addWidget(self.log_to_file_checkbox)
+
+        # ====== Tryb interfejsu ======
+        self.standalone_ui_checkbox = QCheckBox("Tray i ustawienia jako osobne procesy (po ponownym uruchomieniu)")
+        self.standalone_ui_checkbox.setStyleSheet(get_checkbox_style())
+        self.standalone_ui_checkbox.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.standalone_ui_checkbox.stateChanged.connect(self.on_ui_mode_change)
+        layout.addWidget(self.standalone_ui_checkbox)
+
         # ====== Separator ======
         separator = QWidget()
         separator.setFixedHeight(1)
@@ -164,17 +210,17 @@ class SettingsWindow(QWidget):
         group_c_label = QLabel("Grupa C:")
         group_c_label.setStyleSheet(group_label_style)
         layout.addWidget(group_c_label)
-        self.group_c = self.create_group(["11K1", "11K2"], layout)
+        self.group_c = self.create_group(GROUP_C_OPTIONS, layout)
 
         group_l_label = QLabel("Grupa L:")
         group_l_label.setStyleSheet(group_label_style)
         layout.addWidget(group_l_label)
-        self.group_l = self.create_group(["L01", "L02", "L03", "L04", "L05"], layout)
+        self.group_l = self.create_group(GROUP_L_OPTIONS, layout)
 
         group_k_label = QLabel("Grupa K:")
         group_k_label.setStyleSheet(group_label_style)
         layout.addWidget(group_k_label)
-        self.group_k = self.create_group(["K01", "K02", "K03", "K04"], layout)
+        self.group_k = self.create_group(GROUP_K_OPTIONS, layout)
 
         # ====== Separator ======
         separator2 = QWidget()
@@ -247,14 +293,24 @@ class SettingsWindow(QWidget):
             event.accept()
 
     def preview_opacity(self, value):
-        """Tylko zmienia wygląd, nie zapisuje (dla wydajności)"""
+        """Tylko zmienia wygląd, nie zapisuje (dla wydajności; dławione przez opacity_throttle)"""
         if self.overlay:
             try:
                 self.overlay.setWindowOpacity(value / 100.0)
             except Exception as e:
-                print("Błąd przy zmianie przezroczystości:", e)
+                logger.error("Błąd przy zmianie przezroczystości: %s", e)
+        elif self.client:
+            self._remote("preview_opacity", value=value / 100.0)
+
+    def _remote(self, cmd, **args):
+        """Wysyła polecenie do overlay (tryb standalone); None gdy overlay nie odpowiada"""
+        try:
+            return self.client.request(cmd, **args)
+        except IpcError as e:
+            logger.warning("Brak połączenia z overlay: %s", e)
+            return None
 
-    def save_opacity(self):
+    def save_opacity(self, value):
         """Zapisuje ustawienia po zakończeniu przesuwania suwaka"""
         self.save_settings()
 
@@ -266,7 +322,7 @@ class SettingsWindow(QWidget):
         if self.overlay:
             self.overlay.scaling_enabled = self.scaling_checkbox.isChecked()
             self.overlay.update()
-            self.save_settings()
+        self.save_settings()
 
     def on_clickthrough_change(self, state):
         if self.overlay:
@@ -274,21 +330,39 @@ class SettingsWindow(QWidget):
                 self.overlay.enable_clickthrough()
             else:
                 self.overlay.disable_clickthrough()
-            self.save_settings()
+        self.save_settings()
 
     def on_drag_change(self, state):
         if self.overlay:
             self.overlay.drag_enabled = self.drag_checkbox.isChecked()
-            self.save_settings()
+        self.save_settings()
+
+    def on_render_mode_change(self, state):
+        self.save_settings()
+
+    def on_prefetch_change(self, state):
+        self.save_settings()
+
+    def on_reduced_motion_change(self, state):
+        self.save_settings()
+
+    def on_log_to_file_change(self, state):
+        self.save_settings()
+
+    def on_ui_mode_change(self, state):
+        self.save_settings()
 
     # ========================== USTAWIENIA ==========================
     def load_settings(self):
         """Wczytuje ustawienia"""
         try:
-            # W trybie embedded pobierz z overlay
+            # W trybie embedded pobierz z overlay, w standalone przez IPC
+            data = None
             if self.overlay:
                 data = self.overlay.get_current_settings()
-            else:
+            elif self.client:
+                data = self._remote("get_settings")
+            if data is None:
                 # Fallback to file if overlay not available (shouldn't happen in embedded)
                 if os.path.exists(self.config_path):
                     with open(self.config_path, "r", encoding="utf-8") as f:
@@ -301,11 +375,22 @@ class SettingsWindow(QWidget):
             clickthrough = data.get("clickthrough", True)
             drag_enabled = data.get("drag_enabled", True)
             scaling_enabled = data.get("scaling_enabled", False)
-
-            self.opacity_slider.setValue(int(opacity * 100))
+            render_mode = data.get("render_mode", "widgets")
+            prefetch_enabled = data.get("prefetch_enabled", False)
+            reduced_motion = data.get("reduced_motion", False)
+            log_to_file = data.get("log_to_file", False)
+            ui_mode = data.get("ui_mode", "embedded")
+
+            self.opacity_throttle.reset(round(opacity * 100))
+            self.opacity_slider.setValue(round(opacity * 100))
             self.clickthrough_checkbox.setChecked(clickthrough)
             self.drag_checkbox.setChecked(drag_enabled)
             self.scaling_checkbox.setChecked(scaling_enabled)
+            self.single_surface_checkbox.setChecked(render_mode == "single_surface")
+            self.prefetch_checkbox.setChecked(prefetch_enabled)
+            self.reduced_motion_checkbox.setChecked(reduced_motion)
+            self.log_to_file_checkbox.setChecked(log_to_file)
+            self.standalone_ui_checkbox.setChecked(ui_mode == "standalone")
 
             # Grupy zajęciowe
             group_c = data.get("group_c")
@@ -318,7 +403,7 @@ class SettingsWindow(QWidget):
             self.set_checked_label(self.group_k, group_k)
 
         except Exception as e:
-            print(f"Błąd wczytywania ustawień: {e}")
+            logger.error("Błąd wczytywania ustawień: %s", e)
 
     def set_checked_label(self, button_group, label):
         """Ustawia zaznaczony przycisk w grupie"""
@@ -347,6 +432,11 @@ class SettingsWindow(QWidget):
                 "clickthrough": self.clickthrough_checkbox.isChecked(),
                 "drag_enabled": self.drag_checkbox.isChecked(),
                 "scaling_enabled": self.scaling_checkbox.isChecked(),
+                "render_mode": "single_surface" if self.single_surface_checkbox.isChecked() else "widgets",
+                "prefetch_enabled": self.prefetch_checkbox.isChecked(),
+                "reduced_motion": self.reduced_motion_checkbox.isChecked(),
+                "log_to_file": self.log_to_file_checkbox.isChecked(),
+                "ui_mode": "standalone" if self.standalone_ui_checkbox.isChecked() else "embedded",
             }
 
             # Dodaj grupy tylko jeśli są wybrane (nie None)
@@ -362,12 +452,13 @@ class SettingsWindow(QWidget):
                 settings_to_save["group_k"] = group_k
 
             if self.overlay:
-                # W trybie embedded użyj starej metody
+                # Jedna transakcja: różnica, każdy zmieniony aspekt raz, jeden zapis
                 self.overlay.update_settings(settings_to_save)
-                self.overlay.settings_manager.request_save_settings()
+            elif self.client:
+                self._remote("update_settings", settings=settings_to_save)
 
         except Exception as e:
-            print(f"Błąd zapisywania ustawień: {e}")
+            logger.error("Błąd zapisywania ustawień: %s", e)
 
     def confirm_close_app(self):
         """Zamyka całą aplikację z jednym potwierdzeniem"""
@@ -387,12 +478,21 @@ class SettingsWindow(QWidget):
                 elif hasattr(self.overlay, 'quit'):
                     self.overlay.quit()
                 self.close()
+            elif self.client:
+                self._remote("quit")
+                QApplication.quit()
 
     def close_settings(self):
         """Zamyka tylko okno ustawień"""
+        self.opacity_throttle.release()  # Niezatwierdzona zmiana z klawiatury/kółka
         self.hide()
         if self.overlay and hasattr(self.overlay, '_clickthrough_enabled') and self.overlay._clickthrough_enabled:
             self.overlay.enable_clickthrough()
+        elif self.client:
+            # Proces ustawień żyje tylko tak długo jak okno
+            self._remote("settings_closed")
+            self.client.close()
+            QApplication.quit()
 
     def showEvent(self, event):
         """Przeładowuje ustawienia przy każdym otwarciu okna"""
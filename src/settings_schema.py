@@ -0,0 +1,229 @@
+"""
+Schemat ustawień overlay - typowane, niezmienne ustawienia z numerem wersji
+i migracjami. Walidacja odbywa się raz (przy wczytaniu i przy zmianie),
+a konsumenci dostają gotową, niezmienną migawkę.
+
+Moduł nie importuje PyQt - migawka jest przekazywana do procesu pobierania.
+"""
+import dataclasses
+import logging
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+RENDER_MODES = ("widgets", "single_surface")
+UI_MODES = ("embedded", "standalone")
+LOG_LEVELS = ("debug", "info", "warning", "error", "off")
+
+_MISSING = object()
+
+
+# ===== Walidatory: zwracają wartość znormalizowaną lub rzucają ValueError =====
+def _bool(value):
+    if isinstance(value, bool):
+        return value
+    if value in (0, 1):
+        return bool(value)
+    raise ValueError(f"oczekiwano true/false, jest {value!r}")
+
+
+def _number(low, high, kind=float):
+    def check(value):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"oczekiwano liczby, jest {value!r}")
+        return kind(min(max(value, low), high))
+    return check
+
+
+def _choice(*options):
+    def check(value):
+        if value not in options:
+            raise ValueError(f"oczekiwano jednej z {options}, jest {value!r}")
+        return value
+    return check
+
+
+def _str(value):
+    if not isinstance(value, str):
+        raise ValueError(f"oczekiwano tekstu, jest {value!r}")
+    return value
+
+
+def _optional_str(value):
+    return None if value is None else _str(value)
+
+
+def _position(value):
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise ValueError(f"oczekiwano [x, y], jest {value!r}")
+    return tuple(_number(-100000, 100000, int)(v) for v in value)
+
+
+def _setting(default, check):
+    return field(default=default, metadata={"check": check})
+
+
+# ===== Migracje: wersja -> funkcja podnosząca surowy słownik o jedną wersję =====
+def _migrate_0_to_1(data):
+    """Pliki sprzed wersjonowania: null w polach, które nie dopuszczają null, oznacza wartość domyślną"""
+    nullable = {"group_c", "group_l", "group_k"}
+    return {key: value for key, value in data.items() if value is not None or key in nullable}
+
+
+MIGRATIONS = {
+    0: _migrate_0_to_1,
+}
+
+
+def migrate(data):
+    """Podnosi surowy słownik ustawień do SCHEMA_VERSION"""
+    version = data.get("version", 0)
+    if not isinstance(version, int) or version > SCHEMA_VERSION:
+        logger.warning("Nieznana wersja ustawień %r - wczytywanie jak bieżącej", version)
+        version = SCHEMA_VERSION
+    while version < SCHEMA_VERSION:
+        data = MIGRATIONS[version](data)
+        version += 1
+    data = dict(data)
+    data["version"] = SCHEMA_VERSION
+    return data
+
+
+@dataclass(frozen=True, slots=True)
+class Settings(Mapping):
+    """
+    Niezmienna migawka ustawień. Pola mają typy i zakresy sprawdzane w
+    from_dict/replace; nieznane klucze z pliku są zachowywane w `extras`.
+    Działa też jak słownik tylko do odczytu (settings.get("opacity")).
+    `revision` nadaje SettingsManager (rośnie z każdą zmianą) - klucz dla
+    wartości pochodnych liczonych raz na migawkę; nie jest zapisywany.
+    """
+
+    version: int = SCHEMA_VERSION
+    opacity: float = _setting(1.0, _number(0.1, 1.0))
+    clickthrough: bool = _setting(True, _bool)
+    drag_enabled: bool = _setting(True, _bool)
+    scaling_enabled: bool = _setting(False, _bool)
+    group_c: str | None = _setting(None, _optional_str)
+    group_l: str | None = _setting(None, _optional_str)
+    group_k: str | None = _setting(None, _optional_str)
+    scale: float = _setting(1.0, _number(0.1, 10.0))
+    position: tuple = _setting((100, 100), _position)
+    width: int = _setting(420, _number(200, 800, int))
+    height: int = _setting(100, _number(48, 190, int))
+    render_mode: str = _setting("widgets", _choice(*RENDER_MODES))
+    ui_mode: str = _setting("embedded", _choice(*UI_MODES))
+    api_base_url: str = _setting("", _str)
+    api_endpoint: str = _setting("", _str)
+    api_stub: bool = _setting(False, _bool)
+    cache_daemon: bool = _setting(False, _bool)
+    cache_daemon_port: int = _setting(47816, _number(1, 65535, int))
+    cache_daemon_secret_file: str = _setting("", _str)  # Pusty: domyślny plik sekretu maszyny
+    prefetch_enabled: bool = _setting(False, _bool)
+    prefetch_max_per_hour: int = _setting(12, _number(0, 3600, int))
+    prefetch_max_cpu: int = _setting(30, _number(0, 100, int))
+    reduced_motion: bool = _setting(False, _bool)
+    log_level: str = _setting("warning", _choice(*LOG_LEVELS))
+    log_to_file: bool = _setting(False, _bool)
+    metrics_enabled: bool = _setting(False, _bool)
+    metrics_port: int = _setting(47817, _number(0, 65535, int))
+    metrics_textfile: str = _setting("", _str)
+    metrics_textfile_interval: float = _setting(60, _number(0, 86400))
+    tracing_enabled: bool = _setting(False, _bool)
+    extras: tuple = field(default=(), compare=False)  # Nieznane klucze: ((klucz, wartość), ...)
+    revision: int = field(default=0, compare=False)
+
+    # ===== Tworzenie i zmiany (jedyne miejsca walidacji) =====
+    @classmethod
+    def from_dict(cls, data):
+        """Migruje i waliduje surowy słownik (np. z settings.json)"""
+        return cls().replace(**migrate(data))
+
+    def replace(self, **changes):
+        """
+        Nowa migawka ze zmienionymi polami; błędne wartości są pomijane z
+        ostrzeżeniem. Gdy żadna wartość faktycznie się nie zmienia - ta sama migawka.
+        """
+        values = {}
+        extras = None
+        for key, value in changes.items():
+            check = _CHECKS.get(key)
+            if check is None:
+                if key in _META_FIELDS:
+                    continue
+                if extras is None:
+                    extras = dict(self.extras)
+                if extras.get(key, _MISSING) != value:
+                    extras[key] = value
+                    values["extras"] = None
+                continue
+            try:
+                value = check(value)
+            except ValueError as e:
+                logger.warning("Nieprawidłowe ustawienie %s: %s", key, e)
+                continue
+            if value != getattr(self, key):
+                values[key] = value
+        if "extras" in values:
+            values["extras"] = tuple(extras.items())
+        if not values:
+            return self
+        return dataclasses.replace(self, **values)
+
+    def diff(self, other):
+        """Zbiór kluczy, których wartości różnią się w `other` (także nieznanych)"""
+        changed = {name for name in _FIELD_NAMES if getattr(self, name) != getattr(other, name)}
+        if self.extras != other.extras:
+            mine, theirs = dict(self.extras), dict(other.extras)
+            changed.update(key for key in mine.keys() | theirs.keys()
+                           if mine.get(key, _MISSING) != theirs.get(key, _MISSING))
+        return frozenset(changed)
+
+    def with_revision(self, revision):
+        """Ta sama migawka z nadanym numerem rewizji"""
+        return dataclasses.replace(self, revision=revision)
+
+    def to_dict(self):
+        """Słownik do zapisu w settings.json (z nieznanymi kluczami)"""
+        data = dict(self.extras)
+        for name in _FIELD_NAMES:
+            value = getattr(self, name)
+            data[name] = list(value) if isinstance(value, tuple) else value
+        return data
+
+    # ===== Wartości pochodne =====
+    @property
+    def groups(self):
+        """Trójka grup (group_c, group_l, group_k)"""
+        return (self.group_c, self.group_l, self.group_k)
+
+    # ===== Dostęp jak do słownika tylko do odczytu =====
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        for extra_key, value in self.extras:
+            if extra_key == key:
+                return value
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from _FIELD_NAMES
+        for key, _ in self.extras:
+            yield key
+
+    def __len__(self):
+        return len(_FIELD_NAMES) + len(self.extras)
+
+    def __contains__(self, key):
+        return key in _FIELD_SET or any(extra_key == key for extra_key, _ in self.extras)
+
+
+_META_FIELDS = ("version", "extras", "revision")
+_FIELD_NAMES = tuple(f.name for f in dataclasses.fields(Settings) if f.name not in ("extras", "revision"))
+_FIELD_SET = frozenset(_FIELD_NAMES)
+_CHECKS = {f.name: f.metadata["check"] for f in dataclasses.fields(Settings) if "check" in f.metadata}
+
+DEFAULT_SETTINGS = Settings()
@@ -0,0 +1,118 @@
+"""
+Moduł pojedynczej instancji - blokada pliku w katalogu konfiguracji.
+Drugie uruchomienie przekazuje polecenia (pokaż, przełącz, ustawienia, odśwież)
+do działającej instancji przez IPC i kończy się bez tworzenia QApplication.
+
+Moduł nie importuje PyQt - jest używany zanim aplikacja się uruchomi.
+"""
+import json
+import logging
+import os
+import time
+
+from src.ipc import IpcClient, IpcError
+
+logger = logging.getLogger(__name__)
+
+
+LOCK_FILE = "instance.lock"
+INSTANCE_FILE = "instance.json"
+CONNECT_WAIT_S = 3.0  # Działająca instancja mogła jeszcze nie uruchomić serwera IPC
+
+
+def get_config_dir():
+    """Katalog konfiguracji (ten sam co dla settings.json)"""
+    if os.name == "nt":
+        return os.path.join(os.getenv("APPDATA"), "OverlayApp")
+    return os.path.join(os.path.expanduser("~/.config"), "overlay")
+
+
+def _try_lock(handle):
+    """Blokada wyłączna bez czekania; rzuca OSError gdy plik jest zablokowany"""
+    if os.name == "nt":
+        import msvcrt
+        msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+class SingleInstance:
+    """
+    Pierwsza instancja trzyma blokadę pliku przez cały czas działania
+    (system zwalnia ją po zakończeniu procesu, więc nie ma nieaktualnych blokad)
+    i publikuje port oraz token swojego serwera IPC w instance.json.
+    """
+
+    def __init__(self, config_dir=None):
+        self.config_dir = config_dir or get_config_dir()
+        self.lock_path = os.path.join(self.config_dir, LOCK_FILE)
+        self.instance_path = os.path.join(self.config_dir, INSTANCE_FILE)
+        self._lock_handle = None
+
+    def acquire(self):
+        """Zwraca True jeśli to pierwsza instancja"""
+        os.makedirs(self.config_dir, exist_ok=True)
+        handle = open(self.lock_path, "a+")
+        try:
+            _try_lock(handle)
+        except OSError:
+            handle.close()
+            return False
+        self._lock_handle = handle
+        return True
+
+    def publish(self, port, token):
+        """Zapisuje dane połączenia IPC (tylko dla właściciela pliku)"""
+        data = {"pid": os.getpid(), "port": port, "token": token}
+        fd = os.open(self.instance_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def release(self):
+        if self._lock_handle is None:
+            return
+        try:
+            os.remove(self.instance_path)
+        except OSError:
+            pass
+        self._lock_handle.close()
+        self._lock_handle = None
+
+    def _read_instance(self):
+        try:
+            with open(self.instance_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def connect(self):
+        """Łączy się z działającą instancją; rzuca IpcError po upływie CONNECT_WAIT_S"""
+        deadline = time.monotonic() + CONNECT_WAIT_S
+        while True:
+            data = self._read_instance()
+            try:
+                if not data:
+                    raise IpcError("no connection data in " + INSTANCE_FILE)
+                return IpcClient(data["port"], data["token"]).connect()
+            except IpcError:
+                if time.monotonic() >= deadline:
+                    raise
+            time.sleep(0.05)
+
+    def forward(self, commands):
+        """Wysyła polecenia do działającej instancji; zwraca kod wyjścia procesu"""
+        try:
+            client = self.connect()
+        except IpcError as e:
+            logger.error("Nie można połączyć się z działającą instancją: %s", e)
+            return 1
+        try:
+            for cmd in commands:
+                client.request(cmd)
+            return 0
+        except IpcError as e:
+            logger.error("Błąd polecenia %s: %s", cmd, e)
+            return 1
+        finally:
+            client.close()
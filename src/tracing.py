@@ -0,0 +1,176 @@
+"""
+Śledzenie cyklu odświeżania planu (spany) także przez granicę procesu pobierania.
+
+Trace ma identyfikator i listę spanów (nazwa, początek, koniec, pid) ze
+znacznikami czasu time.time() - porównywalnymi między procesami. Proces roboczy
+odsyła swoje spany w wyniku (pole "trace"), a zakończony trace trafia jako
+jedna linia do pliku JSONL. Moduł nie importuje PyQt.
+
+Podgląd i eksport:
+  python -m src.tracing show traces.jsonl [--last 5]      # wykres kaskadowy w konsoli
+  python -m src.tracing export traces.jsonl trace.json    # Chrome trace-event (chrome://tracing, Perfetto)
+"""
+import argparse
+import contextlib
+import json
+import os
+import threading
+import time
+import uuid
+
+
+TRACE_FILE = "traces.jsonl"
+MAX_FILE_BYTES = 1024 * 1024  # Po przekroczeniu plik przechodzi do traces.jsonl.1
+
+
+class Trace:
+    """Jeden cykl odświeżania: identyfikator i spany ze wszystkich procesów"""
+
+    __slots__ = ("trace_id", "name", "spans")
+
+    def __init__(self, name, trace_id=None):
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.name = name
+        self.spans = []
+
+    def add(self, name, start, end, pid=None, **attrs):
+        """Dodaje zakończony span (czasy time.time())"""
+        span = {"name": name, "start": start, "end": end, "pid": pid or os.getpid()}
+        if attrs:
+            span["attrs"] = attrs
+        self.spans.append(span)
+
+    @contextlib.contextmanager
+    def span(self, name, **attrs):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.time(), **attrs)
+
+    def merge(self, payload):
+        """Dołącza spany odesłane przez proces roboczy ({"id", "spans"})"""
+        if payload and payload.get("id") == self.trace_id:
+            self.spans.extend(payload.get("spans", ()))
+
+    def to_dict(self):
+        start = min((span["start"] for span in self.spans), default=0.0)
+        end = max((span["end"] for span in self.spans), default=0.0)
+        return {"trace_id": self.trace_id, "name": self.name, "start": start,
+                "duration_ms": round((end - start) * 1000, 3), "spans": self.spans}
+
+
+def span(trace, name, **attrs):
+    """Span w trace albo pusty kontekst, gdy śledzenie jest wyłączone (trace None)"""
+    if trace is None:
+        return contextlib.nullcontext()
+    return trace.span(name, **attrs)
+
+
+class Tracer:
+    """Tworzy trace (gdy włączony) i dopisuje zakończone do pliku JSONL"""
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self._lock = threading.Lock()
+
+    def configure(self, enabled, config_dir=None):
+        self.enabled = bool(enabled)
+        if config_dir:
+            self.path = os.path.join(config_dir, TRACE_FILE)
+
+    def start(self, name):
+        """Nowy trace albo None, gdy śledzenie jest wyłączone"""
+        if not self.enabled:
+            return None
+        return Trace(name)
+
+    def finish(self, trace):
+        """Zapisuje trace jako linię JSON (z rotacją pliku)"""
+        if trace is None or not self.path:
+            return
+        line = json.dumps(trace.to_dict(), ensure_ascii=False) + "\n"
+        with self._lock:
+            try:
+                if os.path.exists(self.path) and os.path.getsize(self.path) > MAX_FILE_BYTES:
+                    os.replace(self.path, self.path + ".1")
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            except OSError:
+                pass  # Śledzenie nie może przeszkadzać w odświeżaniu
+
+
+tracer = Tracer()
+
+
+def load_traces(path):
+    traces = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    traces.append(json.loads(line))
+                except ValueError:
+                    continue
+    return traces
+
+
+def to_chrome_trace(traces):
+    """Zdarzenia "X" (complete) formatu Chrome trace-event; jeden wątek na trace"""
+    events = []
+    for tid, trace in enumerate(traces, start=1):
+        for item in trace["spans"]:
+            events.append({
+                "name": item["name"],
+                "cat": trace["name"],
+                "ph": "X",
+                "ts": round(item["start"] * 1e6),
+                "dur": max(0, round((item["end"] - item["start"]) * 1e6)),
+                "pid": item.get("pid", 0),
+                "tid": tid,
+                "args": dict(item.get("attrs", {}), trace_id=trace["trace_id"]),
+            })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def waterfall(trace, width=60):
+    """Tekstowy wykres kaskadowy jednego trace"""
+    start = trace["start"]
+    total = max(trace["duration_ms"], 0.001)
+    lines = [f"{trace['name']} {trace['trace_id']}  {trace['duration_ms']:.1f} ms"]
+    for item in sorted(trace["spans"], key=lambda s: s["start"]):
+        offset = (item["start"] - start) * 1000
+        duration = (item["end"] - item["start"]) * 1000
+        left = int(offset / total * width)
+        bar = max(1, int(duration / total * width))
+        lines.append(f"  {item['name']:<22} {' ' * left}{'#' * bar}{' ' * max(0, width - left - bar)}"
+                     f" {offset:8.1f} +{duration:.1f} ms  [pid {item.get('pid', '?')}]")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Podgląd i eksport trace'ów odświeżania planu")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("show", help="wykres kaskadowy w konsoli")
+    show.add_argument("path")
+    show.add_argument("--last", type=int, default=5)
+    export = commands.add_parser("export", help="eksport do formatu Chrome trace-event")
+    export.add_argument("path")
+    export.add_argument("output")
+    args = parser.parse_args()
+
+    traces = load_traces(args.path)
+    if args.command == "show":
+        for trace in traces[-args.last:]:
+            print(waterfall(trace))
+            print()
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(to_chrome_trace(traces), f)
+        print(f"{len(traces)} trace(s) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,30 @@
-from PyQt6.QtWidgets import QSystemTrayIcon, QMenu
+from PyQt6.QtWidgets import QSystemTrayIcon, QMenu, QApplication
 from PyQt6.QtGui import QIcon, QAction
 from PyQt6.QtCore import Qt
+import logging
 import sys
 import os
 
+from src.ipc import IpcClient, IpcError, TOKEN_ENV, UI_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
 
 class Tray:
     """
     Klasa odpowiedzialna za ikonę w zasobniku systemowym (tray)
     oraz szybki dostęp do funkcji overlaya.
+
+    mode="embedded"   - działa w procesie overlay i wywołuje jego metody
+    mode="standalone" - osobny proces, polecenia wysyła przez IPC (server_port)
     """
 
-    def __init__(self, app, overlay):
-        self.app = app
+    def __init__(self, app=None, overlay=None, mode="embedded", server_port=None, token=None):
+        self.app = app or QApplication.instance()
         self.overlay = overlay
+        self.client = None
+        if mode == "standalone":
+            self.client = IpcClient(server_port, token or os.getenv(TOKEN_ENV, ""), timeout=UI_TIMEOUT)
 
         # Uzyskaj poprawną ścieżkę do zasobów (działa też po spakowaniu .exe)
         def resource_path(relative_path):
@@ -61,6 +72,17 @@ class Tray:
         self.settings_action.triggered.connect(self.open_settings)
         self.menu.addAction(self.settings_action)
 
+        # Ukryta akcja debug - widoczna tylko gdy menu otwarto z wciśniętym Shift
+        self.debug_hud_action = QAction("Statystyki renderowania (debug)", checkable=True)
+        self.debug_hud_action.triggered.connect(self.toggle_debug_hud)
+        self.debug_hud_action.setVisible(False)
+        self.menu.addAction(self.debug_hud_action)
+
+        # Zrzut ostatnich wpisów dziennika (diagnostyka w wersji bez konsoli)
+        self.dump_log_action = QAction("Zapisz dziennik zdarzeń")
+        self.dump_log_action.triggered.connect(self.dump_log)
+        self.menu.addAction(self.dump_log_action)
+
         self.quit_action = QAction("Zakończ")
         self.quit_action.triggered.connect(self.quit_app)
         self.menu.addAction(self.quit_action)
@@ -71,8 +93,23 @@ class Tray:
         # Aktualizuj początkowy stan
         self.update_all_states()
 
+    def show(self):
+        """Pokazuje ikonę w zasobniku."""
+        self.tray_icon.show()
+
+    def _remote(self, cmd, **args):
+        """Wysyła polecenie do overlay (tryb standalone); None gdy overlay nie odpowiada"""
+        try:
+            return self.client.request(cmd, **args)
+        except IpcError as e:
+            logger.warning("Brak połączenia z overlay: %s", e)
+            return None
+
     def toggle_overlay(self):
         """Pokazuje lub ukrywa overlay."""
+        if self.client:
+            self._remote("toggle_overlay")
+            return
         if not self.overlay:
             return
 
@@ -84,6 +121,9 @@ class Tray:
 
     def toggle_clickthrough(self):
         """Włącza/wyłącza tryb clickthrough."""
+        if self.client:
+            self._remote("update_settings", settings={"clickthrough": self.clickthrough_action.isChecked()})
+            return
         if not self.overlay:
             return
 
@@ -97,6 +137,9 @@ class Tray:
 
     def toggle_drag(self):
         """Włącza/wyłącza możliwość przenoszenia."""
+        if self.client:
+            self._remote("update_settings", settings={"drag_enabled": self.drag_action.isChecked()})
+            return
         if not self.overlay:
             return
 
@@ -108,6 +151,9 @@ class Tray:
         
     def toggle_scaling(self):
         """Włącza/wyłącza możliwość skalowania."""
+        if self.client:
+            self._remote("update_settings", settings={"scaling_enabled": self.scaling_action.isChecked()})
+            return
         if not self.overlay:
             return
 
@@ -118,9 +164,41 @@ class Tray:
         self.overlay.update_ui_states()
         self.overlay.update()
 
+    def toggle_debug_hud(self):
+        """Włącza/wyłącza HUD ze statystykami renderowania."""
+        if self.client:
+            self._remote("set_debug_hud", enabled=self.debug_hud_action.isChecked())
+        elif self.overlay and hasattr(self.overlay, 'set_debug_hud_enabled'):
+            self.overlay.set_debug_hud_enabled(self.debug_hud_action.isChecked())
+
+    def update_debug_hud_state(self, hud_visible=None):
+        """Pokazuje akcję debug tylko z wciśniętym Shift (lub gdy HUD jest włączony)"""
+        if hud_visible is None:
+            hud = getattr(self.overlay, 'debug_hud', None) if self.overlay else None
+            hud_visible = hud is not None and hud.isVisible()
+        shift_held = bool(QApplication.keyboardModifiers() & Qt.KeyboardModifier.ShiftModifier)
+        self.debug_hud_action.setChecked(hud_visible)
+        self.debug_hud_action.setVisible(shift_held or hud_visible)
+
+    def dump_log(self):
+        """Zapisuje ostatnie wpisy dziennika do pliku i pokazuje jego ścieżkę."""
+        if self.client:
+            path = self._remote("dump_log")
+        elif self.overlay and hasattr(self.overlay, 'dump_log'):
+            path = self.overlay.dump_log()
+        else:
+            return
+        if path:
+            self.tray_icon.showMessage("Overlay", f"Dziennik zapisano w {path}")
+        else:
+            self.tray_icon.showMessage("Overlay", "Nie udało się zapisać dziennika",
+                                       QSystemTrayIcon.MessageIcon.Warning)
+
     def open_settings(self):
         """Otwiera okno ustawień."""
-        if self.overlay and hasattr(self.overlay, 'settings_window'):
+        if self.client:
+            self._remote("open_settings")
+        elif self.overlay and hasattr(self.overlay, 'settings_window'):
             self.overlay.settings_window.show()
             self.overlay.settings_window.raise_()
 
@@ -141,9 +219,18 @@ class Tray:
 
     def update_all_states(self):
         """Aktualizuje wszystkie stany w menu tray"""
+        if self.client:
+            state = self._remote("get_state")
+            if state:
+                self.clickthrough_action.setChecked(state["clickthrough"])
+                self.drag_action.setChecked(state["drag_enabled"])
+                self.scaling_action.setChecked(state["scaling_enabled"])
+                self.update_debug_hud_state(state["debug_hud"])
+            return
         self.update_clickthrough_state()
         self.update_drag_state()
         self.update_scaling_state()
+        self.update_debug_hud_state()
 
     def set_overlay(self, new_overlay):
         """
@@ -155,6 +242,10 @@ class Tray:
 
     def quit_app(self):
         """Zamyka aplikację."""
+        if self.client:
+            # Overlay kończy działanie i zamyka procesy klienckie
+            self._remote("quit")
+            self.client.close()
         if self.overlay and hasattr(self.overlay, "cursor_timer"):
             if self.overlay.cursor_timer.isActive():
                 self.overlay.cursor_timer.stop()
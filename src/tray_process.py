@@ -7,15 +7,16 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from PyQt6.QtWidgets import QApplication
 from src.tray import Tray
 
-def main():
+def main(port=None, token=None):
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
     
-    # Port komunikacyjny przekazany jako argument lub domyślny
-    port = int(sys.argv[1]) if len(sys.argv) > 1 else 5555
+    # Port serwera IPC overlay przekazany jako argument lub domyślny
+    if port is None:
+        port = int(sys.argv[1]) if len(sys.argv) > 1 else 5555
     
-    # Uruchom tray w trybie standalone
-    tray = Tray(mode="standalone", server_port=port)
+    # Uruchom tray w trybie standalone (token z argumentu lub zmiennej środowiskowej)
+    tray = Tray(mode="standalone", server_port=port, token=token)
     tray.show()
     
     sys.exit(app.exec())